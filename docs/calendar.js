@@ -21,6 +21,9 @@ const detailsDateElement = document.getElementById('detailsDate');
 const detailsVideosElement = document.getElementById('detailsVideos');
 const closeDetailsButton = document.getElementById('closeDetails');
 
+// サイトに表示しない公開状態（availability.json）
+const HIDDEN_AVAILABILITY_STATES = ['deleted', 'private'];
+
 // 初期化
 async function init() {
     showLoading(true);
@@ -69,9 +72,30 @@ async function getArchiveFilePaths() {
     });
 }
 
+// 動画の公開状態（リンクチェックの結果）を読み込み
+// 削除済み・非公開と確認された動画IDの集合を返す（ファイルがない場合は空）
+async function loadHiddenVideoIds() {
+    try {
+        const response = await fetch(`src/availability.json?v=${Date.now()}`);
+        if (!response.ok) {
+            return new Set();
+        }
+        const data = await response.json();
+        return new Set(
+            Object.entries(data.videos || {})
+                .filter(([, info]) => HIDDEN_AVAILABILITY_STATES.includes(info.state))
+                .map(([videoId]) => videoId)
+        );
+    } catch (error) {
+        console.error('公開状態の読み込みに失敗しました:', error);
+        return new Set();
+    }
+}
+
 // 全動画データを読み込み
 async function loadAllVideos() {
     allVideos = [];
+    const hiddenVideoIds = await loadHiddenVideoIds();
     
     for (const file of archiveFiles) {
         try {
@@ -82,11 +106,13 @@ async function loadAllVideos() {
                 const talentName = file.replace('archives_', '').replace('.json', '');
                 const talentDisplayName = talentNameMap[talentName] || talentName;
                 
-                const videosWithTalent = data.items.map(video => ({
+                const videosWithTalent = data.items.filter(video => !hiddenVideoIds.has(video.videoId)).map(video => ({
                     ...video,
                     talent: talentName,
                     talentDisplayName: talentDisplayName,
-                    upload_date_obj: new Date(video.upload_date)
+                    upload_date_obj: new Date(video.upload_date),
+                    // ソート用の日時（upload_tsがない古いデータはupload_dateから変換）
+                    sort_time: typeof video.upload_ts === 'number' ? video.upload_ts * 1000 : new Date(video.upload_date).getTime()
                 }));
                 
                 allVideos.push(...videosWithTalent);
@@ -97,7 +123,7 @@ async function loadAllVideos() {
     }
     
     // 日付でソート
-    allVideos.sort((a, b) => b.upload_date_obj - a.upload_date_obj);
+    allVideos.sort((a, b) => b.sort_time - a.sort_time);
     applyFilters();
 }
 
@@ -314,7 +340,7 @@ function showDayDetails(date, videos) {
     detailsVideosElement.innerHTML = '';
     
     // 動画を時系列順（投稿時刻順）にソート
-    const sortedVideos = [...videos].sort((a, b) => a.upload_date_obj - b.upload_date_obj);
+    const sortedVideos = [...videos].sort((a, b) => a.sort_time - b.sort_time);
     
     sortedVideos.forEach(video => {
         const videoItem = createVideoDetailItem(video);
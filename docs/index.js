@@ -35,6 +35,9 @@ let selectedTalents = new Set();
 // 選択されたタグ
 let selectedTags = new Set();
 
+// サイトに表示しない公開状態（availability.json）
+const HIDDEN_AVAILABILITY_STATES = ['deleted', 'private'];
+
 // 初期化
 async function init() {
     showLoading(true);
@@ -105,7 +108,7 @@ async function loadTalentInfo() {
 // 全ての動画データを読み込み
 async function loadAllVideos() {
     const promises = archiveFiles.map(file => loadArchiveFile(file));
-    const results = await Promise.all(promises);
+    const [results, hiddenVideoIds] = await Promise.all([Promise.all(promises), loadHiddenVideoIds()]);
     
     allVideos = [];
     const talentNames = new Set();
@@ -119,6 +122,9 @@ async function loadAllVideos() {
             talentNames.add(talentName);
             
             data.items.forEach(video => {
+                if (hiddenVideoIds.has(video.videoId)) {
+                    return;
+                }
                 allVideos.push({
                     ...video,
                     talentId: talentId,
@@ -140,6 +146,26 @@ async function loadAllVideos() {
     populateTalentFilter(Array.from(talentNames));
 }
 
+// 動画の公開状態（リンクチェックの結果）を読み込み
+// 削除済み・非公開と確認された動画IDの集合を返す（ファイルがない場合は空）
+async function loadHiddenVideoIds() {
+    try {
+        const response = await fetch(`src/availability.json?v=${Date.now()}`);
+        if (!response.ok) {
+            return new Set();
+        }
+        const data = await response.json();
+        return new Set(
+            Object.entries(data.videos || {})
+                .filter(([, info]) => HIDDEN_AVAILABILITY_STATES.includes(info.state))
+                .map(([videoId]) => videoId)
+        );
+    } catch (error) {
+        console.error('公開状態の読み込みに失敗しました:', error);
+        return new Set();
+    }
+}
+
 // 個別のアーカイブファイルを読み込み
 async function loadArchiveFile(fileName) {
     try {
@@ -431,12 +457,12 @@ function applyFilters() {
     
     // ソート
     filteredVideos.sort((a, b) => {
-        const dateA = new Date(a.upload_date);
-        const dateB = new Date(b.upload_date);
+        const timeA = getSortTime(a);
+        const timeB = getSortTime(b);
         
         // 無効な日付をチェック
-        const isValidDateA = !isNaN(dateA.getTime());
-        const isValidDateB = !isNaN(dateB.getTime());
+        const isValidDateA = !isNaN(timeA);
+        const isValidDateB = !isNaN(timeB);
         
         // 無効な日付の処理
         if (!isValidDateA && !isValidDateB) {
@@ -450,9 +476,9 @@ function applyFilters() {
         }
         
         if (sortOrder === 'desc') {
-            return dateB.getTime() - dateA.getTime();
+            return timeB - timeA;
         } else {
-            return dateA.getTime() - dateB.getTime();
+            return timeA - timeB;
         }
     });
     
@@ -463,6 +489,15 @@ function applyFilters() {
     loadMoreVideos();
 }
 
+// ソート用の日時（エポックミリ秒）を取得
+// upload_tsがない古いデータはupload_dateから変換する
+function getSortTime(video) {
+    if (typeof video.upload_ts === 'number') {
+        return video.upload_ts * 1000;
+    }
+    return new Date(video.upload_date).getTime();
+}
+
 // フィルタリング結果の詳細を表示
 function showFilterResults() {
     const dateFrom = dateFromElement.value;
@@ -57,15 +57,23 @@ if ! make all; then
 fi
 echo "✅ アーカイブ取得完了: $(date)"
 
+# サイト用の集計結果を更新（失敗してもアーカイブのコミットは続ける）
+if ! make stats; then
+    echo "⚠️  集計結果の更新に失敗しました"
+fi
+
 # アーカイブ取得後の状態を記録
 AFTER_FILES=$(find docs/src -name "archives_@*.json" -type f | wc -l)
 echo "📄 更新後のアーカイブファイル数: $AFTER_FILES"
 
+# 変更フィードのディレクトリを用意（変更がない日もgit addが失敗しないように）
+mkdir -p docs/src/changes
+
 # 変更されたファイルを確認
 echo "🔍 変更されたファイルを確認中..."
-CHANGED_FILES=$(git status --porcelain docs/src/archives_@*.json | wc -l)
-NEW_FILES=$(git status --porcelain docs/src/archives_@*.json | grep "^??" | wc -l)
-MODIFIED_FILES=$(git status --porcelain docs/src/archives_@*.json | grep "^ M" | wc -l)
+CHANGED_FILES=$(git status --porcelain docs/src/archives_@*.json docs/src/changes docs/src/stats.json docs/src/availability.json | wc -l)
+NEW_FILES=$(git status --porcelain docs/src/archives_@*.json docs/src/changes docs/src/stats.json docs/src/availability.json | grep "^??" | wc -l)
+MODIFIED_FILES=$(git status --porcelain docs/src/archives_@*.json docs/src/changes docs/src/stats.json docs/src/availability.json | grep "^ M" | wc -l)
 
 echo "📈 変更されたアーカイブファイル: $CHANGED_FILES個"
 echo "  - 新規ファイル: $NEW_FILES個"
@@ -79,13 +87,13 @@ fi
 
 # 変更されたファイルの詳細を表示
 echo "📋 変更されたファイル一覧:"
-git status --porcelain docs/src/archives_@*.json | while IFS= read -r line; do
+git status --porcelain docs/src/archives_@*.json docs/src/changes docs/src/stats.json docs/src/availability.json | while IFS= read -r line; do
     echo "  $line"
 done
 
 # アーカイブファイルをステージング
 echo "📦 アーカイブファイルをステージング中..."
-if ! git add docs/src/archives_@*.json; then
+if ! git add docs/src/archives_@*.json docs/src/changes docs/src/stats.json docs/src/availability.json; then
     echo "❌ ファイルのステージングに失敗しました"
     exit 1
 fi
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+リンクチェッカーの並列数の自動調整（AIMD）
+レスポンスが正常な間は並列数を少しずつ増やし（加算的増加）、
+429・5xx・LOGIN_REQUIRED のページなどレート制限の兆候を受けたら並列数を半分に減らします（乗算的減少）。
+レート制限の兆候を受けた動画は待機してからチェックし直します。
+チェックし直しても429・5xx・接続エラーの動画はリンク切れとして報告せず未確認として残し、
+LOGIN_REQUIRED のままの動画は逐次チェックと同じく非公開動画として報告します。
+
+ホストごとの上限は rate_governor の予算が守るため、ここでは上限の範囲で安全に出せる速さを探します。
+
+環境変数:
+  NANAHAPI_ADAPTIVE_MAX  最大の並列数（デフォルト: 8）
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# link_classifier のログイン必須の判定メッセージに含まれる文字列
+LOGIN_REQUIRED_MARKER = 'status=LOGIN_REQUIRED'
+
+# レート制限の兆候を受けた動画をチェックし直す回数
+DEFAULT_RETRIES = 3
+
+def _max_concurrency():
+    try:
+        return max(1, int(os.getenv('NANAHAPI_ADAPTIVE_MAX', '8')))
+    except ValueError:
+        return 8
+
+def is_throttled(status_code, error_msg=''):
+    """
+    チェック結果がレート制限の兆候か確認
+
+    Args:
+        status_code (int): HTTPステータス（接続できなかった場合は0）
+        error_msg (str): エラーメッセージ
+    Returns:
+        bool: 429・5xx・LOGIN_REQUIRED の場合True
+    """
+    return status_code == 429 or status_code >= 500 or LOGIN_REQUIRED_MARKER in (error_msg or '')
+
+def is_unconfirmed(status_code, error_msg=''):
+    """
+    チェック結果から動画の状態を判断できないか確認
+
+    Args:
+        status_code (int): HTTPステータス（接続できなかった場合は0）
+        error_msg (str): エラーメッセージ
+    Returns:
+        bool: 429・5xx・接続エラー（タイムアウトなど）の場合True
+    """
+    return status_code == 0 or status_code == 429 or status_code >= 500
+
+class AIMDController:
+    """
+    加算的増加・乗算的減少（AIMD）で並列数を調整するコントローラ
+    acquire() で枠を取得し、レスポンスを受けたら release() に正常かどうかを渡す
+    """
+    def __init__(self, initial=1.0, minimum=1.0, maximum=None, decrease=0.5, cooldown=5.0, window=30.0, clock=time.monotonic):
+        """
+        Args:
+            initial (float): 最初の並列数
+            minimum (float): 最小の並列数
+            maximum (float): 最大の並列数（Noneなら環境変数 NANAHAPI_ADAPTIVE_MAX）
+            decrease (float): レート制限の兆候を受けたときに並列数に掛ける係数
+            cooldown (float): 並列数を減らしてから次に減らすまでの秒数（減らす前に送ったリクエストの分で減らしすぎない）
+            window (float): 速度の計算に使う直近の秒数
+            clock (callable): 現在時刻の関数（テスト用）
+        """
+        self.maximum = float(maximum or _max_concurrency())
+        self.minimum = min(float(minimum), self.maximum)
+        self.limit = min(max(float(initial), self.minimum), self.maximum)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.window = window
+        self.clock = clock
+        self.in_flight = 0
+        self.throttled_count = 0
+        self._last_decrease = None
+        self._completed = deque()  # 直近のレスポンスの時刻
+        self._condition = threading.Condition()
+
+    @property
+    def concurrency(self):
+        """
+        現在の並列数（整数）
+        """
+        return max(1, int(self.limit))
+
+    def acquire(self):
+        """
+        並列数に空きができるまで待って枠を取得
+        """
+        with self._condition:
+            while self.in_flight >= self.concurrency:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled=False):
+        """
+        枠を返却して並列数を調整
+
+        Args:
+            throttled (bool): レスポンスがレート制限の兆候だった場合True
+        """
+        with self._condition:
+            now = self.clock()
+            self.in_flight -= 1
+            self._completed.append(now)
+            if throttled:
+                self.throttled_count += 1
+                if self._last_decrease is None or now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                # 並列数ぶんのレスポンスが正常に返るごとに1増やす
+                self.limit = min(self.maximum, self.limit + 1.0 / self.concurrency)
+            self._condition.notify_all()
+
+    def backoff(self, attempt):
+        """
+        レート制限の兆候を受けた動画をチェックし直すまでの秒数
+
+        Args:
+            attempt (int): 何回目のチェックし直しか（0から）
+        Returns:
+            float: 待機する秒数
+        """
+        return min(self.cooldown * (2 ** attempt), 60.0)
+
+    def rate(self):
+        """
+        直近のレスポンスの速度
+
+        Returns:
+            float: 1秒あたりのレスポンス数
+        """
+        with self._condition:
+            now = self.clock()
+            while self._completed and now - self._completed[0] > self.window:
+                self._completed.popleft()
+            if len(self._completed) < 2:
+                return 0.0
+            elapsed = now - self._completed[0]
+            return len(self._completed) / elapsed if elapsed > 0 else 0.0
+
+    def describe(self):
+        """
+        進捗表示用の現在の並列数と速度
+
+        Returns:
+            str: 表示用の文字列
+        """
+        return f"並列数 {self.concurrency} / {self.rate():.1f}件/秒"
+
+def _check_with_retries(check, url, controller, retries, sleep):
+    result = None
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep(controller.backoff(attempt - 1))
+        controller.acquire()
+        throttled = True
+        try:
+            result = check(url)
+            throttled = is_throttled(result[1], result[2])
+        finally:
+            controller.release(throttled)
+        if not throttled and not is_unconfirmed(result[1], result[2]):
+            break
+    return result, is_unconfirmed(result[1], result[2])
+
+def check_concurrently(tasks, check, controller, retries=DEFAULT_RETRIES, sleep=time.sleep):
+    """
+    コントローラの並列数で動画URLをチェック
+
+    Args:
+        tasks (list): (URL, 呼び出し元で使う値) のリスト
+        check (callable): URLを受け取り (is_valid, status_code, error_msg) を返す関数
+        controller (AIMDController): 並列数のコントローラ
+        retries (int): レート制限の兆候・接続エラーを受けた動画をチェックし直す回数
+        sleep (callable): 待機の関数（テスト用）
+    Yields:
+        tuple: (呼び出し元で使う値, (is_valid, status_code, error_msg), チェックし直しても状態を判断できなかった場合True)（終わった順）
+               チェックし直してもLOGIN_REQUIREDの場合は、最後の結果をFalseとともに返す
+    """
+    executor = ThreadPoolExecutor(max_workers=int(controller.maximum))
+    try:
+        futures = {
+            executor.submit(_check_with_retries, check, url, controller, retries, sleep): value
+            for url, value in tasks
+        }
+        for future in as_completed(futures):
+            result, throttled = future.result()
+            yield futures[future], result, throttled
+    finally:
+        # 中断された場合はまだ始まっていないチェックを取り消す
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+アーカイブの集計
+docs/src/archives_@*.json（最新のバイナリ形式があればそちら）を列指向のNumPy配列（タレント番号・エポック秒・タグのビットセット）に読み込み、
+タレントごとの週別配信数、タグの月別推移、メン限の割合を集計して docs/src/stats.json に出力します。
+
+使用方法:
+  python script/archive_analytics.py [出力ファイル]
+"""
+
+import sys
+import json
+import glob
+import time
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+
+from archive_utils import ARCHIVES_DIR, JST, load_archive_items, parse_upload_dates
+from binary_archive import FLAG_HAS_TIMESTAMP, open_binary_archive
+from local_state import write_json_atomic
+
+STATS_FILE = 'docs/src/stats.json'
+MEMBERS_ONLY_TAG = '#メン限'
+TOP_TAGS = 20  # タグの推移を出力する上位タグ数
+
+JST_OFFSET = int(JST.utcoffset(None).total_seconds())
+WEEK = 7 * 24 * 60 * 60
+# エポック（1970-01-01）は木曜日なので、月曜始まりの週番号にするためにずらす秒数
+WEEK_SHIFT = 3 * 24 * 60 * 60
+
+class ArchiveTable:
+    """
+    全アーカイブの動画を列指向で保持するテーブル
+
+    Attributes:
+        talents (list): タレントのハンドル（talent列の番号に対応）
+        tag_names (list): タグ名（ビットセットのビット位置に対応）
+        talent (np.ndarray): 動画ごとのタレント番号 (int32)
+        epoch (np.ndarray): 動画ごとのアップロード日時のエポック秒 (int64)
+        tag_bits (np.ndarray): 動画ごとのタグのビットセット (uint64, 動画数 × ワード数)
+    """
+    def __init__(self, talents, tag_names, talent, epoch, tag_bits):
+        self.talents = talents
+        self.tag_names = tag_names
+        self.tag_index = {name: i for i, name in enumerate(tag_names)}
+        self.talent = talent
+        self.epoch = epoch
+        self.tag_bits = tag_bits
+
+    def __len__(self):
+        return len(self.epoch)
+
+    @classmethod
+    def load(cls, archives_dir=ARCHIVES_DIR):
+        """
+        アーカイブファイルを読み込んでテーブルを作成
+        日時が不明な動画は集計できないため除外する
+
+        Args:
+            archives_dir (str): アーカイブファイルのディレクトリ
+        Returns:
+            ArchiveTable: テーブル
+        """
+        talents = []
+        talent_col = []
+        epochs = []
+        video_tags = []
+        tag_index = {}
+        for file_path in sorted(glob.glob(str(Path(archives_dir) / 'archives_*.json'))):
+            talent_id = len(talents)
+            talents.append(Path(file_path).stem.replace('archives_', '', 1))
+            archive = open_binary_archive(file_path)
+            if archive is not None:
+                # 最新のバイナリ形式があればJSONを解析せずに必要な項目だけを読み出す
+                with archive:
+                    items = [
+                        {'upload_ts': archive.upload_ts(i), 'tags': archive.tags(i)}
+                        if archive.flags(i) & FLAG_HAS_TIMESTAMP else archive[i]
+                        for i in range(len(archive))
+                    ]
+            else:
+                items = load_archive_items(file_path)
+            # upload_tsがない古いデータはまとめて変換する
+            missing = [i for i, item in enumerate(items) if item.get('upload_ts') is None]
+            parsed = dict(zip(missing, parse_upload_dates([items[i].get('upload_date') for i in missing])))
+            for i, item in enumerate(items):
+                upload_ts = item.get('upload_ts') if i not in parsed else parsed[i]
+                if upload_ts is None:
+                    continue
+                talent_col.append(talent_id)
+                epochs.append(upload_ts)
+                video_tags.append([tag_index.setdefault(tag, len(tag_index)) for tag in item.get('tags', [])])
+
+        words = max(1, (len(tag_index) + 63) // 64)
+        tag_bits = np.zeros((len(epochs), words), dtype=np.uint64)
+        for row, tags in enumerate(video_tags):
+            for bit in tags:
+                tag_bits[row, bit // 64] |= np.uint64(1 << (bit % 64))
+
+        return cls(
+            talents,
+            sorted(tag_index, key=tag_index.get),
+            np.array(talent_col, dtype=np.int32),
+            np.array(epochs, dtype=np.int64),
+            tag_bits,
+        )
+
+    def has_tag(self, tag):
+        """
+        タグを持つ動画のマスクを取得
+
+        Args:
+            tag (str): タグ名
+        Returns:
+            np.ndarray: 動画ごとの真偽値
+        """
+        bit = self.tag_index.get(tag)
+        if bit is None:
+            return np.zeros(len(self), dtype=bool)
+        return (self.tag_bits[:, bit // 64] & np.uint64(1 << (bit % 64))) != 0
+
+    def tag_counts(self):
+        """
+        タグごとの動画数を取得
+
+        Returns:
+            np.ndarray: タグ番号ごとの動画数
+        """
+        # ビットセットを展開してタグごとに合計する（リトルエンディアンでビット位置とタグ番号を揃える）
+        bits = np.unpackbits(self.tag_bits.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :len(self.tag_names)].sum(axis=0)
+
+    def streams_per_week(self):
+        """
+        タレントごとの週別（月曜始まり、日本時間）の配信・動画数
+
+        Returns:
+            dict: {タレント: {週の開始日: 件数}}
+        """
+        week = (self.epoch + JST_OFFSET + WEEK_SHIFT) // WEEK
+        first_week = int(week.min()) if len(week) else 0
+        span = int(week.max()) - first_week + 1 if len(week) else 1
+        counts = np.bincount(self.talent * span + (week - first_week), minlength=len(self.talents) * span)
+        counts = counts.reshape(len(self.talents), span)
+        result = {}
+        for talent_id, talent in enumerate(self.talents):
+            nonzero = np.flatnonzero(counts[talent_id])
+            result[talent] = {
+                week_label(first_week + int(w)): int(counts[talent_id, w]) for w in nonzero
+            }
+        return result
+
+    def tag_trends(self, top=TOP_TAGS):
+        """
+        動画数の多い上位タグの月別（日本時間）の推移
+
+        Args:
+            top (int): 対象とするタグ数
+        Returns:
+            dict: {タグ: {YYYY-MM: 件数}}
+        """
+        month = (self.epoch + JST_OFFSET).astype('datetime64[s]').astype('datetime64[M]')
+        months, month_id = np.unique(month, return_inverse=True)
+        labels = [str(m) for m in months]
+        result = {}
+        for bit in np.argsort(-self.tag_counts(), kind='stable')[:top]:
+            tag = self.tag_names[bit]
+            counts = np.bincount(month_id[self.has_tag(tag)], minlength=len(months))
+            result[tag] = {labels[m]: int(counts[m]) for m in np.flatnonzero(counts)}
+        return result
+
+    def members_only_share(self):
+        """
+        タレントごとのメン限の件数と割合
+
+        Returns:
+            dict: {タレント: {'total': 総数, 'members_only': メン限の件数, 'share': 割合}}
+        """
+        totals = np.bincount(self.talent, minlength=len(self.talents))
+        members = np.bincount(self.talent[self.has_tag(MEMBERS_ONLY_TAG)], minlength=len(self.talents))
+        return {
+            talent: {
+                'total': int(totals[i]),
+                'members_only': int(members[i]),
+                'share': round(float(members[i] / totals[i]), 4) if totals[i] else 0.0,
+            }
+            for i, talent in enumerate(self.talents)
+        }
+
+def week_label(week):
+    """
+    週番号を週の開始日（月曜、日本時間）の文字列に変換
+
+    Args:
+        week (int): streams_per_week内の週番号
+    Returns:
+        str: YYYY-MM-DD
+    """
+    return datetime.fromtimestamp(week * WEEK - WEEK_SHIFT - JST_OFFSET, JST).strftime('%Y-%m-%d')
+
+def build_stats(table):
+    """
+    サイト用の集計結果を作成
+
+    Args:
+        table (ArchiveTable): テーブル
+    Returns:
+        tuple: (集計結果, 集計ごとの処理時間（ミリ秒）)
+    """
+    timings = {}
+    results = {}
+    for name, func in (
+        ('streams_per_week', table.streams_per_week),
+        ('tag_trends', table.tag_trends),
+        ('members_only', table.members_only_share),
+    ):
+        start = time.perf_counter()
+        results[name] = func()
+        timings[name] = (time.perf_counter() - start) * 1000
+
+    first = int(table.epoch.min()) if len(table) else None
+    last = int(table.epoch.max()) if len(table) else None
+    stats = {
+        'total_videos': len(table),
+        'first_upload_ts': first,
+        'last_upload_ts': last,
+        'talents': {
+            talent: {
+                **results['members_only'][talent],
+                'weekly': results['streams_per_week'][talent],
+            }
+            for talent in table.talents
+        },
+        'tag_trends': results['tag_trends'],
+    }
+    return stats, timings
+
+def main():
+    """
+    メイン関数
+    第1引数: 出力ファイル（デフォルト: docs/src/stats.json）
+    """
+    print("📈 アーカイブ集計")
+    print("=" * 50)
+
+    output_file = sys.argv[1] if len(sys.argv) > 1 else STATS_FILE
+
+    start = time.perf_counter()
+    table = ArchiveTable.load()
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"📦 読み込み: {len(table)}件 / {len(table.talents)}タレント / {len(table.tag_names)}タグ ({load_ms:.1f}ms)")
+
+    stats, timings = build_stats(table)
+    for name, ms in timings.items():
+        print(f"  {name:<18} {ms:8.2f}ms")
+
+    # 集計結果が変わらない場合は書き込まない（generated_atだけの差分を作らない）
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        previous.pop('generated_at', None)
+    except (FileNotFoundError, ValueError):
+        previous = None
+    if previous == stats:
+        print(f"ℹ️  {output_file} に変更はありません")
+        return
+
+    stats['generated_at'] = datetime.now(JST).isoformat(timespec='seconds')
+    write_json_atomic(output_file, stats)
+    print(f"✅ 集計結果を {output_file} に保存しました")
+
+if __name__ == "__main__":
+    main()
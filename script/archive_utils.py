@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+アーカイブファイル（docs/src/archives_@*.json）の共通処理
+"""
+
+import sys
+import json
+import warnings
+import functools
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+# アーカイブのupload_dateは日本時間（タイムゾーン表記なし）で保存されている
+JST = timezone(timedelta(hours=9))
+
+ARCHIVES_DIR = 'docs/src'
+TALENT_INFO = 'docs/src/talent_info.json'
+
+# 一括変換でnumpyを読み込む最小件数（numpyの読み込みに約60ms、1件ずつの変換は1件あたり約2μsのため）
+NUMPY_MIN_ITEMS = 20000
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """
+    numpyを初回の使用時に読み込む
+
+    Returns:
+        module: numpy（インストールされていない場合はNone）
+    """
+    try:
+        import numpy
+        return numpy
+    except ImportError:  # numpyがない場合は一括変換も1件ずつ変換する
+        return None
+
+def archive_path(channel, archives_dir=ARCHIVES_DIR):
+    """
+    タレントのアーカイブファイルのパスを取得
+
+    Args:
+        channel (str): YouTubeのハンドル（例: @koyuchan_）
+        archives_dir (str): アーカイブファイルのディレクトリ
+    Returns:
+        Path: アーカイブファイルのパス
+    """
+    return Path(archives_dir) / f"archives_{channel}.json"
+
+def load_archive_items(path):
+    """
+    アーカイブファイルから動画情報のリストを読み込み
+
+    Args:
+        path (str or Path): アーカイブファイルのパス
+    Returns:
+        list: 動画情報のリスト（読み込めない場合は空リスト）
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    items = data.get('items', [])
+    return items if isinstance(items, list) else []
+
+def load_talents(path=TALENT_INFO):
+    """
+    タレント情報を読み込み
+
+    Args:
+        path (str): talent_info.jsonのパス
+    Returns:
+        list: タレント情報のリスト
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def parse_upload_date(upload_date):
+    """
+    アーカイブのupload_date（日本時間）をエポック秒に変換
+
+    Args:
+        upload_date (str): upload_date文字列
+    Returns:
+        int: エポック秒、変換できない場合はNone
+    """
+    if not upload_date:
+        return None
+    try:
+        dt = datetime.fromisoformat(upload_date)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=JST)
+    return int(dt.timestamp())
+
+@functools.lru_cache(maxsize=8192)
+def normalize_timestamp(value) -> tuple:
+    """
+    yt-dlp・ブラウジングで取得した日時をエポック秒と表示用のupload_date（日本時間）に変換
+    同じ値は繰り返し変換しない（メモ化）
+
+    Args:
+        value (int or float or str): エポック秒、またはISO形式の文字列（タイムゾーン表記なしはUTCとみなす）
+    Returns:
+        tuple: (エポック秒, upload_date文字列)、変換できない場合は (None, "")
+    """
+    if isinstance(value, bool):
+        return None, ""
+    if isinstance(value, (int, float)):
+        dt = datetime.fromtimestamp(value, JST)
+    elif isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return None, ""
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        dt = dt.astimezone(JST)
+    else:
+        return None, ""
+    return int(dt.timestamp()), dt.replace(tzinfo=None).isoformat()
+
+def parse_upload_dates(upload_dates):
+    """
+    upload_date（日本時間）のリストをまとめてエポック秒に変換
+    件数が多い場合（またはnumpyを読み込み済みの場合）はdatetime64で一括変換する（全件取得時の既存データの変換用）
+
+    Args:
+        upload_dates (list): upload_date文字列のリスト
+    Returns:
+        list: エポック秒のリスト（変換できない要素はNone）
+    """
+    np = _numpy() if upload_dates and (len(upload_dates) >= NUMPY_MIN_ITEMS or 'numpy' in sys.modules) else None
+    if np is not None:
+        try:
+            with warnings.catch_warnings():
+                # タイムゾーン表記つきの値はdatetime64では正しく扱えないため警告を例外にする
+                warnings.simplefilter('error')
+                values = np.array([d or '' for d in upload_dates], dtype='datetime64[s]')
+        except (TypeError, ValueError, UserWarning):
+            # 形式の異なる値が混ざっている場合は1件ずつ変換する
+            pass
+        else:
+            offset = int(JST.utcoffset(None).total_seconds())
+            epochs = values.astype(np.int64) - offset
+            return [None if nat else int(epoch) for epoch, nat in zip(epochs.tolist(), np.isnat(values).tolist())]
+    return [parse_upload_date(d) for d in upload_dates]
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+動画の公開状態（docs/src/availability.json）
+リンクチェッカーの結果を動画IDごとの状態と最終確認日時として保存し、
+サイトの表示や get_archives.py の取得対象の判断に使います。
+
+形式:
+  {"last_updated": "...", "videos": {"<videoId>": {"state": "available", "checked_at": "...", "status": 200, "message": ""}}}
+  state: available（公開中）/ deleted（削除済み）/ private（非公開）/ unavailable（その他の再生不可）
+  サイトで表示しない deleted・private は、404・削除済み／非公開のページ・チェックし直してもログイン必須だった場合など、
+  確認できた結果からだけ記録します。
+"""
+
+import json
+from pathlib import Path
+from datetime import datetime
+
+from archive_utils import ARCHIVES_DIR, JST
+from local_state import write_json_atomic
+from link_classifier import is_unconfirmed_login_required
+
+AVAILABILITY_FILE_NAME = 'availability.json'
+
+STATE_AVAILABLE = 'available'
+STATE_DELETED = 'deleted'
+STATE_PRIVATE = 'private'
+STATE_UNAVAILABLE = 'unavailable'
+
+# サイトで表示しない状態
+HIDDEN_STATES = (STATE_DELETED, STATE_PRIVATE)
+
+# link_classifier の判定メッセージの接頭辞と状態の対応
+DELETED_MESSAGE_PREFIXES = ('動画が削除されています', '動画エラー（削除済みの可能性）')
+PRIVATE_MESSAGE_PREFIXES = ('非公開動画',)
+
+def availability_path(archives_dir=ARCHIVES_DIR):
+    """
+    公開状態ファイルのパスを取得
+
+    Args:
+        archives_dir (str): アーカイブファイルのディレクトリ
+    Returns:
+        Path: パス
+    """
+    return Path(archives_dir) / AVAILABILITY_FILE_NAME
+
+def availability_state(is_valid, status_code, error_msg):
+    """
+    リンクチェックの結果を公開状態に変換
+
+    Args:
+        is_valid (bool): 正常とみなすか
+        status_code (int): HTTPステータス（接続できなかった場合は0）
+        error_msg (str): エラーメッセージ
+    Returns:
+        str: 公開状態（タイムアウトなど一時的なエラーで判断できない場合はNone）
+    """
+    if is_valid:
+        return STATE_AVAILABLE
+    if status_code == 0:
+        return None
+    if status_code == 404 or error_msg.startswith(DELETED_MESSAGE_PREFIXES):
+        return STATE_DELETED
+    if is_unconfirmed_login_required(error_msg):
+        # 一度だけのログイン必須はレート制限の兆候のことがあるため、公開中の動画を非表示にしないよう非公開とはしない
+        return STATE_UNAVAILABLE
+    if error_msg.startswith(PRIVATE_MESSAGE_PREFIXES):
+        return STATE_PRIVATE
+    return STATE_UNAVAILABLE
+
+def load_availability(archives_dir=ARCHIVES_DIR):
+    """
+    動画IDごとの公開状態を読み込み
+
+    Args:
+        archives_dir (str): アーカイブファイルのディレクトリ
+    Returns:
+        dict: {videoId: 公開状態の情報}
+    """
+    try:
+        with open(availability_path(archives_dir), 'r', encoding='utf-8') as f:
+            return json.load(f).get('videos', {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def known_deleted_ids(archives_dir=ARCHIVES_DIR):
+    """
+    削除済みと確認された動画IDを取得
+
+    Args:
+        archives_dir (str): アーカイブファイルのディレクトリ
+    Returns:
+        set: 動画IDの集合
+    """
+    return {video_id for video_id, info in load_availability(archives_dir).items() if info.get('state') == STATE_DELETED}
+
+def update_availability(results, archives_dir=ARCHIVES_DIR):
+    """
+    リンクチェックの結果を動画IDで索引した公開状態にマージして保存
+
+    Args:
+        results (list): (videoId, is_valid, status_code, error_msg) のリスト
+        archives_dir (str): アーカイブファイルのディレクトリ
+    Returns:
+        int: 状態を更新した動画数
+    """
+    videos = load_availability(archives_dir)
+    checked_at = datetime.now(JST).isoformat(timespec='seconds')
+    updated = 0
+    for video_id, is_valid, status_code, error_msg in results:
+        state = availability_state(is_valid, status_code, error_msg)
+        if not video_id or state is None:
+            continue
+        videos[video_id] = {
+            'state': state,
+            'checked_at': checked_at,
+            'status': status_code,
+            'message': error_msg,
+        }
+        updated += 1
+    if updated:
+        write_json_atomic(availability_path(archives_dir), {
+            'last_updated': checked_at,
+            'videos': dict(sorted(videos.items())),
+        })
+    return updated
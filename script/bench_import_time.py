@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+起動時間（モジュールの読み込み時間）のベンチマーク
+各スクリプトを `python -X importtime` で新しいプロセスに読み込み、
+読み込み時間の合計と、起動時に読み込まれた重い依存モジュール（yt-dlp・Selenium・numpyなど）を表示します。
+重い依存モジュールは初回の使用時に読み込む方針のため、起動時に読み込まれていれば失敗とします。
+
+使用方法:
+  python script/bench_import_time.py [上限(ms)]
+  例: python script/bench_import_time.py 150
+"""
+
+import os
+import sys
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 計測するモジュール
+MODULES = ('get_archives', 'check_video_links', 'check_video_links_fast', 'scheduler', 'upcoming_tracker')
+
+# 初回の使用時に読み込むべき重い依存モジュール
+HEAVY_MODULES = ('yt_dlp', 'selenium', 'webdriver_manager', 'numpy', 'httpx')
+
+def measure_import(module):
+    """
+    モジュールを新しいプロセスで読み込んで -X importtime の結果を解析
+
+    Args:
+        module (str): モジュール名
+    Returns:
+        tuple: (読み込み時間の合計(ms), 読み込まれたモジュール名の集合)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SCRIPT_DIR, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        loaded.add(name.strip())
+        if name.strip() == module:
+            total_us = int(cumulative)
+    return total_us / 1000, loaded
+
+def heavy_modules_loaded(module):
+    """
+    モジュールの読み込み時に読み込まれた重い依存モジュールを取得
+
+    Args:
+        module (str): モジュール名
+    Returns:
+        list: 重い依存モジュール名のリスト
+    """
+    _, loaded = measure_import(module)
+    return sorted(heavy for heavy in HEAVY_MODULES if heavy in loaded)
+
+def main():
+    """
+    メイン関数
+    """
+    budget_ms = float(sys.argv[1]) if len(sys.argv) >= 2 else None
+
+    print("⏱ 起動時間のベンチマーク")
+    print("=" * 50)
+
+    failed = False
+    for module in MODULES:
+        total_ms, loaded = measure_import(module)
+        heavy = sorted(name for name in HEAVY_MODULES if name in loaded)
+        over = budget_ms is not None and total_ms > budget_ms
+        mark = '❌' if heavy or over else '✅'
+        print(f"  {mark} {module:<24} {total_ms:8.1f}ms  {'重い依存: ' + ', '.join(heavy) if heavy else ''}")
+        failed = failed or bool(heavy) or over
+
+    if failed:
+        print("❌ 起動時に重い依存モジュールを読み込んでいるか、上限を超えたスクリプトがあります")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
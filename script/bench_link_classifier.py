@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+リンクチェック判定ロジックのベンチマーク
+script/fixtures/watch_pages の保存済み動画ページ（公開・メン限・非公開・削除・地域制限・放送予定）を
+実際のページに近いサイズまで水増しして classify_watch_page に通し、
+判定結果が expected.json と一致することを確認したうえで
+処理速度（ページ/秒）とメモリ使用量（ピーク）を計測します。
+
+使用方法:
+  python script/bench_link_classifier.py [ページサイズ(KB)] [繰り返し回数]
+  例: python script/bench_link_classifier.py 1024 20
+"""
+
+import os
+import sys
+import json
+import time
+import tracemalloc
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from link_classifier import classify_watch_page
+
+CORPUS_DIR = Path(__file__).resolve().parent / 'fixtures' / 'watch_pages'
+
+# 判定に影響しない水増し用の文字列（実際のページのytcfgやスクリプトに相当）
+FILLER_CHUNK = '{"k":"q1w2e3r4t5y6u7i8o9","n":1234567890,"b":true},'
+
+def pad_page(html, pad_kb):
+    """
+    ページを指定サイズまで水増し（<body>直後に判定に影響しないスクリプトを挿入）
+
+    Args:
+        html (str): 元のHTML
+        pad_kb (int): 目標サイズ（KB）
+    Returns:
+        str: 水増ししたHTML
+    """
+    missing = pad_kb * 1024 - len(html)
+    if missing <= 0:
+        return html
+    filler = '<script>var ytcfg=[' + FILLER_CHUNK * (missing // len(FILLER_CHUNK) + 1) + '];</script>'
+    index = html.find('<body>')
+    index = index + len('<body>') if index >= 0 else 0
+    return html[:index] + filler + html[index:]
+
+def load_corpus(pad_kb=0):
+    """
+    保存済み動画ページと期待する判定結果を読み込み
+
+    Args:
+        pad_kb (int): 水増し後のページサイズ（KB）、0なら水増ししない
+    Returns:
+        list: (ページ名, HTML, 期待する判定結果) のリスト
+    """
+    with open(CORPUS_DIR / 'expected.json', 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    corpus = []
+    for name in sorted(expected):
+        with open(CORPUS_DIR / f'{name}.html', 'r', encoding='utf-8') as f:
+            html = f.read()
+        corpus.append((name, pad_page(html, pad_kb), expected[name]))
+    return corpus
+
+def verify_corpus(corpus):
+    """
+    コーパスの判定結果が期待値と一致するか確認
+
+    Args:
+        corpus (list): load_corpus() の戻り値
+    Returns:
+        list: 一致しなかったページの (ページ名, 期待値, 実際の結果) のリスト
+    """
+    mismatches = []
+    for name, html, expected in corpus:
+        verdict = classify_watch_page(html)
+        actual = {'is_valid': verdict.is_valid, 'kind': verdict.kind, 'message': verdict.message}
+        if actual != expected:
+            mismatches.append((name, expected, actual))
+    return mismatches
+
+def run_benchmark(pad_kb, iterations):
+    """
+    判定ロジックの速度とメモリを計測
+
+    Args:
+        pad_kb (int): ページサイズ（KB）
+        iterations (int): コーパス全体の繰り返し回数
+    Returns:
+        dict: 計測結果
+    """
+    corpus = load_corpus(pad_kb)
+
+    mismatches = verify_corpus(corpus)
+    for name, expected, actual in mismatches:
+        print(f"❌ 判定結果が一致しません: {name}")
+        print(f"   期待値: {expected}")
+        print(f"   実際  : {actual}")
+    assert not mismatches, "判定結果がコーパスの期待値と一致しません"
+
+    # チェッカーと同じくレスポンスのバイト列を渡す
+    pages = [html.encode('utf-8') for _, html, _ in corpus]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for html in pages:
+            classify_watch_page(html)
+    elapsed = time.perf_counter() - start
+    count = iterations * len(pages)
+
+    tracemalloc.start()
+    for html in pages:
+        classify_watch_page(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        'page_kb': pad_kb,
+        'pages': count,
+        'seconds': elapsed,
+        'pages_per_second': count / elapsed if elapsed > 0 else float('inf'),
+        'peak_memory_kb': peak / 1024,
+    }
+    print(f"📄 ページサイズ: {pad_kb}KB × {len(pages)}種類 × {iterations}回")
+    print(f"⏱ 処理速度: {result['pages_per_second']:.1f} ページ/秒 ({elapsed:.3f}秒)")
+    print(f"💾 ピークメモリ: {result['peak_memory_kb']:.1f} KB")
+    return result
+
+def main():
+    """
+    メイン関数
+    第1引数: ページサイズ（KB、デフォルト: 1024）
+    第2引数: 繰り返し回数（デフォルト: 20）
+    """
+    print("リンクチェック判定ベンチマーク")
+    print("=" * 50)
+
+    pad_kb = 1024
+    iterations = 20
+    if len(sys.argv) > 1:
+        try:
+            pad_kb = int(sys.argv[1])
+        except ValueError:
+            print("警告: 無効なページサイズが指定されました。デフォルト値(1024KB)を使用します。")
+    if len(sys.argv) > 2:
+        try:
+            iterations = int(sys.argv[2])
+        except ValueError:
+            print("警告: 無効な繰り返し回数が指定されました。デフォルト値(20回)を使用します。")
+
+    run_benchmark(pad_kb, iterations)
+
+if __name__ == "__main__":
+    main()
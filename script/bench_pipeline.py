@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+アーカイブ取得パイプラインのベンチマーク
+合成したチャンネル（1k〜50k件）の記録データをreplayのメモリストアに載せ、
+ネットワークなしで以下の処理のスループットを計測します。
+  - process_video_entry（get_archives.py）
+  - save_to_json（新規作成・既存ファイルへのマージ）
+  - check_all_links（check_video_links.py）
+  - quick_check（check_video_links_fast.py）
+
+使用方法:
+  python script/bench_pipeline.py [動画数(カンマ区切り)] [対象ステージ(カンマ区切り)]
+  例: python script/bench_pipeline.py 1000,10000 process,save
+"""
+
+import os
+import sys
+import time
+import random
+import string
+import tempfile
+import contextlib
+import logging
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import replay
+
+STAGES = ('process', 'save', 'check', 'check_fast')
+CHANNEL_URL = 'https://www.youtube.com/@bench_channel'
+
+WATCH_PAGE_TEMPLATE = (
+    '<html><head><title>{title} - YouTube</title></head><body>'
+    '<div id="player-wrap"><ytd-watch-flexy></ytd-watch-flexy></div>'
+    '<script>var ytInitialPlayerResponse = {{"playabilityStatus":{{"status":"OK","playableInEmbed":true}}}};</script>'
+    '</body></html>'
+)
+
+def _video_id(rng):
+    return ''.join(rng.choice(string.ascii_letters + string.digits + '-_') for _ in range(11))
+
+def make_synthetic_channel(count, seed=0):
+    """
+    合成チャンネルのフラットエントリと記録データを作成
+
+    Args:
+        count (int): 動画数
+        seed (int): 乱数シード
+    Returns:
+        tuple: (エントリのリスト, FixtureStore)
+    """
+    rng = random.Random(seed)
+    store = replay.FixtureStore()
+    now = int(time.time())
+    entries = []
+    page = WATCH_PAGE_TEMPLATE.format(title='bench')
+    for i in range(count):
+        video_id = _video_id(rng)
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        title = f"【#ベンチ{i % 50}】合成配信 No.{i} #ななはぴ"
+        thumbnails = [
+            {'url': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg", 'resolution': '480x360'},
+            {'url': f"https://i.ytimg.com/vi/{video_id}/sddefault.jpg", 'resolution': '640x480'},
+            {'url': f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg"},
+        ]
+        entry = {'id': video_id, 'url': video_url, 'title': title, 'thumbnails': thumbnails}
+        released = now - (i + 1) * 3600
+        kind = rng.random()
+        if kind < 0.05:
+            # メンバー限定動画（ブラウジングで開始日時を取得する経路）
+            entry['availability'] = 'subscriber_only'
+            store.save('live_date', video_url, time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(released)))
+        elif kind < 0.07:
+            # 未放送枠
+            entry['release_timestamp'] = now + (i + 1) * 3600
+        else:
+            store.save('detail', video_url, {'info': {
+                'id': video_id,
+                'title': title,
+                'thumbnails': thumbnails,
+                'description': '合成された概要欄です。' * 10,
+                'release_timestamp': released,
+                'timestamp': released,
+            }})
+        store.save('http', f"GET {video_url}", {'status_code': 200, 'text': page})
+        entries.append(entry)
+    store.save('flat', f"{CHANNEL_URL}/streams", {'info': {'id': 'bench', 'entries': entries}})
+    return entries, store
+
+@contextlib.contextmanager
+def _quiet():
+    """ベンチマーク中の進捗出力を抑制"""
+    previous_level = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            yield
+        finally:
+            logging.disable(previous_level)
+
+def _measure(label, count, func):
+    start = time.perf_counter()
+    with _quiet():
+        func()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    print(f"  {label:<12} {count:>7d}件 {elapsed:8.3f}秒 {rate:12.1f}件/秒", flush=True)
+    return elapsed
+
+def run_benchmark(count, stages):
+    """
+    指定した動画数でベンチマークを実行
+
+    Args:
+        count (int): 動画数
+        stages (list): 実行するステージ
+    Returns:
+        dict: ステージごとの経過時間（秒）
+    """
+    import get_archives
+    import check_video_links
+    import check_video_links_fast
+
+    entries, store = make_synthetic_channel(count)
+    replay.configure(replay.MODE_REPLAY, store)
+    results = {}
+    print(f"📦 合成チャンネル: {count}件", flush=True)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = str(Path(tmp_dir) / 'archives_@bench_channel.json')
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)  # チェッカーのレポート出力先を一時ディレクトリにする
+        try:
+            # 後続ステージの入力になるため、process は常に実行する
+            videos = []
+            ydl_opts = get_archives.get_ydl_options()
+            def process():
+                videos.extend(get_archives.process_video_entry(entry, ydl_opts) for entry in entries)
+            results['process'] = _measure('process', count, process)
+            results['save_new'] = _measure('save(new)', count, lambda: get_archives.save_to_json(videos, output_file))
+            if 'save' in stages:
+                results['save_merge'] = _measure('save(merge)', count, lambda: get_archives.save_to_json(videos, output_file))
+            if 'check' in stages:
+                checker = check_video_links.VideoLinkChecker(archives_dir=tmp_dir, session=replay.ReplaySession(store))
+                results['check'] = _measure('check', count, lambda: checker.check_all_links(delay=0))
+            if 'check_fast' in stages:
+                checker = check_video_links_fast.FastVideoLinkChecker(archives_dir=tmp_dir, session=replay.ReplaySession(store))
+                results['check_fast'] = _measure('check_fast', count, lambda: checker.quick_check(sample_size=count, delay=0))
+        finally:
+            os.chdir(cwd)
+            replay.configure()
+    return results
+
+def main():
+    """
+    メイン関数
+    第1引数: 動画数（カンマ区切り、デフォルト: 1000,10000）
+    第2引数: 対象ステージ（カンマ区切り、デフォルト: 全ステージ）
+    """
+    print("パイプラインベンチマーク")
+    print("=" * 50)
+
+    counts = [1000, 10000]
+    stages = list(STAGES)
+    if len(sys.argv) > 1:
+        try:
+            counts = [int(c) for c in sys.argv[1].split(',') if c]
+        except ValueError:
+            print("警告: 無効な動画数が指定されました。デフォルト値(1000,10000)を使用します。")
+    if len(sys.argv) > 2:
+        stages = [s for s in sys.argv[2].split(',') if s in STAGES] or list(STAGES)
+
+    for count in counts:
+        run_benchmark(count, stages)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+詳細情報の取得プロファイルのベンチマーク
+アーカイブ内の動画を metadata（メタデータのみ）と full（通常の取得）の両方の設定で取得し、
+1動画あたりのHTTPリクエスト数・取得時間と、整形後の動画データが一致するかを比較します。
+YouTubeに接続するため、ネットワークのある環境で実行してください。
+
+使用方法:
+  python script/bench_ydl_profile.py [動画数] [動画ID ...]
+  例: python script/bench_ydl_profile.py 5
+"""
+
+import os
+import sys
+import glob
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import yt_dlp
+
+import get_archives
+from archive_utils import ARCHIVES_DIR, load_archive_items
+
+PROFILES = (get_archives.YDL_PROFILE_FULL, get_archives.YDL_PROFILE_METADATA)
+
+class CountingYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    HTTPリクエスト数を数えるYoutubeDL
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_count = 0
+
+    def urlopen(self, req):
+        self.request_count += 1
+        return super().urlopen(req)
+
+def sample_video_ids(count):
+    """
+    アーカイブからメンバー限定以外の動画IDを選ぶ
+
+    Args:
+        count (int): 動画数
+    Returns:
+        list: 動画IDのリスト
+    """
+    video_ids = []
+    for json_path in sorted(glob.glob(str(Path(ARCHIVES_DIR) / 'archives_*.json'))):
+        for item in load_archive_items(json_path):
+            if '#メン限' not in item.get('tags', []) and item.get('videoId'):
+                video_ids.append(item['videoId'])
+                break
+        if len(video_ids) >= count:
+            break
+    return video_ids
+
+def fetch(video_id, profile):
+    """
+    指定したプロファイルで詳細情報を取得
+
+    Args:
+        video_id (str): 動画ID
+        profile (str): 取得プロファイル
+    Returns:
+        tuple: (整形後の動画データ, リクエスト数, 秒数)
+    """
+    ydl_opts = get_archives.get_detail_ydl_options(get_archives.get_ydl_options(), profile)
+    start = time.perf_counter()
+    with CountingYoutubeDL(ydl_opts) as ydl:
+        video_info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+        requests = ydl.request_count
+    seconds = time.perf_counter() - start
+    video_data = get_archives.create_video_data_from_detailed_info(video_info, video_id) if video_info else None
+    return video_data, requests, seconds
+
+def main():
+    """
+    メイン関数
+    """
+    count = int(sys.argv[1]) if len(sys.argv) >= 2 else 5
+    video_ids = sys.argv[2:] or sample_video_ids(count)
+
+    print("🏎 詳細情報の取得プロファイルのベンチマーク")
+    print("=" * 50)
+    print(f"対象動画数: {len(video_ids)}")
+
+    totals = {profile: [0, 0.0] for profile in PROFILES}
+    mismatches = []
+    failures = []
+    for video_id in video_ids:
+        results = {}
+        for profile in PROFILES:
+            video_data, requests, seconds = fetch(video_id, profile)
+            results[profile] = video_data
+            totals[profile][0] += requests
+            totals[profile][1] += seconds
+            print(f"  {video_id} {profile:<9} {requests:3d}リクエスト {seconds:6.2f}秒", flush=True)
+        if None in results.values():
+            failures.append(video_id)
+        elif results[get_archives.YDL_PROFILE_FULL] != results[get_archives.YDL_PROFILE_METADATA]:
+            mismatches.append(video_id)
+
+    print("-" * 50)
+    for profile in PROFILES:
+        requests, seconds = totals[profile]
+        print(f"  {profile:<9} 1動画あたり {requests / len(video_ids):5.1f}リクエスト {seconds / len(video_ids):6.2f}秒")
+    if failures:
+        print(f"❌ 取得に失敗した動画があります: {', '.join(failures)}")
+    if mismatches:
+        print(f"❌ 整形後の動画データが一致しません: {', '.join(mismatches)}")
+    if failures or mismatches:
+        sys.exit(1)
+    print("✅ 整形後の動画データはすべて一致しました")
+
+if __name__ == "__main__":
+    main()
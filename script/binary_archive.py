@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+アーカイブのバイナリ形式（.nhb）
+公開用のJSON（docs/src/archives_@*.json）とは別に、ツール向けの固定長レコード＋文字列テーブル形式を
+.nanahapi/archives/ に保存します。mmapで開いてJSONを解析せずに任意のレコードを読み出せます。
+
+ファイル構成（リトルエンディアン）:
+  ヘッダー   : マジック(4s) バージョン(H) 予約(H) レコード数(I) 元JSONのサイズ(Q) 元JSONの更新時刻ns(Q) 文字列テーブル位置(Q)
+  レコード   : videoId(16s) upload_ts(q) フラグ(I) 文字列参照(位置I・長さI)×5
+               文字列参照の順: title, video_url, image, upload_date, tags（改行区切り）
+  文字列     : UTF-8の文字列を連結したもの
+
+使用方法:
+  python script/binary_archive.py   全アーカイブのバイナリ形式を作成して読み込み時間を比較
+"""
+
+import os
+import sys
+import mmap
+import glob
+import time
+import struct
+import tempfile
+from pathlib import Path
+
+from archive_utils import ARCHIVES_DIR, load_archive_items
+from local_state import state_path
+
+MAGIC = b'NHB1'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQQQ')
+RECORD = struct.Struct('<16sqI' + 'II' * 5)
+STRING_FIELDS = ('title', 'video_url', 'image', 'upload_date', 'tags')
+
+NO_TIMESTAMP = -(1 << 63)  # upload_tsが不明な場合の値
+
+FLAG_MEMBERS_ONLY = 1 << 0  # メン限
+FLAG_HAS_TIMESTAMP = 1 << 1  # upload_tsあり
+
+def binary_path(json_path):
+    """
+    アーカイブJSONに対応するバイナリ形式のパスを取得
+
+    Args:
+        json_path (str or Path): アーカイブJSONのパス
+    Returns:
+        Path: バイナリ形式のパス
+    """
+    return state_path('archives', Path(json_path).stem + '.nhb')
+
+def _source_stamp(json_path):
+    stat = os.stat(json_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def write_binary_archive(items, json_path, path=None):
+    """
+    動画情報のリストをバイナリ形式で保存（一時ファイル経由で置き換える）
+    元JSONのサイズと更新時刻を記録し、読み込み時に古いファイルを検出できるようにする
+
+    Args:
+        items (list): 動画情報のリスト（アーカイブJSONのitems）
+        json_path (str or Path): 保存済みのアーカイブJSONのパス
+        path (str or Path): 出力先（デフォルト: binary_path(json_path)）
+    Returns:
+        Path: 出力先
+    """
+    path = Path(path) if path else binary_path(json_path)
+    strings = bytearray()
+    records = bytearray()
+    for item in items:
+        refs = []
+        for field in STRING_FIELDS:
+            value = item.get(field)
+            if field == 'tags':
+                value = '\n'.join(value or [])
+            data = str(value or '').encode('utf-8')
+            refs.extend((len(strings), len(data)))
+            strings += data
+        upload_ts = item.get('upload_ts')
+        flags = 0
+        if '#メン限' in item.get('tags', []):
+            flags |= FLAG_MEMBERS_ONLY
+        if upload_ts is not None:
+            flags |= FLAG_HAS_TIMESTAMP
+        records += RECORD.pack(
+            str(item.get('videoId', '')).encode('ascii', 'replace'),
+            NO_TIMESTAMP if upload_ts is None else int(upload_ts),
+            flags,
+            *refs,
+        )
+
+    size, mtime_ns = _source_stamp(json_path)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(items), size, mtime_ns, HEADER.size + len(records))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(records)
+            f.write(strings)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+class BinaryArchive:
+    """
+    mmapで開いたバイナリ形式のアーカイブ
+    レコードは読み出した時点で必要な項目だけを変換する
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, self.count, self.source_size, self.source_mtime_ns, self._strings = HEADER.unpack_from(self._buf, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"未対応の形式です: {self.path}")
+        except Exception:
+            self._buf.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._buf.close()
+
+    def is_fresh(self, json_path):
+        """
+        元のアーカイブJSONから作成した後に変更されていないか確認
+
+        Args:
+            json_path (str or Path): アーカイブJSONのパス
+        Returns:
+            bool: 変更されていない場合True
+        """
+        try:
+            return _source_stamp(json_path) == (self.source_size, self.source_mtime_ns)
+        except OSError:
+            return False
+
+    def _record(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self._buf, HEADER.size + index * RECORD.size)
+
+    def _string(self, offset, length):
+        start = self._strings + offset
+        return self._buf[start:start + length].decode('utf-8')
+
+    def video_id(self, index):
+        """
+        動画IDを取得
+
+        Args:
+            index (int): レコード番号
+        Returns:
+            str: 動画ID
+        """
+        return self._record(index)[0].rstrip(b'\0').decode('ascii')
+
+    def upload_ts(self, index):
+        """
+        アップロード日時のエポック秒を取得
+
+        Args:
+            index (int): レコード番号
+        Returns:
+            int: エポック秒（不明な場合はNone）
+        """
+        upload_ts = self._record(index)[1]
+        return None if upload_ts == NO_TIMESTAMP else upload_ts
+
+    def flags(self, index):
+        """
+        フラグを取得
+
+        Args:
+            index (int): レコード番号
+        Returns:
+            int: FLAG_* の組み合わせ
+        """
+        return self._record(index)[2]
+
+    def tags(self, index):
+        """
+        タグのリストを取得
+
+        Args:
+            index (int): レコード番号
+        Returns:
+            list: タグのリスト
+        """
+        refs = self._record(index)[3:]
+        i = STRING_FIELDS.index('tags')
+        value = self._string(refs[i * 2], refs[i * 2 + 1])
+        return value.split('\n') if value else []
+
+    def __getitem__(self, index):
+        """
+        レコードをアーカイブJSONと同じ形式の辞書で取得
+        """
+        record = self._record(index)
+        item = {
+            'videoId': record[0].rstrip(b'\0').decode('ascii'),
+            'upload_ts': None if record[1] == NO_TIMESTAMP else record[1],
+        }
+        refs = record[3:]
+        for i, field in enumerate(STRING_FIELDS):
+            item[field] = self._string(refs[i * 2], refs[i * 2 + 1])
+        item['tags'] = item['tags'].split('\n') if item['tags'] else []
+        return item
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+def open_binary_archive(json_path):
+    """
+    アーカイブJSONに対応するバイナリ形式を開く
+
+    Args:
+        json_path (str or Path): アーカイブJSONのパス
+    Returns:
+        BinaryArchive: 開いたアーカイブ（存在しない・元JSONより古い・壊れている場合はNone）
+    """
+    path = binary_path(json_path)
+    if not path.exists():
+        return None
+    try:
+        archive = BinaryArchive(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if not archive.is_fresh(json_path):
+        archive.close()
+        return None
+    return archive
+
+def main():
+    """
+    メイン関数
+    全アーカイブのバイナリ形式を作成し、JSONとの読み込み時間を比較する
+    """
+    print("🗜 アーカイブのバイナリ形式を作成")
+    print("=" * 50)
+
+    json_seconds = 0.0
+    binary_seconds = 0.0
+    for json_path in sorted(glob.glob(str(Path(ARCHIVES_DIR) / 'archives_*.json'))):
+        start = time.perf_counter()
+        items = load_archive_items(json_path)
+        json_seconds += time.perf_counter() - start
+
+        path = write_binary_archive(items, json_path)
+
+        start = time.perf_counter()
+        with BinaryArchive(path) as archive:
+            ids = [archive.video_id(i) for i in range(len(archive))]
+        binary_seconds += time.perf_counter() - start
+
+        if ids != [item.get('videoId', '') for item in items]:
+            print(f"❌ 動画IDが一致しません: {path}")
+            sys.exit(1)
+        json_kb = os.path.getsize(json_path) / 1024
+        binary_kb = path.stat().st_size / 1024
+        print(f"  {Path(json_path).name:<36} {len(items):6d}件  {json_kb:8.1f}KB → {binary_kb:8.1f}KB")
+
+    print(f"⏱ JSONの読み込み: {json_seconds * 1000:.1f}ms / バイナリ形式の全ID読み出し: {binary_seconds * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    main()
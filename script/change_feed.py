@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+アーカイブの変更フィード
+save_to_jsonで追加・更新・消失した動画を、アーカイブと同じディレクトリの
+changes/YYYY-MM-DD.jsonl（日付はJST）に日別のJSON Linesとして追記します。
+利用側はアーカイブ全体を比較せずに、前回同期以降の日付のファイルだけを読めば差分を取り込めます。
+
+1行ごとの形式:
+  {"time": "2026-08-23T06:33:18+09:00", "file": "archives_@koyuchan_.json",
+   "videoId": "TUt6IYanzQg", "op": "added" | "updated" | "removed" | "restored", "fields": {...}}
+  fields: added は動画データ全体、updated は変更された項目の新しい値、removed / restored は空
+
+一覧から消えた動画はアーカイブの動画データに "removed": true を付けて記録します（再び現れたら外します）。
+コミットされたアーカイブ自体に残るため、新しいチェックアウトやCIでも同じ消失を繰り返し出力しません。
+"""
+
+import json
+from pathlib import Path
+from datetime import datetime
+
+from archive_utils import JST
+
+CHANGES_DIR_NAME = 'changes'  # アーカイブファイルのディレクトリ内の出力先
+REMOVED_FIELD = 'removed'  # 一覧から消えた動画に付けるアーカイブの項目
+
+OP_ADDED = 'added'
+OP_UPDATED = 'updated'
+OP_REMOVED = 'removed'
+OP_RESTORED = 'restored'
+
+def make_change(archive_file, video_id, op, fields=None):
+    """
+    変更レコードを作成
+
+    Args:
+        archive_file (str): アーカイブファイル名
+        video_id (str): 動画ID
+        op (str): 変更の種類
+        fields (dict): 変更された項目
+    Returns:
+        dict: 変更レコード
+    """
+    return {
+        'time': datetime.now(JST).isoformat(timespec='seconds'),
+        'file': archive_file,
+        'videoId': video_id,
+        'op': op,
+        'fields': fields or {},
+    }
+
+def track_listing(archive_file, archive_index, listed_ids):
+    """
+    全件取得の結果から消失・復活した動画の変更レコードを作成
+    消失はアーカイブの動画データの REMOVED_FIELD で判断・記録し、同じ消失を繰り返し出力しない
+
+    Args:
+        archive_file (str): アーカイブファイル名
+        archive_index (dict): 動画ID → アーカイブ内の動画データのリスト（REMOVED_FIELD が更新される）
+        listed_ids (set): チャンネルの一覧で見つかった動画ID
+    Returns:
+        list: 変更レコードのリスト
+    """
+    changes = []
+    for video_id, videos in archive_index.items():
+        removed = any(v.get(REMOVED_FIELD) for v in videos)
+        if video_id in listed_ids:
+            if removed:
+                for v in videos:
+                    v.pop(REMOVED_FIELD, None)
+                changes.append(make_change(archive_file, video_id, OP_RESTORED))
+        elif not removed:
+            for v in videos:
+                v[REMOVED_FIELD] = True
+            changes.append(make_change(archive_file, video_id, OP_REMOVED))
+    return changes
+
+def append_changes(changes, archives_dir):
+    """
+    変更レコードを日別のJSON Linesファイルに追記
+
+    Args:
+        changes (list): 変更レコードのリスト
+        archives_dir (str): アーカイブファイルのディレクトリ
+    Returns:
+        Path: 追記したファイル（変更がない場合はNone）
+    """
+    if not changes:
+        return None
+    feed_path = Path(archives_dir) / CHANGES_DIR_NAME / f"{datetime.now(JST).strftime('%Y-%m-%d')}.jsonl"
+    feed_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(feed_path, 'a', encoding='utf-8') as f:
+        for change in changes:
+            f.write(json.dumps(change, ensure_ascii=False) + "\n")
+    return feed_path
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+チャンネルフィードによる更新の事前確認
+YouTubeの公開フィード（feeds/videos.xml、最新15件程度のAtom）を取得してアーカイブの動画と比較し、
+新しい動画・タイトルの変更・確定していない枠がなければ yt-dlp でのチャンネル巡回を省略します。
+フィードを取得できない場合は変更ありとみなし、通常どおり巡回します。
+フィードに載らないメンバー限定動画を取りこぼさないよう、前回の巡回から MAX_SKIP_SECONDS が経った場合も巡回します。
+
+チャンネルID（UC...）はハンドル（@...）のチャンネルページから一度だけ調べ、.nanahapi/channel_ids.json に保存します。
+
+環境変数:
+  NANAHAPI_FEED_PRECHECK  0 で事前確認を無効化
+"""
+
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+
+from archive_utils import load_archive_items, parse_upload_dates
+from local_state import load_state_json, save_state_json
+
+FEED_URL = 'https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}'
+CHANNEL_URL = 'https://www.youtube.com/{handle}'
+CHANNEL_IDS_FILE = 'channel_ids.json'
+CRAWL_STATE_FILE = 'channel_crawl_state.json'
+
+NAMESPACES = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'yt': 'http://www.youtube.com/xml/schemas/2015',
+}
+
+CHANNEL_ID_PATTERNS = (
+    re.compile(r'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[\w-]{22})"'),
+    re.compile(r'"externalId":"(UC[\w-]{22})"'),
+    re.compile(r'"channelId":"(UC[\w-]{22})"'),
+)
+
+# 配信・アップロードからこの時間が経つまでは開始日時やタイトルが確定していないとみなす（秒）
+SETTLE_SECONDS = 24 * 60 * 60
+# 事前確認で巡回を省略し続けられる最大の時間（秒）
+MAX_SKIP_SECONDS = 6 * 60 * 60
+
+def is_enabled():
+    """
+    事前確認が有効か確認
+
+    Returns:
+        bool: 有効な場合True
+    """
+    return os.getenv('NANAHAPI_FEED_PRECHECK', '1').strip() != '0'
+
+def parse_feed(xml_text):
+    """
+    チャンネルフィード（Atom）を解析
+
+    Args:
+        xml_text (str or bytes): フィードのXML
+    Returns:
+        list: {"videoId", "title", "published"} のリスト（フィードの順）
+    Raises:
+        ValueError: XMLとして解析できない・Atomフィードでない場合
+    """
+    try:
+        root = ET.fromstring(xml_text)
+    except ET.ParseError as e:
+        raise ValueError(f"フィードを解析できません: {e}") from e
+    if root.tag != f"{{{NAMESPACES['atom']}}}feed":
+        raise ValueError(f"Atomフィードではありません: {root.tag}")
+    entries = []
+    for entry in root.findall('atom:entry', NAMESPACES):
+        video_id = entry.findtext('yt:videoId', default='', namespaces=NAMESPACES).strip()
+        if not video_id:
+            continue
+        entries.append({
+            'videoId': video_id,
+            'title': entry.findtext('atom:title', default='', namespaces=NAMESPACES),
+            'published': entry.findtext('atom:published', default='', namespaces=NAMESPACES),
+        })
+    return entries
+
+def find_changes(entries, items, now=None):
+    """
+    フィードの動画とアーカイブの動画を比較
+
+    Args:
+        entries (list): parse_feed() の戻り値
+        items (list): アーカイブの動画情報のリスト
+        now (float): 現在時刻のエポック秒（テスト用）
+    Returns:
+        list: 変更の説明のリスト（空なら変更なし）
+    """
+    now = time.time() if now is None else now
+    index = {item.get('videoId'): item for item in items}
+    upload_ts = dict(zip(index, parse_upload_dates([item.get('upload_date') for item in index.values()])))
+    changes = []
+    for entry in entries:
+        video_id = entry['videoId']
+        item = index.get(video_id)
+        if item is None:
+            changes.append(f"新しい動画: {video_id}")
+        elif entry['title'] and entry['title'] != item.get('title'):
+            changes.append(f"タイトルの変更: {video_id}")
+        elif upload_ts[video_id] is None or upload_ts[video_id] > now - SETTLE_SECONDS:
+            changes.append(f"確定していない枠: {video_id}")
+    return changes
+
+def resolve_channel_id(handle):
+    """
+    ハンドルからチャンネルIDを取得（保存済みならチャンネルページを開かない）
+
+    Args:
+        handle (str): チャンネルのハンドル（@...）またはチャンネルID
+    Returns:
+        str: チャンネルID（取得できない場合はNone）
+    """
+    if re.fullmatch(r'UC[\w-]{22}', handle):
+        return handle
+    channel_ids = load_state_json(CHANNEL_IDS_FILE, {})
+    if handle in channel_ids:
+        return channel_ids[handle]
+    import net  # requestsは事前確認を行う場合だけ読み込む
+    response = net.http_session().get(CHANNEL_URL.format(handle=handle))
+    if response.status_code != 200:
+        return None
+    for pattern in CHANNEL_ID_PATTERNS:
+        match = pattern.search(response.text)
+        if match:
+            channel_ids[handle] = match.group(1)
+            save_state_json(CHANNEL_IDS_FILE, channel_ids)
+            return match.group(1)
+    return None
+
+def fetch_feed(channel_id):
+    """
+    チャンネルフィードを取得して解析
+
+    Args:
+        channel_id (str): チャンネルID
+    Returns:
+        list: parse_feed() の戻り値（取得できない場合はNone）
+    """
+    import net
+    response = net.http_session().get(FEED_URL.format(channel_id=channel_id))
+    if response.status_code != 200:
+        return None
+    return parse_feed(response.content)
+
+def record_crawl(handle):
+    """
+    yt-dlpでチャンネルを巡回した時刻を記録
+
+    Args:
+        handle (str): チャンネルのハンドル（@...）
+    """
+    state = load_state_json(CRAWL_STATE_FILE, {})
+    state[handle] = time.time()
+    save_state_json(CRAWL_STATE_FILE, state)
+
+def channel_unchanged(handle, archive_file):
+    """
+    チャンネルフィードで、アーカイブに反映していない変更がないか確認
+
+    Args:
+        handle (str): チャンネルのハンドル（@...）
+        archive_file (str): アーカイブファイルのパス
+    Returns:
+        bool: 変更がないと確認できた場合True（確認できない場合はFalse）
+    """
+    if not os.path.exists(archive_file):
+        return False
+    last_crawl = load_state_json(CRAWL_STATE_FILE, {}).get(handle)
+    if last_crawl is None or time.time() - last_crawl > MAX_SKIP_SECONDS:
+        return False
+    try:
+        channel_id = resolve_channel_id(handle)
+        if channel_id is None:
+            print(f"⚠️  チャンネルIDを取得できませんでした: {handle}", flush=True)
+            return False
+        entries = fetch_feed(channel_id)
+    except Exception as e:
+        print(f"⚠️  チャンネルフィードを確認できませんでした: {str(e)}", flush=True)
+        return False
+    if not entries:
+        print("⚠️  チャンネルフィードを取得できませんでした", flush=True)
+        return False
+    changes = find_changes(entries, load_archive_items(archive_file))
+    if changes:
+        print(f"📡 チャンネルフィードで変更を検出: {', '.join(changes[:3])}{' ほか' if len(changes) > 3 else ''}", flush=True)
+        return False
+    print(f"📡 チャンネルフィードの最新{len(entries)}件はすべてアーカイブに反映済みです", flush=True)
+    return True
@@ -3,6 +3,13 @@
 動画URLリンク切れチェックスクリプト
 docs/src/archives_*.jsonのitems[].video_urlをチェックして
 リンク切れの動画を検出します。
+チェック結果は1件ごとに .nanahapi/link_check_checkpoint.jsonl に追記し、
+中断した場合は --resume で続きから再開できます。
+--adaptive を付けると、リクエスト間隔の代わりにレスポンスに応じて並列数を自動調整します（adaptive_concurrency.py）。
+環境変数 NANAHAPI_PROFILE を指定するとプロファイルを .nanahapi/profiles/ に保存します（profiling.py）。
+
+使用方法:
+  python script/check_video_links.py [リクエスト間隔(秒)] [各ファイルの件数] [--resume] [--adaptive]
 """
 
 import json
@@ -15,14 +22,33 @@ import logging
 from urllib.parse import urlparse, parse_qs
 import sys
 
+import net
+import profiling
+import availability
+import adaptive_concurrency
+from link_classifier import classify_watch_page, login_required_message
+from local_state import state_path, write_json_atomic
+
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_FILE = 'link_check_checkpoint.jsonl'
+
 class VideoLinkChecker:
-    def __init__(self, archives_dir: str = "docs/src"):
+    def __init__(self, archives_dir: str = "docs/src", session=None, checkpoint_path=None):
         self.archives_dir = Path(archives_dir)
+        # チェック結果を1件ごとに追記するチェックポイント
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else state_path(CHECKPOINT_FILE)
+        # 共有HTTPセッション（記録／再生モードではreplayのセッションに切り替わる）
+        self.session = session or net.http_session()
         self.broken_links = []
+        # チェックし直してもレート制限・接続エラーで状態を判断できなかった動画（--adaptive のみ）
+        self.unconfirmed_links = []
+        # 並列数のコントローラ（--adaptive のみ）
+        self.controller = None
+        # 公開状態ファイルに反映する (videoId, is_valid, status_code, error_msg)
+        self.availability_results = []
         self.checked_count = 0
         self.total_count = 0
         
@@ -33,9 +59,9 @@ class VideoLinkChecker:
         archives = {}
         pattern = self.archives_dir / "archives_*.json"
         
-        for file_path in glob.glob(str(pattern)):
+        for file_path in sorted(glob.glob(str(pattern))):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with open(file_path, 'r', encoding='utf-8') as f, profiling.hot_section('load_archive'):
                     data = json.load(f)
                     file_name = Path(file_path).name
                     archives[file_name] = data.get('items', [])
@@ -51,25 +77,26 @@ class VideoLinkChecker:
         YouTubeの削除・非公開動画も検知
         Returns: (is_valid, status_code, error_message)
         """
-        try:
-            if "youtube.com" in url or "youtu.be" in url:
-                return self._check_youtube_video(url)
-            else:
-                # YouTube以外のURL
-                response = requests.head(url, timeout=10, allow_redirects=True)
-                if response.status_code < 400:
-                    return True, response.status_code, ""
+        with profiling.hot_section('check_video_url'):
+            try:
+                if "youtube.com" in url or "youtu.be" in url:
+                    return self._check_youtube_video(url)
                 else:
-                    return False, response.status_code, f"HTTP {response.status_code}"
+                    # YouTube以外のURL
+                    response = self.session.head(url, timeout=10, allow_redirects=True)
+                    if response.status_code < 400:
+                        return True, response.status_code, ""
+                    else:
+                        return False, response.status_code, f"HTTP {response.status_code}"
                     
-        except requests.exceptions.Timeout:
-            return False, 0, "タイムアウト"
-        except requests.exceptions.ConnectionError:
-            return False, 0, "接続エラー"
-        except requests.exceptions.RequestException as e:
-            return False, 0, f"リクエストエラー: {str(e)}"
-        except Exception as e:
-            return False, 0, f"予期しないエラー: {str(e)}"
+            except requests.exceptions.Timeout:
+                return False, 0, "タイムアウト"
+            except requests.exceptions.ConnectionError:
+                return False, 0, "接続エラー"
+            except requests.exceptions.RequestException as e:
+                return False, 0, f"リクエストエラー: {str(e)}"
+            except Exception as e:
+                return False, 0, f"予期しないエラー: {str(e)}"
     
     def _check_youtube_video(self, url: str, retry_count: int = 0) -> Tuple[bool, int, str]:
         """
@@ -78,13 +105,8 @@ class VideoLinkChecker:
         LOGIN_REQUIREDの場合は最大3回リトライ
         """
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8'
-            }
-            
             # まずHEADリクエストで基本チェック
-            head_response = requests.head(url, headers=headers, timeout=10, allow_redirects=True)
+            head_response = self.session.head(url, timeout=10, allow_redirects=True)
             
             # 明らかなエラーステータス
             if head_response.status_code == 404:
@@ -93,85 +115,22 @@ class VideoLinkChecker:
                 return False, head_response.status_code, f"サーバーエラー ({head_response.status_code})"
             
             # GETリクエストでページ内容をチェック
-            response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
+            response = self.session.get(url, timeout=15, allow_redirects=True)
             
             if response.status_code != 200:
                 return False, response.status_code, f"HTTP {response.status_code}"
             
             # ページ内容から問題を検出
-            content = response.text.lower()
-            
-            # YouTubeのplayabilityStatusを確認（最も確実な方法）
-            import re
-            playability_pattern = r'"playabilitystatus":\{.*?"status":"([^"]*?)"'
-            playability_match = re.search(playability_pattern, content)
-            if playability_match:
-                status = playability_match.group(1).upper()
-                if status in ['LOGIN_REQUIRED', 'UNPLAYABLE', 'ERROR']:
-                    # メンバー限定動画かチェック
-                    member_patterns = ['members-only', 'membership', 'メンバー限定', 'メンバーシップ']
-                    is_member_only = any(pattern in content for pattern in member_patterns)
-                    
-                    if status == 'LOGIN_REQUIRED':
-                        # LOGIN_REQUIREDの場合は最大3回リトライ
-                        if retry_count < 2:
-                            time.sleep(10)  # 10秒待機してからリトライ
-                            return self._check_youtube_video(url, retry_count + 1)
-                        else:
-                            return False, response.status_code, f"非公開動画: status={status} (3回リトライ後)"
-                    elif status == 'UNPLAYABLE':
-                        if is_member_only:
-                            return True, response.status_code, ""  # メンバー限定動画は正常とみなす
-                        else:
-                            return False, response.status_code, f"再生不可能な動画: status={status}"
-                    elif status == 'ERROR':
-                        return False, response.status_code, f"動画エラー（削除済みの可能性）: status={status}"
-            
-            # 削除された動画のパターン
-            deleted_patterns = [
-                'video unavailable',
-                'this video is no longer available',
-                'this video has been removed',
-                'video removed',
-                'deleted video'
-            ]
-            
-            # 非公開動画のパターン
-            private_patterns = [
-                'this video is private',
-                'private video',
-                'this video is unavailable'
-            ]
-            
-            # 地域制限のパターン
-            region_patterns = [
-                'not available in your country',
-                'video not available',
-                'blocked in your country'
-            ]
-            
-            # チェック実行
-            for pattern in deleted_patterns:
-                if pattern in content:
-                    return False, response.status_code, f"動画が削除されています: {pattern}"
-            
-            for pattern in private_patterns:
-                if pattern in content:
-                    return False, response.status_code, f"非公開動画: {pattern}"
-            
-            for pattern in region_patterns:
-                if pattern in content:
-                    return False, response.status_code, f"地域制限: {pattern}"
-            
-            # 正常な動画ページの兆候をチェック
-            if any(indicator in content for indicator in ['ytd-watch-flexy', 'watch-main-col', 'player-wrap']):
-                return True, response.status_code, ""
-            
-            # 動画プレイヤーが見つからない場合は問題の可能性
-            if 'player' not in content and 'video' not in content:
-                return False, response.status_code, "動画プレイヤーが見つかりません（問題の可能性）"
-            
-            return True, response.status_code, ""
+            with profiling.hot_section('classify_watch_page'):
+                verdict = classify_watch_page(response.content)
+            if verdict.kind == 'login_required' and self.controller is None:
+                # LOGIN_REQUIREDの場合は最大3回リトライ（--adaptive ではコントローラが待機してチェックし直す）
+                if retry_count < 2:
+                    time.sleep(10)  # 10秒待機してからリトライ
+                    return self._check_youtube_video(url, retry_count + 1)
+                else:
+                    return False, response.status_code, login_required_message(verdict.status)
+            return verdict.is_valid, response.status_code, verdict.message
             
         except requests.exceptions.Timeout:
             return False, 0, "タイムアウト"
@@ -180,10 +139,50 @@ class VideoLinkChecker:
         except Exception as e:
             return False, 0, f"チェックエラー: {str(e)}"
     
-    def check_all_links(self, delay: float = 1.0, limit: int = None):
+    def _load_checkpoint(self, limit) -> Dict[Tuple[str, str], Dict]:
+        """
+        前回のチェックポイントから確認済みの結果を読み込む
+        件数制限が異なる実行のチェックポイントは使わない
+        """
+        results = {}
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return results
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 書き込み途中で中断された行は無視する
+                continue
+            if 'run' in record:
+                if record['run'].get('limit') != limit:
+                    logger.warning("件数制限が異なるチェックポイントのため最初からチェックします")
+                    return {}
+                continue
+            results[(record['file'], record['video_url'])] = record
+        return results
+
+    def _start_checkpoint(self, limit, resume: bool):
+        """
+        チェックポイントを開く（再開しない場合は作り直す）
+        """
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        self._checkpoint = open(self.checkpoint_path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._write_checkpoint({'run': {'limit': limit, 'started_at': time.strftime('%Y-%m-%dT%H:%M:%S')}})
+
+    def _write_checkpoint(self, record: Dict):
+        self._checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._checkpoint.flush()
+
+    def check_all_links(self, delay: float = 1.0, limit: int = None, resume: bool = False, adaptive: bool = False):
         """
         すべての動画URLをチェック
         limit: 各ファイルから最新N件だけチェックする場合の件数
+        resume: チェックポイントに記録済みの動画をチェックせずに前回の結果を使う
+        adaptive: リクエスト間隔の代わりに並列数を自動調整してチェックする
         """
         logger.info("アーカイブファイルを読み込み中...")
         archives = self.load_archives()
@@ -204,14 +203,43 @@ class VideoLinkChecker:
         else:
             logger.info(f"総チェック対象件数: {self.total_count}")
         
+        checkpoint = self._load_checkpoint(limit) if resume else {}
+        if resume:
+            logger.info(f"チェックポイントから再開します: 確認済み {len(checkpoint)} 件")
+        self._start_checkpoint(limit, resume=bool(checkpoint))
+        
         print("="*80)
         print("動画URLリンク切れチェック開始")
         print("="*80)
         
+        if adaptive:
+            self.controller = adaptive_concurrency.AIMDController()
+            logger.info(f"並列数を自動調整してチェックします（最大 {int(self.controller.maximum)} 並列）")
+        try:
+            self._check_archives(archives, checkpoint, delay, self.controller)
+        finally:
+            self._checkpoint.close()
+        
+        self._print_summary()
+        self._save_report()
+        self._save_availability()
+        if self.unconfirmed_links:
+            # 未確認の動画が残っているので、--resume で確認済みの動画を飛ばしてチェックし直せるようにする
+            print(f"⏳ レート制限・接続エラーで未確認の動画が {len(self.unconfirmed_links)} 件あります。--resume を付けて実行するとその動画だけチェックし直します")
+            return
+        # すべてチェックできたのでチェックポイントは不要
+        self.checkpoint_path.unlink(missing_ok=True)
+    
+    def _check_archives(self, archives: Dict[str, List[Dict]], checkpoint: Dict, delay: float, controller=None):
+        """
+        アーカイブの動画URLを順にチェック（チェックポイントに結果がある動画は再利用）
+        controllerを指定した場合は並列数を自動調整しながら並列にチェック
+        """
         for archive_file, items in archives.items():
             print(f"📁 {archive_file}")
             print("-" * 60)
             
+            pending = []  # 並列にチェックする (video_url, (idx, item))
             for idx, item in enumerate(items, 1):
                 video_url = item.get('video_url', '')
                 title = item.get('title', '無題')
@@ -231,28 +259,88 @@ class VideoLinkChecker:
                 self.checked_count += 1
                 progress = (self.checked_count / self.total_count) * 100
                 
+                previous = checkpoint.get((archive_file, video_url))
+                if previous:
+                    is_valid, status_code, error_msg = previous['is_valid'], previous['status_code'], previous['error']
+                    self.availability_results.append((item.get('videoId'), is_valid, status_code, error_msg))
+                    if not is_valid:
+                        self.broken_links.append({
+                            'file': archive_file,
+                            'title': title,
+                            'video_url': video_url,
+                            'upload_date': upload_date,
+                            'error': error_msg
+                        })
+                    continue
+                
+                if controller:
+                    pending.append((video_url, (idx, item)))
+                    continue
+                
                 print(f"  🔍 [{idx:3d}] チェック中... ({progress:.1f}%)", end='', flush=True)
                 
                 is_valid, status_code, error_msg = self.check_video_url(video_url)
-                
-                if is_valid:
-                    print(f"  ✅ [{idx:3d}] OK ({status_code}) - {title[:40]}...")
-                else:
-                    print(f"  ❌ [{idx:3d}] NG ({error_msg}) - {title[:40]}...")
-                    self.broken_links.append({
-                        'file': archive_file,
-                        'title': title,
-                        'video_url': video_url,
-                        'upload_date': upload_date,
-                        'error': error_msg
-                    })
+                self._record_result(archive_file, idx, item, is_valid, status_code, error_msg)
                 
                 # レート制限対応
                 if delay > 0:
                     time.sleep(delay)
+            
+            if pending:
+                self._check_pending(archive_file, pending, controller)
+    
+    def _check_pending(self, archive_file: str, pending: List, controller):
+        """
+        並列数を自動調整しながら動画URLをチェック（結果は終わった順に表示）
+        チェックし直してもレート制限・接続エラーだった動画はリンク切れとせず未確認として残し、
+        ログイン必須のままだった動画は逐次チェックと同じく非公開動画として記録する
+        """
+        done = self.checked_count - len(pending)
+        for (idx, item), (is_valid, status_code, error_msg), unconfirmed in adaptive_concurrency.check_concurrently(
+                pending, self.check_video_url, controller):
+            done += 1
+            status = f"[{done / self.total_count * 100:5.1f}% {controller.describe()}]"
+            if unconfirmed:
+                print(f"  ⏳ [{idx:3d}] 未確認 ({error_msg}) - {item.get('title', '無題')[:40]}... {status}")
+                self.unconfirmed_links.append({
+                    'file': archive_file,
+                    'title': item.get('title', '無題'),
+                    'video_url': item.get('video_url', ''),
+                    'upload_date': item.get('upload_date', '不明'),
+                    'error': error_msg
+                })
+                continue
+            if adaptive_concurrency.LOGIN_REQUIRED_MARKER in error_msg:
+                error_msg = login_required_message('LOGIN_REQUIRED')
+            self._record_result(archive_file, idx, item, is_valid, status_code, error_msg, status)
+    
+    def _record_result(self, archive_file: str, idx: int, item: Dict, is_valid: bool, status_code: int, error_msg: str, status: str = ''):
+        """
+        チェック結果を表示してチェックポイント・公開状態・問題URLに反映
+        """
+        video_url = item.get('video_url', '')
+        title = item.get('title', '無題')
+        self.availability_results.append((item.get('videoId'), is_valid, status_code, error_msg))
+        self._write_checkpoint({
+            'file': archive_file,
+            'video_url': video_url,
+            'is_valid': is_valid,
+            'status_code': status_code,
+            'error': error_msg,
+        })
         
-        self._print_summary()
-        self._save_report()
+        suffix = f" {status}" if status else ""
+        if is_valid:
+            print(f"  ✅ [{idx:3d}] OK ({status_code}) - {title[:40]}...{suffix}")
+        else:
+            print(f"  ❌ [{idx:3d}] NG ({error_msg}) - {title[:40]}...{suffix}")
+            self.broken_links.append({
+                'file': archive_file,
+                'title': title,
+                'video_url': video_url,
+                'upload_date': item.get('upload_date', '不明'),
+                'error': error_msg
+            })
     
     def _print_summary(self):
         """
@@ -263,8 +351,12 @@ class VideoLinkChecker:
         print("="*80)
         
         print(f"総チェック件数: {self.total_count}")
-        print(f"正常URL: {self.total_count - len(self.broken_links)}")
+        print(f"正常URL: {self.total_count - len(self.broken_links) - len(self.unconfirmed_links)}")
         print(f"問題URL: {len(self.broken_links)}")
+        if self.unconfirmed_links:
+            print(f"未確認（レート制限・接続エラー）: {len(self.unconfirmed_links)}")
+        if self.controller:
+            print(f"レート制限の兆候: {self.controller.throttled_count}回 / 最終の並列数: {self.controller.concurrency}")
         
         if self.broken_links:
             print("❌ 問題のあるURL一覧:")
@@ -279,6 +371,14 @@ class VideoLinkChecker:
         else:
             print("✅ すべてのURLが正常です！")
     
+    def _save_availability(self):
+        """
+        チェック結果を動画ごとの公開状態（availability.json）に反映
+        """
+        updated = availability.update_availability(self.availability_results, self.archives_dir)
+        if updated:
+            print(f"📋 公開状態を更新しました: {updated}件 ({availability.availability_path(self.archives_dir)})")
+
     def _save_report(self):
         """
         チェック結果をJSONファイルに保存
@@ -291,8 +391,15 @@ class VideoLinkChecker:
             }
             
             report_path = 'broken_video_links_report.json'
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
+            # 前回と同じ結果なら書き込まない（自動コミットで差分を出さない）
+            try:
+                with open(report_path, 'r', encoding='utf-8') as f:
+                    if json.load(f) == report:
+                        print(f"ℹ️  詳細レポートに変更はありません: {report_path}")
+                        return
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+            write_json_atomic(report_path, report)
             
             print(f"📊 詳細レポートを保存しました: {report_path}")
 
@@ -301,24 +408,29 @@ def main():
     メイン関数
     第1引数: リクエスト間隔（秒）
     第2引数: チェックする件数（各ファイルから最新N件）
+    --resume: 前回中断したチェックを続きから再開
+    --adaptive: リクエスト間隔の代わりに並列数を自動調整
     """
     print("動画URLリンク切れチェックツール")
     print("=" * 50)
     
+    flags = {arg for arg in sys.argv[1:] if arg.startswith('--')}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    
     # オプション指定
     delay = 10  # リクエスト間隔（秒）
     limit = None  # 件数制限
     
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            delay = float(sys.argv[1])
+            delay = float(args[0])
             print(f"リクエスト間隔: {delay}秒")
         except ValueError:
             print("警告: 無効な間隔が指定されました。デフォルト値(10秒)を使用します。")
     
-    if len(sys.argv) > 2:
+    if len(args) > 1:
         try:
-            limit = int(sys.argv[2])
+            limit = int(args[1])
             print(f"各ファイルから最新 {limit} 件をチェック")
         except ValueError:
             print("警告: 無効な件数が指定されました。全件をチェックします。")
@@ -326,9 +438,9 @@ def main():
     checker = VideoLinkChecker()
     
     try:
-        checker.check_all_links(delay=delay, limit=limit)
+        checker.check_all_links(delay=delay, limit=limit, resume='--resume' in flags, adaptive='--adaptive' in flags)
     except KeyboardInterrupt:
-        print("中断されました。")
+        print("中断されました。--resume を付けて実行すると続きから再開できます。")
         if checker.broken_links:
             print("これまでに見つかった問題URL:")
             checker._print_summary()
@@ -337,4 +449,5 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with profiling.run('check_video_links'):
+        main()
\ No newline at end of file
@@ -2,6 +2,11 @@
 """
 動画URLリンク切れチェックスクリプト（高速版）
 少数のサンプルを高速でチェックしてテストするためのスクリプト
+--adaptive を付けると、リクエスト間隔の代わりにレスポンスに応じて並列数を自動調整します（adaptive_concurrency.py）。
+環境変数 NANAHAPI_PROFILE を指定するとプロファイルを .nanahapi/profiles/ に保存します（profiling.py）。
+
+使用方法:
+  python script/check_video_links_fast.py [サンプルサイズ] [リクエスト間隔(秒)] [--adaptive]
 """
 
 import json
@@ -15,14 +20,28 @@ from urllib.parse import urlparse, parse_qs
 import sys
 import random
 
+import net
+import profiling
+import availability
+import adaptive_concurrency
+from link_classifier import classify_watch_page, login_required_message, is_unconfirmed_login_required
+
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class FastVideoLinkChecker:
-    def __init__(self, archives_dir: str = "docs/src"):
+    def __init__(self, archives_dir: str = "docs/src", session=None):
         self.archives_dir = Path(archives_dir)
+        # 共有HTTPセッション（記録／再生モードではreplayのセッションに切り替わる）
+        self.session = session or net.http_session()
         self.broken_links = []
+        # チェックし直してもレート制限・接続エラーで状態を判断できなかった動画（--adaptive のみ）
+        self.unconfirmed_links = []
+        # 並列数のコントローラ（--adaptive のみ）
+        self.controller = None
+        # 公開状態ファイルに反映する (videoId, is_valid, status_code, error_msg)
+        self.availability_results = []
         self.checked_count = 0
         self.total_count = 0
         
@@ -33,9 +52,9 @@ class FastVideoLinkChecker:
         archives = {}
         pattern = self.archives_dir / "archives_*.json"
         
-        for file_path in glob.glob(str(pattern)):
+        for file_path in sorted(glob.glob(str(pattern))):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with open(file_path, 'r', encoding='utf-8') as f, profiling.hot_section('load_archive'):
                     data = json.load(f)
                     items = data.get('items', [])
                     
@@ -56,24 +75,25 @@ class FastVideoLinkChecker:
         動画URLの有効性をチェック（高速版）
         YouTubeの削除・非公開動画も検知
         """
-        try:
-            if "youtube.com" in url or "youtu.be" in url:
-                return self._check_youtube_video(url)
-            else:
-                response = requests.head(url, timeout=5, allow_redirects=True)
-                if response.status_code < 400:
-                    return True, response.status_code, ""
+        with profiling.hot_section('check_video_url'):
+            try:
+                if "youtube.com" in url or "youtu.be" in url:
+                    return self._check_youtube_video(url)
                 else:
-                    return False, response.status_code, f"HTTP {response.status_code}"
+                    response = self.session.head(url, timeout=5, allow_redirects=True)
+                    if response.status_code < 400:
+                        return True, response.status_code, ""
+                    else:
+                        return False, response.status_code, f"HTTP {response.status_code}"
                     
-        except requests.exceptions.Timeout:
-            return False, 0, "タイムアウト"
-        except requests.exceptions.ConnectionError:
-            return False, 0, "接続エラー"
-        except requests.exceptions.RequestException as e:
-            return False, 0, f"リクエストエラー: {str(e)}"
-        except Exception as e:
-            return False, 0, f"予期しないエラー: {str(e)}"
+            except requests.exceptions.Timeout:
+                return False, 0, "タイムアウト"
+            except requests.exceptions.ConnectionError:
+                return False, 0, "接続エラー"
+            except requests.exceptions.RequestException as e:
+                return False, 0, f"リクエストエラー: {str(e)}"
+            except Exception as e:
+                return False, 0, f"予期しないエラー: {str(e)}"
     
     def _check_youtube_video(self, url: str) -> Tuple[bool, int, str]:
         """
@@ -81,13 +101,8 @@ class FastVideoLinkChecker:
         削除・非公開・地域制限動画を検出
         """
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8'
-            }
-            
             # まずHEADリクエストで基本チェック
-            head_response = requests.head(url, headers=headers, timeout=5, allow_redirects=True)
+            head_response = self.session.head(url, timeout=5, allow_redirects=True)
             
             # 明らかなエラーステータス
             if head_response.status_code == 404:
@@ -96,80 +111,15 @@ class FastVideoLinkChecker:
                 return False, head_response.status_code, f"サーバーエラー ({head_response.status_code})"
             
             # GETリクエストでページ内容をチェック
-            response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
+            response = self.session.get(url, timeout=10, allow_redirects=True)
             
             if response.status_code != 200:
                 return False, response.status_code, f"HTTP {response.status_code}"
             
             # ページ内容から問題を検出
-            content = response.text.lower()
-            
-            # YouTubeのplayabilityStatusを確認（最も確実な方法）
-            import re
-            playability_pattern = r'"playabilitystatus":\{.*?"status":"([^"]*?)"'
-            playability_match = re.search(playability_pattern, content)
-            if playability_match:
-                status = playability_match.group(1).upper()
-                if status in ['LOGIN_REQUIRED', 'UNPLAYABLE', 'ERROR']:
-                    # メンバー限定動画かチェック
-                    member_patterns = ['members-only', 'membership', 'メンバー限定', 'メンバーシップ']
-                    is_member_only = any(pattern in content for pattern in member_patterns)
-                    
-                    if status == 'LOGIN_REQUIRED':
-                        return False, response.status_code, f"非公開動画（ログイン必須）: status={status}"
-                    elif status == 'UNPLAYABLE':
-                        if is_member_only:
-                            return True, response.status_code, ""  # メンバー限定動画は正常とみなす
-                        else:
-                            return False, response.status_code, f"再生不可能な動画: status={status}"
-                    elif status == 'ERROR':
-                        return False, response.status_code, f"動画エラー（削除済みの可能性）: status={status}"
-            
-            # 削除された動画のパターン
-            deleted_patterns = [
-                'video unavailable',
-                'this video is no longer available',
-                'this video has been removed',
-                'video removed',
-                'deleted video'
-            ]
-            
-            # 非公開動画のパターン
-            private_patterns = [
-                'this video is private',
-                'private video',
-                'this video is unavailable'
-            ]
-            
-            # 地域制限のパターン
-            region_patterns = [
-                'not available in your country',
-                'video not available',
-                'blocked in your country'
-            ]
-            
-            # チェック実行
-            for pattern in deleted_patterns:
-                if pattern in content:
-                    return False, response.status_code, f"動画が削除されています: {pattern}"
-            
-            for pattern in private_patterns:
-                if pattern in content:
-                    return False, response.status_code, f"非公開動画: {pattern}"
-            
-            for pattern in region_patterns:
-                if pattern in content:
-                    return False, response.status_code, f"地域制限: {pattern}"
-            
-            # 正常な動画ページの兆候をチェック
-            if any(indicator in content for indicator in ['ytd-watch-flexy', 'watch-main-col', 'player-wrap']):
-                return True, response.status_code, ""
-            
-            # 動画プレイヤーが見つからない場合は問題の可能性
-            if 'player' not in content and 'video' not in content:
-                return False, response.status_code, "動画プレイヤーが見つかりません（問題の可能性）"
-            
-            return True, response.status_code, ""
+            with profiling.hot_section('classify_watch_page'):
+                verdict = classify_watch_page(response.content)
+            return verdict.is_valid, response.status_code, verdict.message
             
         except requests.exceptions.Timeout:
             return False, 0, "タイムアウト"
@@ -178,9 +128,10 @@ class FastVideoLinkChecker:
         except Exception as e:
             return False, 0, f"チェックエラー: {str(e)}"
     
-    def quick_check(self, sample_size: int = 50, delay: float = 0.2):
+    def quick_check(self, sample_size: int = 50, delay: float = 0.2, adaptive: bool = False):
         """
         高速チェック（サンプリング）
+        adaptive: リクエスト間隔の代わりに並列数を自動調整してチェックする
         """
         logger.info(f"高速チェック開始（サンプルサイズ: {sample_size}）")
         archives = self.load_sample_archives(sample_size)
@@ -197,10 +148,15 @@ class FastVideoLinkChecker:
         print(f"動画URLリンク切れ高速チェック開始 (サンプル数: {self.total_count})")
         print("="*80)
         
+        if adaptive:
+            self.controller = adaptive_concurrency.AIMDController()
+            logger.info(f"並列数を自動調整してチェックします（最大 {int(self.controller.maximum)} 並列）")
+        
         for archive_file, items in archives.items():
             print(f"\\n📁 {archive_file}")
             print("-" * 60)
             
+            pending = []  # 並列にチェックする (video_url, (idx, item))
             for idx, item in enumerate(items, 1):
                 video_url = item.get('video_url', '')
                 title = item.get('title', '無題')
@@ -220,28 +176,72 @@ class FastVideoLinkChecker:
                 self.checked_count += 1
                 progress = (self.checked_count / self.total_count) * 100
                 
+                if self.controller:
+                    pending.append((video_url, (idx, item)))
+                    continue
+                
                 print(f"  🔍 [{idx:3d}] チェック中... ({progress:.1f}%)", end='', flush=True)
                 
                 is_valid, status_code, error_msg = self.check_video_url_fast(video_url)
-                
-                if is_valid:
-                    print(f"\\r  ✅ [{idx:3d}] OK ({status_code}) - {title[:40]}...")
-                else:
-                    print(f"\\r  ❌ [{idx:3d}] NG ({error_msg}) - {title[:40]}...")
-                    self.broken_links.append({
-                        'file': archive_file,
-                        'title': title,
-                        'video_url': video_url,
-                        'upload_date': upload_date,
-                        'error': error_msg
-                    })
+                self._record_result(archive_file, idx, item, is_valid, status_code, error_msg)
                 
                 # レート制限対応（短縮）
                 if delay > 0:
                     time.sleep(delay)
+            
+            if pending:
+                self._check_pending(archive_file, pending)
         
         self._print_summary()
         self._save_report()
+        self._save_availability()
+    
+    def _check_pending(self, archive_file: str, pending: List):
+        """
+        並列数を自動調整しながら動画URLをチェック（結果は終わった順に表示）
+        チェックし直してもレート制限・接続エラーだった動画はリンク切れとせず未確認として残し、
+        ログイン必須のままだった動画は逐次チェックと同じく非公開動画として記録する
+        """
+        done = self.checked_count - len(pending)
+        for (idx, item), (is_valid, status_code, error_msg), unconfirmed in adaptive_concurrency.check_concurrently(
+                pending, self.check_video_url_fast, self.controller):
+            done += 1
+            status = f"[{done / self.total_count * 100:5.1f}% {self.controller.describe()}]"
+            if unconfirmed:
+                print(f"  ⏳ [{idx:3d}] 未確認 ({error_msg}) - {item.get('title', '無題')[:40]}... {status}")
+                self.unconfirmed_links.append({
+                    'file': archive_file,
+                    'title': item.get('title', '無題'),
+                    'video_url': item.get('video_url', ''),
+                    'upload_date': item.get('upload_date', '不明'),
+                    'error': error_msg
+                })
+                continue
+            if adaptive_concurrency.LOGIN_REQUIRED_MARKER in error_msg:
+                error_msg = login_required_message('LOGIN_REQUIRED')
+            self._record_result(archive_file, idx, item, is_valid, status_code, error_msg, status)
+    
+    def _record_result(self, archive_file: str, idx: int, item: Dict, is_valid: bool, status_code: int, error_msg: str, status: str = ''):
+        """
+        チェック結果を表示して公開状態・問題URLに反映
+        チェックし直していないログイン必須はレート制限の兆候のことがあるため、公開状態には反映しない
+        """
+        title = item.get('title', '無題')
+        if not is_unconfirmed_login_required(error_msg):
+            self.availability_results.append((item.get('videoId'), is_valid, status_code, error_msg))
+        
+        suffix = f" {status}" if status else ""
+        if is_valid:
+            print(f"\\r  ✅ [{idx:3d}] OK ({status_code}) - {title[:40]}...{suffix}")
+        else:
+            print(f"\\r  ❌ [{idx:3d}] NG ({error_msg}) - {title[:40]}...{suffix}")
+            self.broken_links.append({
+                'file': archive_file,
+                'title': title,
+                'video_url': item.get('video_url', ''),
+                'upload_date': item.get('upload_date', '不明'),
+                'error': error_msg
+            })
     
     def _print_summary(self):
         """
@@ -252,8 +252,12 @@ class FastVideoLinkChecker:
         print("="*80)
         
         print(f"総チェック件数: {self.total_count}")
-        print(f"正常URL: {self.total_count - len(self.broken_links)}")
+        print(f"正常URL: {self.total_count - len(self.broken_links) - len(self.unconfirmed_links)}")
         print(f"問題URL: {len(self.broken_links)}")
+        if self.unconfirmed_links:
+            print(f"未確認（レート制限・接続エラー）: {len(self.unconfirmed_links)}")
+        if self.controller:
+            print(f"レート制限の兆候: {self.controller.throttled_count}回 / 最終の並列数: {self.controller.concurrency}")
         
         if self.broken_links:
             print("\\n❌ 問題のあるURL一覧:")
@@ -268,6 +272,14 @@ class FastVideoLinkChecker:
         else:
             print("\\n✅ チェックしたサンプルのURLはすべて正常です！")
     
+    def _save_availability(self):
+        """
+        チェック結果を動画ごとの公開状態（availability.json）に反映
+        """
+        updated = availability.update_availability(self.availability_results, self.archives_dir)
+        if updated:
+            print(f"📋 公開状態を更新しました: {updated}件 ({availability.availability_path(self.archives_dir)})")
+
     def _save_report(self):
         """
         チェック結果をJSONファイルに保存
@@ -294,21 +306,24 @@ def main():
     print("動画URLリンク切れ高速チェックツール")
     print("=" * 50)
     
+    flags = {arg for arg in sys.argv[1:] if arg.startswith('--')}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    
     # デフォルト設定
     sample_size = 50  # 各ファイルから50件ずつサンプリング
     delay = 0  # 0秒間隔
     
     # コマンドライン引数の処理
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            sample_size = int(sys.argv[1])
+            sample_size = int(args[0])
             print(f"サンプルサイズ: 各ファイルから{sample_size}件")
         except ValueError:
             print("警告: 無効なサンプルサイズが指定されました。デフォルト値(20件)を使用します。")
     
-    if len(sys.argv) > 2:
+    if len(args) > 1:
         try:
-            delay = float(sys.argv[2])
+            delay = float(args[1])
             print(f"リクエスト間隔: {delay}秒")
         except ValueError:
             print("警告: 無効な間隔が指定されました。デフォルト値(0.2秒)を使用します。")
@@ -316,7 +331,7 @@ def main():
     checker = FastVideoLinkChecker()
     
     try:
-        checker.quick_check(sample_size=sample_size, delay=delay)
+        checker.quick_check(sample_size=sample_size, delay=delay, adaptive='--adaptive' in flags)
     except KeyboardInterrupt:
         print("\\n\\n中断されました。")
         if checker.broken_links:
@@ -327,4 +342,5 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with profiling.run('check_video_links_fast'):
+        main()
\ No newline at end of file
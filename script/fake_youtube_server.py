@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+負荷試験用のローカルなYouTubeの代役サーバー
+動画ページ（/watch?v=...）を script/fixtures/watch_pages/ の保存済みページから返します。
+動画の種類（公開・メンバー限定・非公開・削除済み・放送前）は動画IDとシードから決まるため、同じ設定なら何度でも同じ結果になります。
+遅延・レート制限（429）・サーバーエラー（503）・一時的なLOGIN_REQUIREDのページを指定した割合で返します。
+配信開始日時のブラウジング（get_live_date_info）が読む #watch7-content の開始日時も埋め込みます。
+
+環境変数 NANAHAPI_YOUTUBE_BASE_URL にこのサーバーのURLを指定すると、
+net のセッションとブラウジングのYouTubeへのアクセスがこのサーバーに送られます。
+/__stats で受けたリクエスト数と返したレスポンスの内訳をJSONで返します。
+
+使用方法:
+  python script/fake_youtube_server.py [--port 8765] [--latency 50] [--jitter 20] [--throttle-rps 20]
+                                       [--error-rate 0.01] [--login-rate 0.01] [--mix public=90,members_only=4,...] [--seed 0]
+  例: NANAHAPI_YOUTUBE_BASE_URL=http://127.0.0.1:8765 python script/check_video_links.py --adaptive
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+WATCH_PAGES_DIR = Path(__file__).resolve().parent / 'fixtures' / 'watch_pages'
+
+KIND_PUBLIC = 'public'
+KIND_MEMBERS_ONLY = 'members_only'
+KIND_PRIVATE = 'private'
+KIND_DELETED = 'deleted'
+KIND_UPCOMING = 'upcoming'
+KINDS = (KIND_PUBLIC, KIND_MEMBERS_ONLY, KIND_PRIVATE, KIND_DELETED, KIND_UPCOMING)
+
+# 動画の種類の割合（重み）
+DEFAULT_MIX = {KIND_PUBLIC: 90, KIND_MEMBERS_ONLY: 4, KIND_PRIVATE: 2, KIND_DELETED: 2, KIND_UPCOMING: 2}
+
+# 開始日時を埋め込む種類（削除済み・非公開のページには開始日時がない）
+DATED_KINDS = (KIND_PUBLIC, KIND_MEMBERS_ONLY, KIND_UPCOMING)
+# 開始日時の基準（放送済みはこれより前、放送前はこれより後）
+BASE_START = datetime(2026, 10, 1, 21, 0)
+
+CANONICAL_ID_PATTERN = re.compile(rb'watch\?v=[\w-]+')
+
+def parse_mix(spec):
+    """
+    動画の種類の割合を解析
+
+    Args:
+        spec (str): "public=90,members_only=4" の形式（指定のない種類は0）
+    Returns:
+        dict: {種類: 重み}
+    Raises:
+        ValueError: 不明な種類・数値でない重みの場合
+    """
+    mix = {kind: 0 for kind in KINDS}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        kind, weight = part.split('=', 1)
+        if kind not in mix:
+            raise ValueError(f"不明な動画の種類です: {kind}")
+        mix[kind] = float(weight)
+    if not any(mix.values()):
+        raise ValueError("動画の種類の割合がすべて0です")
+    return mix
+
+class FakeYouTube:
+    """
+    代役サーバーの設定と状態（動画の種類の決定・障害の注入・集計）
+    """
+    def __init__(self, mix=None, latency=0.0, jitter=0.0, throttle_rps=0.0, error_rate=0.0, login_rate=0.0, seed=0):
+        """
+        Args:
+            mix (dict): 動画の種類の割合（Noneなら DEFAULT_MIX）
+            latency (float): レスポンスの遅延（秒）
+            jitter (float): 遅延のばらつき（秒、0〜jitterを加算）
+            throttle_rps (float): これを超える毎秒のリクエストに429を返す（0で無効）
+            error_rate (float): 503を返す割合
+            login_rate (float): 公開動画で一時的なLOGIN_REQUIREDのページを返す割合
+            seed (int): 動画の種類・開始日時・障害の注入のシード
+        """
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rps = throttle_rps
+        self.error_rate = error_rate
+        self.login_rate = login_rate
+        self.seed = seed
+        self.pages = {kind: (WATCH_PAGES_DIR / f"{kind}.html").read_bytes() for kind in KINDS}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = throttle_rps
+        self._updated = time.monotonic()
+        self.stats = {'requests': 0, 'ok': 0, 'throttled': 0, 'errors': 0, 'spurious_login': 0, 'not_found': 0}
+
+    def _hash(self, video_id, salt):
+        digest = hashlib.sha256(f"{self.seed}:{salt}:{video_id}".encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+    def video_kind(self, video_id):
+        """
+        動画IDから動画の種類を決める（同じシードなら常に同じ）
+
+        Args:
+            video_id (str): 動画ID
+        Returns:
+            str: 動画の種類
+        """
+        point = self._hash(video_id, 'kind') * sum(self.mix.values())
+        for kind in KINDS:
+            point -= self.mix[kind]
+            if point < 0:
+                return kind
+        return KIND_PUBLIC
+
+    def start_time(self, video_id):
+        """
+        動画IDから配信開始日時を決める（放送前の枠は基準より後）
+
+        Args:
+            video_id (str): 動画ID
+        Returns:
+            str: 配信開始日時（日本時間のISO 8601形式）
+        """
+        hours = int(self._hash(video_id, 'start') * 24 * 365)
+        if self.video_kind(video_id) == KIND_UPCOMING:
+            start = BASE_START + timedelta(hours=hours)
+        else:
+            start = BASE_START - timedelta(hours=hours)
+        return start.strftime('%Y-%m-%dT%H:%M:%S') + '+09:00'
+
+    def render(self, video_id, kind):
+        """
+        動画ページのHTMLを作成
+
+        Args:
+            video_id (str): 動画ID
+            kind (str): 動画の種類
+        Returns:
+            bytes: HTML
+        """
+        page = CANONICAL_ID_PATTERN.sub(f"watch?v={video_id}".encode('ascii'), self.pages[kind])
+        if kind in DATED_KINDS:
+            # get_live_date_info のセレクタ（#watch7-content > meta:nth-child(18)）が読む位置に開始日時を置く
+            fillers = ''.join('<meta itemprop="filler" content="">' for _ in range(17))
+            content = f'<div id="watch7-content">{fillers}<meta itemprop="startDate" content="{self.start_time(video_id)}"></div>'
+            page = page.replace(b'</body>', content.encode('utf-8') + b'</body>')
+        return page
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _take_token(self):
+        if self.throttle_rps <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.throttle_rps, self._tokens + (now - self._updated) * self.throttle_rps)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def _chance(self, rate):
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def respond(self, path):
+        """
+        リクエストのパスに対するレスポンスを決める
+
+        Args:
+            path (str): リクエストのパス（クエリを含む）
+        Returns:
+            tuple: (ステータス, ヘッダーのdict, 本文のbytes)
+        """
+        self._count('requests')
+        delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        parts = urlsplit(path)
+        if parts.path == '/__stats':
+            with self._lock:
+                body = json.dumps(self.stats).encode('utf-8')
+            return 200, {'Content-Type': 'application/json'}, body
+        if not self._take_token():
+            self._count('throttled')
+            # YouTubeの429はRetry-Afterを返さない（返すとurllib3のリトライで吸収されてチェッカーに届かない）
+            return 429, {'Content-Type': 'text/html; charset=utf-8'}, b'<html><body>Too Many Requests</body></html>'
+        if self._chance(self.error_rate):
+            self._count('errors')
+            return 503, {'Content-Type': 'text/html; charset=utf-8'}, b'<html><body>Service Unavailable</body></html>'
+        video_id = parse_qs(parts.query).get('v', [''])[0]
+        if parts.path != '/watch' or not video_id:
+            self._count('not_found')
+            return 404, {'Content-Type': 'text/html; charset=utf-8'}, b'<html><body>Not Found</body></html>'
+        kind = self.video_kind(video_id)
+        if kind == KIND_PUBLIC and self._chance(self.login_rate):
+            self._count('spurious_login')
+            kind = KIND_PRIVATE
+        else:
+            self._count('ok')
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, self.render(video_id, kind)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-aliveで接続プールを使えるようにする
+    disable_nagle_algorithm = True  # ヘッダーと本文を分けて送っても遅延ACKで待たされないようにする
+
+    def _reply(self, send_body):
+        status, headers, body = self.server.fake.respond(self.path)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(send_body=True)
+
+    def do_HEAD(self):
+        self._reply(send_body=False)
+
+    def log_message(self, format, *args):
+        pass  # 負荷試験中にアクセスログを出さない
+
+class FakeYouTubeServer:
+    """
+    代役サーバーを別スレッドで起動する（with文で使用）
+    """
+    def __init__(self, fake=None, host='127.0.0.1', port=0):
+        """
+        Args:
+            fake (FakeYouTube): 設定と状態（Noneなら既定値）
+            host (str): 待ち受けるアドレス
+            port (int): 待ち受けるポート（0なら空いているポート）
+        """
+        self.fake = fake or FakeYouTube()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self.fake
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        サーバーのURL（NANAHAPI_YOUTUBE_BASE_URL に指定する値）
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    """
+    メイン関数
+    """
+    parser = argparse.ArgumentParser(description='負荷試験用のローカルなYouTubeの代役サーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='レスポンスの遅延（ミリ秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='遅延のばらつき（ミリ秒）')
+    parser.add_argument('--throttle-rps', type=float, default=0.0, help='これを超える毎秒のリクエストに429を返す（0で無効）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503を返す割合')
+    parser.add_argument('--login-rate', type=float, default=0.0, help='公開動画で一時的なLOGIN_REQUIREDを返す割合')
+    parser.add_argument('--mix', default='', help='動画の種類の割合（例: public=90,members_only=4,private=2,deleted=2,upcoming=2）')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix) if args.mix else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    fake = FakeYouTube(mix=mix, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                       throttle_rps=args.throttle_rps, error_rate=args.error_rate,
+                       login_rate=args.login_rate, seed=args.seed)
+    server = FakeYouTubeServer(fake, host=args.host, port=args.port)
+    print(f"🧪 YouTubeの代役サーバーを起動しました: {server.url}")
+    print(f"   NANAHAPI_YOUTUBE_BASE_URL={server.url} を指定してチェッカーを実行してください（Ctrl+Cで停止）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"📊 {json.dumps(fake.stats, ensure_ascii=False)}")
+
+if __name__ == "__main__":
+    main()
@@ -2,61 +2,166 @@
 #  - yt-dlpを利用
 #  - アーカイブで取得する情報は{video_title, video_url, thumbnail_url, upload_date}
 
+# 環境変数 NANAHAPI_PROFILE を指定するとプロファイルを .nanahapi/profiles/ に保存（profiling.py）
+
 # 動画ごとの情報取得確認用
 # yt-dlp https://www.youtube.com/watch?v={video_id} --skip-download --print-json | jq > tmp.json
 
+import os
 import sys
 import json
-import yt_dlp
 import re
 import time
+import contextlib
+import importlib.metadata
+from collections import deque
 from pathlib import Path
-from datetime import datetime, timedelta, timezone
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from datetime import datetime
+
+import replay
+import profiling
+import rate_governor
+import change_feed
+import binary_archive
+import availability
+import info_cache
+import channel_feed
+from live_date_memo import LiveDateMemo
+from archive_utils import load_archive_items, load_talents, normalize_timestamp, parse_upload_dates
+from local_state import locked_file, write_json_atomic
 
 debug_flag = False  # デバッグフラグ
 debug_videos = []  # デバッグ用動画情報リスト
+listed_video_ids = set()  # チャンネルの一覧で見つかった動画ID
+listing_failed = False  # 一覧の取得に失敗した種類があるか
+live_date_memo = LiveDateMemo()  # 配信開始日時のメモ
+class JsonLinesLogSink:
+    """
+    ログをJSON Lines形式でファイルに追記するシンク
+    長時間の実行でもメモリにログを溜め込まないようにするために使用
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+class JsonArrayWriter:
+    """
+    リストを1要素ずつJSON配列としてファイルに書き出すライター
+    一覧全体をメモリに溜めずにデバッグ用に保存するために使用
+    """
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('[')
+        self.count = 0
+
+    def write(self, item):
+        self._file.write(',\n' if self.count else '\n')
+        self._file.write(json.dumps(item, ensure_ascii=False, indent=2, default=str))
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write('\n]\n')
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+_log_sink = None  # プロセス内で共有するログシンク
+
+def get_log_sink():
+    """
+    環境変数 NANAHAPI_LOG_JSONL が指定されている場合にJSON Linesのログシンクを取得
+
+    Returns:
+        JsonLinesLogSink: ログシンク、未指定の場合はNone
+    """
+    global _log_sink
+    if _log_sink is None:
+        log_path = os.getenv('NANAHAPI_LOG_JSONL')
+        if log_path:
+            _log_sink = JsonLinesLogSink(log_path)
+    return _log_sink
+
 class CustomLogger:
-    """カスタムロガークラス"""
-    def __init__(self, verbose=False):
-        self.messages = []
+    """
+    カスタムロガークラス
+    メッセージは直近max_messages件だけをリングバッファで保持し、
+    最新のエラーは専用の変数で保持する
+    """
+    def __init__(self, verbose=False, max_messages=100, sink=None, context=None):
+        self.messages = deque(maxlen=max_messages)
         self.verbose = verbose
-        
-    def debug(self, message):
-        self.messages.append({'logType': 'DEBUG', 'message': message})
+        self.sink = sink
+        self.context = context or {}
+        self.latest_error = None
+
+    def _log(self, log_type, message):
+        self.messages.append({'logType': log_type, 'message': message})
+        if self.sink:
+            self.sink.write({
+                'time': datetime.now().isoformat(),
+                'logType': log_type,
+                'message': message,
+                **self.context,
+            })
         if self.verbose:
-            print(f"[DEBUG] {message}")
-        
+            print(f"[{log_type}] {message}")
+
+    def debug(self, message):
+        self._log('DEBUG', message)
+
     def warning(self, message):
-        self.messages.append({'logType': 'WARNING', 'message': message})
-        if self.verbose:
-            print(f"[WARNING] {message}")
-        
+        self._log('WARNING', message)
+
     def error(self, message):
-        self.messages.append({'logType': 'ERROR', 'message': message})
-        if self.verbose:
-            print(f"[ERROR] {message}")
-    
+        self.latest_error = message
+        self._log('ERROR', message)
+
     def get_messages(self):
-        return self.messages
-    
+        return list(self.messages)
+
     def get_latest_error(self):
         """
         最新のエラーメッセージを取得
-        
+
         Returns:
             str: 最新のエラーメッセージ、存在しない場合はNone
         """
-        for message in reversed(self.messages):
-            if message['logType'] == 'ERROR':
-                return message['message']
-        return None
-    
+        return self.latest_error
+
     def clear_messages(self):
-        self.messages = []
+        self.messages.clear()
+        self.latest_error = None
+
+    def for_video(self, video_id):
+        """
+        動画単位のロガーを作成（シンクと出力設定は引き継ぐ）
+
+        Args:
+            video_id (str): 動画ID
+        Returns:
+            CustomLogger: 動画単位のロガー
+        """
+        return CustomLogger(
+            verbose=self.verbose,
+            max_messages=self.messages.maxlen,
+            sink=self.sink,
+            context={**self.context, 'video_id': video_id},
+        )
 
 def get_ydl_options():
     """
@@ -66,7 +171,7 @@ def get_ydl_options():
         dict: yt-dlpの設定辞書
     """
     # カスタムロガーのインスタンスを作成（CLI出力オフ）
-    custom_logger = CustomLogger(verbose=False)
+    custom_logger = CustomLogger(verbose=False, sink=get_log_sink())
 
     return {
         'quiet': True,  # CLI出力を非表示
@@ -81,6 +186,42 @@ def get_ydl_options():
         'ignore_no_formats_error': True, # フォーマットが見つからないエラーを無視
     }
 
+YDL_PROFILE_METADATA = 'metadata'  # 使用する項目（タイトル・サムネイル・説明・日時）だけを取得
+YDL_PROFILE_FULL = 'full'  # 再生形式・署名まで解決する通常の取得
+
+# メタデータだけを取得する設定
+# 動画ページの埋め込みプレイヤー情報だけを使い、プレイヤーJS・他クライアントの設定・HLS/DASHマニフェストを取得しない
+METADATA_YDL_OPTIONS = {
+    'skip_download': True,
+    'check_formats': False,
+    'extractor_args': {
+        'youtube': {
+            'player_client': ['web'],
+            'player_skip': ['js', 'configs'],
+            'skip': ['hls', 'dash', 'translated_subs'],
+        },
+    },
+}
+
+def get_detail_ydl_options(ydl_opts, profile=None):
+    """
+    個別動画の詳細情報用のyt-dlp設定を取得
+
+    Args:
+        ydl_opts (dict): yt-dlpの設定
+        profile (str): 取得プロファイル（Noneなら環境変数 NANAHAPI_YDL_PROFILE、デフォルト: metadata）
+    Returns:
+        dict: yt-dlpの設定辞書
+    """
+    profile = profile or os.getenv('NANAHAPI_YDL_PROFILE', YDL_PROFILE_METADATA)
+    video_ydl_opts = ydl_opts.copy()
+    video_ydl_opts['extract_flat'] = False  # 詳細情報を取得
+    if profile == YDL_PROFILE_METADATA:
+        video_ydl_opts.update(METADATA_YDL_OPTIONS)
+    elif profile != YDL_PROFILE_FULL:
+        print(f"⚠️  不明な取得プロファイルです: {profile}（{YDL_PROFILE_FULL}で取得します）", flush=True)
+    return video_ydl_opts
+
 def get_detailed_video_info(video_id, ydl_opts):
     """
     個別動画の詳細情報を取得（リトライ機能付き）
@@ -93,8 +234,9 @@ def get_detailed_video_info(video_id, ydl_opts):
         dict: 動画の詳細情報、失敗時はNone
     """
     # 個別動画用のyt-dlp設定
-    video_ydl_opts = ydl_opts.copy()
-    video_ydl_opts['extract_flat'] = False  # 詳細情報を取得
+    video_ydl_opts = get_detail_ydl_options(ydl_opts)
+    # 動画ごとにロガーを分けて、エラーの取り違えとメッセージの蓄積を防ぐ
+    video_ydl_opts['logger'] = ydl_opts['logger'].for_video(video_id)
     
     video_info = None
     for attempt in range(3):  # 3回まで再試行
@@ -102,7 +244,7 @@ def get_detailed_video_info(video_id, ydl_opts):
             if attempt > 0:
                 print(f"    リトライ中... 試行 {attempt + 1}/3", flush=True)
 
-            with yt_dlp.YoutubeDL(video_ydl_opts) as video_ydl:
+            with replay.open_ydl(video_ydl_opts) as video_ydl:
                 video_info = video_ydl.extract_info(
                     f"https://www.youtube.com/watch?v={video_id}", 
                     download=False
@@ -121,38 +263,50 @@ def get_detailed_video_info(video_id, ydl_opts):
         # 最新のエラーログメッセージを取得
         latest_error = logger.get_latest_error()
         if latest_error:
-            logger.clear_messages()  # エラーメッセージをクリア
             raise Exception(latest_error)  # エラーメッセージを例外として上げる
+    else:
+        cache_video_info(video_id, video_info)
     
     return video_info
 
+def cache_video_info(video_id, video_info):
+    """
+    詳細情報をキャッシュ（.nanahapi/info_cache/）に保存（失敗しても処理は続ける）
+
+    Args:
+        video_id (str): 動画ID
+        video_info (dict): extract_infoの結果
+    """
+    cache = info_cache.get_cache()
+    if cache is None:
+        return
+    try:
+        cache.put(video_id, video_info)
+    except Exception as e:
+        print(f"⚠️  詳細情報のキャッシュに失敗しました: {str(e)}", flush=True)
+
 def to_update_timestamp(timestamp):
     """
-    タイムスタンプを更新日時形式に変換
+    タイムスタンプを更新日時形式（日本時間、タイムゾーン表記なし）に変換
     
     Args:
         timestamp (int or str): タイムスタンプ（秒単位またはISO形式）
     Returns:
-        str: 更新日時形式の文字列
-    """
-    if isinstance(timestamp, int):
-        # 秒単位のタイムスタンプをISO形式に変換
-        convert_timestamp = datetime.fromtimestamp(timestamp).isoformat()
-        return convert_timestamp
-    elif isinstance(timestamp, str):
-        # datetimeに変換
-        dt = datetime.fromisoformat(timestamp)
-        # タイムゾーン+9の時間に変換
-        dt = dt + timedelta(hours=9)
-        # strのISO形式に変換
-        convert_timestamp = dt.isoformat()
-        # 末尾のタイムゾーン情報を削除(末尾に+XX:XXか-XX:XXがある場合)
-        if re.search(r"[+-]\d{2}:\d{2}$", convert_timestamp):
-            convert_timestamp = convert_timestamp[:-6]
-        return convert_timestamp
-    else:
-        # 無効な形式の場合は空文字列を返す
-        return ""
+        str: 更新日時形式の文字列（無効な形式の場合は空文字列）
+    """
+    return normalize_timestamp(timestamp)[1]
+
+def upload_fields(timestamp):
+    """
+    動画データの日時項目を作成
+
+    Args:
+        timestamp (int or str): タイムスタンプ（秒単位またはISO形式）
+    Returns:
+        dict: upload_date（表示用の日本時間）とupload_ts（ソート用のエポック秒）
+    """
+    upload_ts, upload_date = normalize_timestamp(timestamp)
+    return {"upload_date": upload_date, "upload_ts": upload_ts}
 
 def imprecise_tags(title):
     """
@@ -196,13 +350,25 @@ def get_thumbnail_url(video_info, video_id):
     # サムネイルが存在しない場合や640x480のサムネイルが見つからない場合は、最大解像度のサムネイルを取得
     return thumbnails[-1].get('url', f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg")
 
-def create_video_data_from_detailed_info(video_info, video_id):
+def needs_start_date(video_info):
+    """
+    詳細情報に日時（release_timestamp・timestamp）がなく、配信開始日時のブラウジングが必要か確認
+
+    Args:
+        video_info (dict): 詳細な動画情報
+    Returns:
+        bool: ブラウジングが必要な場合True
+    """
+    return all(video_info.get(key) in (None, '') for key in ('release_timestamp', 'timestamp'))
+
+def create_video_data_from_detailed_info(video_info, video_id, start_date=None):
     """
     詳細な動画情報から動画データを作成
     
     Args:
         video_info (dict): 詳細な動画情報
         video_id (str): 動画ID
+        start_date (str): 詳細情報に日時がない場合の配信開始日時（Noneならブラウジングで取得）
     
     Returns:
         dict: 整形された動画データ
@@ -218,7 +384,7 @@ def create_video_data_from_detailed_info(video_info, video_id):
     if upload_date is None or upload_date == '':
         print(f"  → △ timestamp情報も空", flush=True)
         # print(json.dumps(video_info, ensure_ascii=False, indent=2), flush=True)
-        upload_date = get_live_date_info(f"https://www.youtube.com/watch?v={video_id}")
+        upload_date = start_date or get_start_date(video_id, f"https://www.youtube.com/watch?v={video_id}")
     return {
         "title": title,
         "image": get_thumbnail_url(video_info, video_id),
@@ -227,7 +393,7 @@ def create_video_data_from_detailed_info(video_info, video_id):
         "videoId": video_id,
         "video_url": f"https://www.youtube.com/watch?v={video_id}",
         "tags": tags,
-        "upload_date": to_update_timestamp(upload_date),
+        **upload_fields(upload_date),
     }
 
 def create_video_data_from_basic_info(entry: dict, membership_frag: bool = False):
@@ -259,14 +425,14 @@ def create_video_data_from_basic_info(entry: dict, membership_frag: bool = False
     if membership_frag:
         # メンバー限定動画の場合、配信開始日時を取得
         print(f"  → ✓ メンバー限定動画", flush=True)
-        upload_date = get_live_date_info(video_url)
+        upload_date = get_start_date(video_id, video_url)
     else:
         # 通常動画の場合はリリースタイムスタンプを使用
         upload_date = entry.get('release_timestamp', None)
         if not upload_date or upload_date == "":
             print(f"  → △ release_timestamp情報が空", flush=True)
             try:
-                upload_date = get_live_date_info(video_url)
+                upload_date = get_start_date(video_id, video_url)
             except Exception as e:
                 error_message = str(e)
                 if error_message == "failed get_live_date_info":
@@ -281,19 +447,20 @@ def create_video_data_from_basic_info(entry: dict, membership_frag: bool = False
         "videoId": video_id,
         "video_url": video_url,
         "tags": tags,
-        "upload_date": to_update_timestamp(upload_date),
+        **upload_fields(upload_date),
     }
 
-def process_video_entry(entry, ydl_opts):
+def process_video_entry(entry, ydl_opts, normalizer=None):
     """
     個別の動画エントリを処理
     
     Args:
         entry (dict): 動画エントリ情報
         ydl_opts (dict): yt-dlpの設定
+        normalizer (DetailNormalizer): 詳細情報の整形を任せるプロセスプール（Noneならその場で整形）
     
     Returns:
-        dict: 処理された動画データ
+        dict: 処理された動画データ（normalizer指定時はPendingVideoDataの場合あり）
     """
     video_id = entry['id']
     video_info = None  # 詳細情報取得用の変数
@@ -314,6 +481,9 @@ def process_video_entry(entry, ydl_opts):
         else:
             video_info = get_detailed_video_info(video_id, ydl_opts)
             print(f" → ✓ アーカイブ: {entry.get('title', 'タイトル不明')} (ID: {video_id})", flush=True)
+            if normalizer:
+                # 整形はプロセスプールに任せて次の動画の取得に進む
+                return normalizer.submit(entry, video_info)
             return create_video_data_from_detailed_info(video_info, video_id)
         
     except Exception as e: 
@@ -338,79 +508,238 @@ def process_video_entry(entry, ydl_opts):
         #         "upload_date": upload_date,
         #     }
 
-        print(f"  → △ 情報取得失敗: {entry.get('title', 'タイトル不明')} (ID: {video_id}) - {error_message}", flush=True)
+        return create_video_data_from_failed_entry(entry, error_message, video_info)
+
+def create_video_data_from_failed_entry(entry, error_message, video_info=None):
+    """
+    詳細情報の取得・整形に失敗した動画の動画データを基本情報から作成
+
+    Args:
+        entry (dict): 動画エントリ情報
+        error_message (str): 失敗時のエラーメッセージ
+        video_info (dict): 取得できていた詳細情報（なければNone）
+
+    Returns:
+        dict: 整形された動画データ
+    """
+    video_id = entry['id']
+    print(f"  → △ 情報取得失敗: {entry.get('title', 'タイトル不明')} (ID: {video_id}) - {error_message}", flush=True)
+    try:
+        result = create_video_data_from_basic_info(entry, membership_frag = True)
+        print(f"   → ✓ 基本情報での動画データを作成", flush=True)
+        return result
+    except Exception as e:
+        print(f"   → ✗ 基本情報での動画データ作成失敗: {str(e)}", flush=True)
+        if video_info:
+            print("video_info:")
+            print(json.dumps(video_info, ensure_ascii=False, indent=2), flush=True)
+        else:
+            print("entry:")
+            print(json.dumps(entry, ensure_ascii=False, indent=2), flush=True)
+        sys.exit(1)  # エラーが発生した場合はスクリプトを終了
+
+# 詳細情報のうち動画データの整形に使用する項目
+DETAIL_FIELDS = ('title', 'thumbnails', 'description', 'release_timestamp', 'timestamp')
+
+class PendingVideoData:
+    """
+    プロセスプールで整形中の動画データ
+    """
+    def __init__(self, future, entry, video_info):
+        self.future = future
+        self.entry = entry
+        self.video_info = video_info
+
+    def result(self):
+        """
+        整形結果を取得（整形に失敗した場合は基本情報から作成）
+
+        Returns:
+            dict: 整形された動画データ
+        """
         try:
-            result = create_video_data_from_basic_info(entry, membership_frag = True)
-            print(f"   → ✓ 基本情報での動画データを作成", flush=True)
-            return result
+            return self.future.result()
         except Exception as e:
-            print(f"   → ✗ 基本情報での動画データ作成失敗: {str(e)}", flush=True)
-            if video_info:
-                print("video_info:")
-                print(json.dumps(video_info, ensure_ascii=False, indent=2), flush=True)
-            else:
-                print("entry:")
-                print(json.dumps(entry, ensure_ascii=False, indent=2), flush=True)
-            sys.exit(1)  # エラーが発生した場合はスクリプトを終了
+            return create_video_data_from_failed_entry(self.entry, str(e), self.video_info)
+
+class DetailNormalizer:
+    """
+    詳細情報の整形（サムネイル選択・タグ抽出・概要欄の切り詰め・日時変換）をプロセスプールで行う
+    取得（ネットワーク）と整形（CPU）を交互ではなく並行して進めるために使用
+    配信開始日時のブラウジング（WebDriver・メモ）は投入前に親プロセスで行い、ワーカーは整形だけを行う
+    """
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.executor = None
+
+    def __enter__(self):
+        from concurrent.futures import ProcessPoolExecutor
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *args):
+        self.executor.shutdown(wait=True)
+        return False
+
+    def submit(self, entry, video_info):
+        """
+        詳細情報の整形をプロセスプールに投入
+
+        Args:
+            entry (dict): 動画エントリ情報
+            video_info (dict): 詳細な動画情報
+        Returns:
+            PendingVideoData: 整形中の動画データ
+        """
+        # プロセス間の受け渡しを軽くするため、整形に使う項目だけを渡す
+        payload = {key: video_info[key] for key in DETAIL_FIELDS if key in video_info}
+        start_date = None
+        if needs_start_date(payload):
+            # WebDriverと配信開始日時のメモは親プロセスで共有しているため、ブラウジングは投入前に済ませ、
+            # ワーカーは整形だけを行う
+            start_date = get_start_date(entry['id'], f"https://www.youtube.com/watch?v={entry['id']}")
+        future = self.executor.submit(create_video_data_from_detailed_info, payload, entry['id'], start_date)
+        return PendingVideoData(future, entry, payload)
+
+def get_normalize_workers(get_length):
+    """
+    詳細情報の整形に使うプロセス数を取得
+    全件取得（大量のバックフィル）の場合のみプロセスプールを使用する
+
+    Args:
+        get_length (int): 取得する動画の最大数
+    Returns:
+        int: プロセス数、プロセスプールを使わない場合は0
+    """
+    if get_length is not None and get_length > 0:
+        return 0
+    try:
+        return int(os.getenv('NANAHAPI_NORMALIZE_WORKERS', min(4, os.cpu_count() or 1)))
+    except ValueError:
+        print("❌ NANAHAPI_NORMALIZE_WORKERSが無効です。プロセスプールを使用しません", flush=True)
+        return 0
+
+def iter_playlist_entries(ydl, url):
+    """
+    チャンネルのタブの動画エントリを遅延取得
+    yt-dlpの未処理の結果（process=False）を使い、ページ単位で取得しながら1件ずつ返す
+
+    Args:
+        ydl: YoutubeDL互換のオブジェクト
+        url (str): タブのURL
+    Returns:
+        iterable: 動画エントリ（一覧でない場合はNone）
+    """
+    info = ydl.extract_info(url, download=False, process=False)
+    # チャンネルのURLが別のURLへの参照として返された場合はたどる
+    while info and info.get('_type') in ('url', 'url_transparent'):
+        info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+    if info is None:
+        raise Exception(ydl.params['logger'].get_latest_error() or f"動画一覧を取得できませんでした: {url}")
+    return info.get('entries')
 
-def get_video_info(channel_url: str, video_type: str, get_length: int):
+def get_video_info(channel_url: str, video_type: str, get_length: int, stop_ids=None):
     """
     YouTubeチャンネルから動画情報を取得
+    一覧はページ単位で取得しながら処理し、get_length件に達するか stop_ids の動画に到達した時点で取得をやめる
     
     Args:
         channel_url (str): YouTubeチャンネルのURL
         video_type (str): 取得する動画の種類（例: 'streams', 'videos', 'shorts'）
         get_length (int): 取得する動画の最大数
+        stop_ids (set): 到達したら一覧の取得をやめる動画ID（アーカイブで確定済みの動画）
     
     Returns:
         list: 動画情報のリスト
     """
+    global listing_failed
     
     ydl_opts = get_ydl_options()
     
     videos = []
     
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with replay.open_ydl(ydl_opts) as ydl:
             print(f"'{channel_url}/{video_type}' から動画情報を取得中...", flush=True)
 
-            # チャンネルの動画一覧を取得
-            info = ydl.extract_info(f'{channel_url}/{video_type}', download=False)
+            # チャンネルの動画一覧を遅延取得
+            entries = iter_playlist_entries(ydl, f'{channel_url}/{video_type}')
 
-            if 'entries' in info:
-                # 最大{get_length}件までの動画エントリを取得
-                entries = info['entries']
-                # デバッグ情報としてjson形式で保存
-                if debug_flag:
-                    print("デバッグモード: 動画エントリ情報を 'debug_entries.json' に保存します", flush=True)
-                    with open('debug_entries.json', 'w', encoding='utf-8') as f:
-                        json.dump(entries, f, ensure_ascii=False, indent=2)
-                print(f"発見された動画数: {len(entries)}", flush=True)
+            if entries is not None:
+                limit = None
                 if get_length is None:
                     print("動画数の制限なしで取得します", flush=True)
                 elif get_length <= 0:
                     print("動画数の制限数が無効です。全ての動画を取得します", flush=True)
-                elif len(entries) > get_length:
-                    print(f"最新の{get_length}件のみを更新します", flush=True)
-                    entries = entries[:get_length]
-                # 各動画エントリを処理
-                print("更新動画数:", len(entries), flush=True)
-                cnt = 0
-                for entry in entries:
-                    if entry and 'id' in entry:
-                        cnt = cnt + 1
-                        print(f"No. {cnt}", end=' ::: ', flush=True)
-                        video_data = process_video_entry(entry, ydl_opts)
-                        videos.append(video_data)
+                else:
+                    print(f"最新の{get_length}件までを更新します", flush=True)
+                    limit = get_length
+                # デバッグ情報としてjson形式で保存（一覧を取得しながら書き出す）
+                if debug_flag:
+                    print("デバッグモード: 動画エントリ情報を 'debug_entries.json' に保存します", flush=True)
+                dump = JsonArrayWriter('debug_entries.json') if debug_flag else contextlib.nullcontext()
+                workers = get_normalize_workers(get_length)
+                normalizer = DetailNormalizer(workers) if workers > 0 else contextlib.nullcontext()
+                # リンクチェックで削除済みと確認された動画は詳細情報を取得しない（アーカイブの既存データを残す）
+                deleted_ids = availability.known_deleted_ids()
+                listed = 0
+                with dump as dump, normalizer as normalizer:
+                    cnt = 0
+                    for entry in entries:
+                        if debug_flag:
+                            dump.write(entry)
+                        if not entry or 'id' not in entry:
+                            continue
+                        if stop_ids and entry['id'] in stop_ids:
+                            print(f"取得済みの動画に到達したため一覧の取得を終了します (ID: {entry['id']})", flush=True)
+                            break
+                        listed += 1
+                        listed_video_ids.add(entry['id'])
+                        if entry['id'] in deleted_ids:
+                            print(f"削除済みのためスキップ: {entry.get('title', 'タイトル不明')} (ID: {entry['id']})", flush=True)
+                        else:
+                            cnt = cnt + 1
+                            print(f"No. {cnt}", end=' ::: ', flush=True)
+                            # 詳細情報の取得は一覧の取得を待たずに始める
+                            with profiling.hot_section('process_video_entry'):
+                                video_data = process_video_entry(entry, ydl_opts, normalizer)
+                            videos.append(video_data)
+                        if limit is not None and listed >= limit:
+                            break
+                    # プロセスプールで整形中の動画データを回収
+                    videos = [v.result() if isinstance(v, PendingVideoData) else v for v in videos]
+                print(f"一覧から取得した動画数: {listed} / 更新動画数: {cnt}", flush=True)
+                if listed == 0:
+                    print("チャンネルに動画が見つかりませんでした。", flush=True)
             else:
                 print("チャンネルに動画が見つかりませんでした。", flush=True)
                 
     except Exception as e:
         print(f"エラーが発生しました: {str(e)}", flush=True)
+        listing_failed = True
         return []
     
     return videos
 
+def settled_video_ids(archive_file):
+    """
+    アーカイブで確定済み（公開・配信から channel_feed.SETTLE_SECONDS 以上経過）の動画IDを取得
+
+    Args:
+        archive_file (str): アーカイブファイルのパス
+    Returns:
+        set: 動画IDの集合
+    """
+    if not os.path.exists(archive_file):
+        return set()
+    items = load_archive_items(archive_file)
+    settled_before = time.time() - channel_feed.SETTLE_SECONDS
+    return {
+        item.get('videoId')
+        for item, upload_ts in zip(items, parse_upload_dates([item.get('upload_date') for item in items]))
+        if upload_ts is not None and upload_ts < settled_before
+    }
+
 def load_json(input_file):
     """
     JSONファイルから動画情報を読み込み
@@ -422,7 +751,7 @@ def load_json(input_file):
         dict: 動画情報 {"items": list(dict), "tags": list(str), "last_updated": str, "total_videos": int}
     """
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
+        with open(input_file, 'r', encoding='utf-8') as f, profiling.hot_section('load_json'):
             data = json.load(f)
             if 'items' in data and isinstance(data['items'], list):
                 return data
@@ -439,6 +768,25 @@ def load_json(input_file):
         print(f"❌ 不明なエラー: {str(e)}", flush=True)
         return {}
 
+def get_start_date(video_id, video_url):
+    """
+    配信開始日時を取得（メモにあればブラウジングしない）
+
+    Args:
+        video_id (str): 動画ID
+        video_url (str): YouTube動画のURL
+    Returns:
+        str: 配信開始日時
+    """
+    start_time = live_date_memo.get(video_id)
+    if start_time:
+        print(f"   → ✓ メモから開始日時を取得: {start_time}", flush=True)
+        return start_time
+    start_time = get_live_date_info(video_url)
+    live_date_memo.put(video_id, start_time, normalize_timestamp(start_time)[0])
+    return start_time
+
+@replay.recorded('live_date')
 def get_live_date_info(video_url: str) -> str:
     """
     メンバー限定配信の開始日時はyt-dlpでは取得できないため、
@@ -464,18 +812,17 @@ def get_live_date_info(video_url: str) -> str:
     ]
 
     print(f"   → ✓ ブラウジングで開始日時を取得中: {video_url}", flush=True)
-    # SeleniumのWebDriverを使用してブラウジング
-    options = Options()
-    options.add_argument("--headless")  # ヘッドレスモードを使用
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+    # SeleniumのWebDriverを使用してブラウジング（プロセス内で使い回す）
+    import net  # requests・Seleniumはブラウジングが必要になった時点で読み込む
 
     result = "ページソースが取得できませんでした"
     for attempt in range(3):
         driver = None
         try:
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-            driver.get(video_url)
+            driver = net.get_webdriver()
+            page_url = net.rewrite_url(video_url)
+            rate_governor.acquire_url(page_url)
+            driver.get(page_url)
 
             # セレクタを順に試して配信開始日時を取得
             for sel in selectors:
@@ -491,7 +838,6 @@ def get_live_date_info(video_url: str) -> str:
                         print(f"     ┣ セレクタ '{sel}' で取得した配信開始日時 '{start_time}' は無効な形式です。", flush=True)
                         continue
                     print(f"    → ✓ セレクタ '{sel}' で配信開始日時を取得しました。", flush=True)
-                    driver.quit()
                     return start_time
 
                 except Exception as e:
@@ -502,17 +848,13 @@ def get_live_date_info(video_url: str) -> str:
                 result = driver.page_source
                 if not result:
                     result = "ページソースの取得に失敗しました（空の結果）"
-            driver.quit()
             print(f"     ┗ ✗ すべてのセレクタで配信開始日時の取得に失敗しました。", flush=True)
             break  # 成功したセレクタがなくてもWebDriverは動作したのでリトライ不要
             
         except Exception as e:
             print(f"   → △ ブラウジング試行 {attempt+1}/3 でエラー: {e}", flush=True)
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+            # WebDriverが壊れている可能性があるため次の試行で起動し直す
+            net.reset_webdriver()
         
         if attempt < 2:
             print(f"   → リトライします... ({attempt+2}/3)", flush=True)
@@ -521,36 +863,64 @@ def get_live_date_info(video_url: str) -> str:
     print(result, flush=True)
     raise Exception("failed get_live_date_info")
 
-def save_to_json(videos, output_file):
+def save_to_json(videos, output_file, listed_ids=None):
     """
     動画情報をJSONファイルに追加保存
+    マージ結果が既存ファイルと同じ場合は書き込まない（last_updatedも更新しない）
+    追加・更新された動画は変更フィード（change_feed）に追記する
+    読み込みから書き込みまではファイルごとにロックする（local_state.locked_file）
 
     Args:
         videos (list): 動画情報のリスト
         output_file (str): 出力ファイルパス
+        listed_ids (set): チャンネルの全件一覧で見つかった動画ID
+            指定した場合、一覧から消えた動画に removed を付け、変更フィードに removed として記録する
+
+    Returns:
+        bool: ファイルを書き込んだ場合True
     """
+    # get_archives.py・スケジューラ・放送予定枠トラッカーが同じファイルを同時に更新してもマージ結果を失わないようにする
+    with locked_file(output_file):
+        return _merge_and_save(videos, output_file, listed_ids)
 
+def _merge_and_save(videos, output_file, listed_ids=None):
     origin_data = load_json(output_file)
 
     if not origin_data:
         origin_data = {"items": []}
     origin_videos = origin_data.get("items", [])
+    origin_order = [v.get('videoId') for v in origin_videos]
+    # upload_tsがない既存データはupload_dateから一括変換して補完
+    missing = [v for v in origin_videos if 'upload_ts' not in v]
+    for v, upload_ts in zip(missing, parse_upload_dates([v.get('upload_date') for v in missing])):
+        v['upload_ts'] = upload_ts
+    # 動画IDで索引を作成
+    origin_index = {}
+    for v in origin_videos:
+        origin_index.setdefault(v['videoId'], []).append(v)
+    archive_file = Path(output_file).name
+    changes = []
     # 新しい動画情報を追加
     for video in videos:
         # 既存の動画IDと重複していたら更新
-        if any(v['videoId'] == video['videoId'] for v in origin_videos):
-            for v in origin_videos:
-                if v['videoId'] == video['videoId']:
-                    v.update(video)
+        if video['videoId'] in origin_index:
+            fields = {}
+            for v in origin_index[video['videoId']]:
+                fields.update({key: value for key, value in video.items() if v.get(key) != value})
+                v.update(video)
+            if fields:
+                changes.append(change_feed.make_change(archive_file, video['videoId'], change_feed.OP_UPDATED, fields))
         # 既存の動画IDと重複していない場合は新規追加
         else:
             origin_videos.append(video)
-    # upload_dateでソート
-    videos = sorted(origin_videos, key=lambda x: x.get('upload_date', ''), reverse=True)
-
-    # 出力ディレクトリを作成（存在しない場合）
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+            origin_index[video['videoId']] = [video]
+            changes.append(change_feed.make_change(archive_file, video['videoId'], change_feed.OP_ADDED, video))
+    if listed_ids is not None:
+        # アーカイブには残したまま、一覧から消えた・再び現れた動画に印を付けて記録する
+        changes.extend(change_feed.track_listing(archive_file, origin_index, listed_ids))
+    changed = bool(changes) or bool(missing)
+    # upload_tsでソート（安定ソートのため、同じ日時の動画は既存の順序を保つ、日時不明は末尾）
+    videos = sorted(origin_videos, key=lambda x: x['upload_ts'] if x.get('upload_ts') is not None else float('-inf'), reverse=True)
 
     # 存在するタグを抽出
     # 頻度の高さでソート
@@ -561,24 +931,74 @@ def save_to_json(videos, output_file):
                 tags[tag] = 0
             tags[tag] += 1
     tags = sorted(tags.items(), key=lambda x: x[1], reverse=True)
+    tag_names = [tag[0] for tag in tags]  # タグのリスト
+
+    # 内容・並び順・タグ・件数がすべて同じなら書き込まない
+    if (not changed
+            and [v.get('videoId') for v in videos] == origin_order
+            and tag_names == origin_data.get('tags')
+            and len(videos) == origin_data.get('total_videos')):
+        print(f"\nℹ️  {output_file} に変更はありません", flush=True)
+        print(f"📊 総動画数: {len(videos)}", flush=True)
+        record_changes(changes, output_file)
+        existing = binary_archive.open_binary_archive(output_file)
+        if existing is None:
+            save_binary_archive(videos, output_file)
+        else:
+            existing.close()
+        return False
 
     # JSON形式でデータを構築
     json_data = {
         "items": videos,
-        "tags": [tag[0] for tag in tags],  # タグのリスト
+        "tags": tag_names,
         "last_updated": datetime.now().isoformat(),
         "total_videos": len(videos)
     }
     
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        # 一時ファイルに書き込んでから置き換える（中断されても既存ファイルを壊さない）
+        with profiling.hot_section('save_to_json.write'):
+            write_json_atomic(output_file, json_data)
         
         print(f"\n✅ 動画情報を {output_file} に保存しました", flush=True)
         print(f"📊 総動画数: {len(videos)}", flush=True)
+        record_changes(changes, output_file)
+        save_binary_archive(videos, output_file)
+        return True
         
     except Exception as e:
         print(f"❌ ファイル保存エラー: {str(e)}", flush=True)
+        return False
+
+def record_changes(changes, output_file):
+    """
+    変更レコードを変更フィードに追記
+
+    Args:
+        changes (list): 変更レコードのリスト
+        output_file (str): アーカイブファイルのパス
+    """
+    try:
+        feed_path = change_feed.append_changes(changes, Path(output_file).parent)
+    except Exception as e:
+        print(f"⚠️  変更フィードの書き込みに失敗しました: {str(e)}", flush=True)
+        return
+    if feed_path:
+        print(f"📰 変更フィード: {len(changes)}件を {feed_path} に追記しました", flush=True)
+
+def save_binary_archive(videos, output_file):
+    """
+    ツール向けのバイナリ形式（.nanahapi/archives/*.nhb）を保存
+
+    Args:
+        videos (list): 保存したアーカイブの動画情報のリスト
+        output_file (str): アーカイブファイルのパス
+    """
+    try:
+        binary_archive.write_binary_archive(videos, output_file)
+    except Exception as e:
+        print(f"⚠️  バイナリ形式の保存に失敗しました: {str(e)}", flush=True)
 
 def check_dependencies():
     """
@@ -587,11 +1007,11 @@ def check_dependencies():
     Returns:
         bool: 依存関係が満たされている場合True
     """
+    # yt-dlpの読み込みは重いため、ここではインストールされているかだけを確認する（読み込みは初回の取得時）
     try:
-        import yt_dlp
-        print(f"✅ yt-dlp バージョン: {yt_dlp.version.__version__}", flush=True)
+        print(f"✅ yt-dlp バージョン: {importlib.metadata.version('yt-dlp')}", flush=True)
         return True
-    except ImportError:
+    except importlib.metadata.PackageNotFoundError:
         print("❌ yt-dlpがインストールされていません。", flush=True)
         print("以下のコマンドでインストールしてください:", flush=True)
         print("pip install yt-dlp", flush=True)
@@ -626,14 +1046,72 @@ def display_video_samples(videos, sample_count=3):
     if len(videos) > sample_count:
         print(f"\n... 他 {len(videos) - sample_count} 個の動画情報を更新しました", flush=True)
 
+def run_channel(channel, get_length=None):
+    """
+    1チャンネルのアーカイブを取得して保存
+
+    Args:
+        channel (str): YouTubeのハンドル（例: @koyuchan_）
+        get_length (int): 取得する動画の最大数（Noneなら全件）
+    Returns:
+        bool: 取得に成功した（または変更がなく省略した）場合True
+    """
+    global listing_failed
+    CHANNEL_URL = f"https://www.youtube.com/{channel}"
+    OUTPUT_FILE = f"docs/src/archives_{channel}.json"
+
+    # 同じプロセスで複数のチャンネルを処理するため、チャンネルごとの状態を初期化
+    listed_video_ids.clear()
+    listing_failed = False
+    # 配信開始日時のメモには、ブラウジングが必要になった時点でこのチャンネルのアーカイブだけを読み込む
+    live_date_memo.use_archive(OUTPUT_FILE)
+
+    # 最新分だけの更新では、チャンネルフィードで変更がなければyt-dlpでの巡回を省略する
+    if get_length is not None and get_length > 0 and channel_feed.is_enabled():
+        if channel_feed.channel_unchanged(channel, OUTPUT_FILE):
+            print("ℹ️  変更がないため動画情報の取得を省略します")
+            return True
+
+    # 動画情報を取得
+    print(f"🔍 チャンネル '{CHANNEL_URL}' から動画情報を取得します...")
+    videos = []
+    # 最新分だけの更新では、アーカイブで確定済みの動画に到達した時点で一覧の取得をやめる
+    stop_ids = settled_video_ids(OUTPUT_FILE) if get_length is not None and get_length > 0 else None
+    videos.extend(get_video_info(f'{CHANNEL_URL}', 'streams', get_length, stop_ids))
+    videos.extend(get_video_info(f'{CHANNEL_URL}', 'videos', get_length, stop_ids))
+    videos.extend(get_video_info(f'{CHANNEL_URL}', 'shorts', get_length, stop_ids))
+
+    if not listing_failed:
+        channel_feed.record_crawl(channel)
+
+    if videos:
+        # 全件を一覧できた場合だけ、一覧から消えた動画を変更フィードに記録する
+        complete_listing = (get_length is None or get_length <= 0) and not listing_failed
+        # JSONファイルに保存
+        save_to_json(videos, OUTPUT_FILE, listed_video_ids if complete_listing else None)
+
+        # 取得した動画の最初の3つを表示
+        display_video_samples(videos)
+
+    elif stop_ids and not listing_failed:
+        print("ℹ️  新しい動画・確定していない動画はありませんでした")
+            
+    else:
+        print("❌ 動画情報の取得に失敗しました。")
+        return False
+    return True
+
 def main():
     """
     メイン実行関数
+
+    使用方法:
+      python script/get_archives.py @ユーザー名 [取得動画数] [デバッグフラグ]
+      python script/get_archives.py --all [取得動画数] [デバッグフラグ]
+        --all  talent_info.json の全タレントを1つのプロセスで順番に取得（モジュールの読み込みは1回だけ）
     """
     global debug_flag
     global debug_videos
-    CHANNEL_URL = f"https://www.youtube.com/{sys.argv[1]}"
-    OUTPUT_FILE = f"docs/src/archives_{sys.argv[1]}.json"
 
     get_length = None  # デフォルトの取得動画数
     try:
@@ -661,23 +1139,31 @@ def main():
     if not check_dependencies():
         print("❌ 必要な依存関係が満たされていません。スクリプトを終了します。")
         sys.exit(1)
-    
-    # 動画情報を取得
-    print(f"🔍 チャンネル '{CHANNEL_URL}' から動画情報を取得します...")
-    videos = []
-    videos.extend(get_video_info(f'{CHANNEL_URL}', 'streams', get_length))
-    videos.extend(get_video_info(f'{CHANNEL_URL}', 'videos', get_length))
-    videos.extend(get_video_info(f'{CHANNEL_URL}', 'shorts', get_length))
-
-    if videos:
-        # JSONファイルに保存
-        save_to_json(videos, OUTPUT_FILE)
 
-        # 取得した動画の最初の3つを表示
-        display_video_samples(videos)
-            
-    else:
-        print("❌ 動画情報の取得に失敗しました。")
+    if sys.argv[1] == '--all':
+        channels = []
+        for talent in load_talents():
+            if talent.get('yt'):
+                channels.append((talent.get('name', '不明'), talent['yt']))
+            else:
+                print(f"⚠️  {talent.get('name', '不明')}: YouTubeチャンネル情報がありません")
+        failed = []
+        for name, channel in channels:
+            print(f"\n📺 {name} ({channel}) のアーカイブを取得中...", flush=True)
+            # 1つのチャンネルの予期しないエラーで残りのチャンネルを止めない
+            try:
+                succeeded = run_channel(channel, get_length)
+            except Exception as e:
+                print(f"❌ {channel} の取得中にエラーが発生しました: {type(e).__name__}: {e}", flush=True)
+                succeeded = False
+            if not succeeded:
+                failed.append(channel)
+        if failed:
+            print(f"\n⚠️  取得に失敗したチャンネル: {', '.join(failed)}")
+        # 一部のチャンネルの失敗では他のチャンネルの結果を保存したまま正常終了する
+        if channels and len(failed) == len(channels):
+            sys.exit(1)
+    elif not run_channel(sys.argv[1], get_length):
         sys.exit(1)
 
     # デバッグモードで動画情報を保存
@@ -688,6 +1174,9 @@ def main():
             json.dump(debug_videos, f, ensure_ascii=False, indent=2)
         print(f"デバッグ動画情報を {len(debug_videos)} 件保存しました")
 
+    live_date_memo.report()
+    live_date_memo.compact()
+
     # 実行時間を表示
     end_time = datetime.now()
     execution_time = end_time - start_time
@@ -696,4 +1185,5 @@ def main():
 
 if __name__ == "__main__":
     print(len(sys.argv))
-    main()
+    with profiling.run('get_archives'):
+        main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+yt-dlpの詳細情報（extract_infoの結果）のキャッシュ
+get_archives.py が取得した動画ごとの詳細情報を圧縮して .nanahapi/info_cache/ に保存し、
+整形ルールを変えたときにネットワークに接続せずアーカイブを作り直せるようにします（renormalize_archives.py）。
+
+  blobs/<ハッシュ先頭2文字>/<ハッシュ>.json.gz  内容のSHA-256で名前をつけた圧縮済みJSON（同じ内容は1つだけ保存）
+  index.sqlite                                   動画ID → ハッシュ・サイズ・取得日時・有効期限・最終アクセス日時
+
+放送前・配信中など内容が変わる状態の詳細情報には有効期限をつけ、期限切れのものは使いません。
+合計サイズが上限を超えた場合は最後に使われた日時が古いものから削除します。
+
+環境変数:
+  NANAHAPI_INFO_CACHE        0 でキャッシュを無効化
+  NANAHAPI_INFO_CACHE_MB     合計サイズの上限（MB、デフォルト: 512）
+  NANAHAPI_INFO_CACHE_TTL    内容が変わる状態の詳細情報の有効期限（秒、デフォルト: 3600）
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+
+from local_state import state_path
+
+CACHE_DIR_NAME = 'info_cache'
+INDEX_FILE = 'index.sqlite'
+
+# 内容が変わる状態（live_status）
+MUTABLE_LIVE_STATUSES = ('is_upcoming', 'is_live', 'post_live')
+
+# 署名つきの一時的なURLを含み、詳細情報の大半を占める項目は保存しない
+DROPPED_FIELDS = ('formats', 'requested_formats', 'automatic_captions', 'subtitles', 'http_headers')
+
+def _env_number(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return float(default)
+
+def is_enabled():
+    """
+    キャッシュが有効か確認
+
+    Returns:
+        bool: 有効な場合True
+    """
+    return os.getenv('NANAHAPI_INFO_CACHE', '1').strip() != '0'
+
+def _encode(video_info):
+    """
+    詳細情報を保存用のバイト列に変換（キーを並べて同じ内容が同じバイト列になるようにする）
+    """
+    payload = {key: value for key, value in video_info.items() if not key.startswith('_') and key not in DROPPED_FIELDS}
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+class InfoCache:
+    """
+    動画IDで索引した詳細情報のキャッシュ
+    """
+    def __init__(self, cache_dir=None, max_bytes=None, mutable_ttl=None):
+        self.cache_dir = cache_dir or state_path(CACHE_DIR_NAME)
+        self.max_bytes = max_bytes if max_bytes is not None else int(_env_number('NANAHAPI_INFO_CACHE_MB', 512) * 1024 * 1024)
+        self.mutable_ttl = mutable_ttl if mutable_ttl is not None else _env_number('NANAHAPI_INFO_CACHE_TTL', 3600)
+        self._db = None
+        self._total = None  # 合計サイズ（最初の確認時に索引から計算し、以降は保存・削除のたびに更新）
+
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.cache_dir, INDEX_FILE))
+            # 1件ごとに書き込むため、WALでコミットのたびの同期を減らす
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' video_id TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL,'
+                ' fetched_at REAL NOT NULL, expires_at REAL, last_access REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)')
+        return self._db
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, 'blobs', digest[:2], f"{digest}.json.gz")
+
+    def put(self, video_id, video_info):
+        """
+        詳細情報を保存
+
+        Args:
+            video_id (str): 動画ID
+            video_info (dict): extract_infoの結果
+        """
+        data = _encode(video_info)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        size = None
+        added = 0
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                # mtimeを固定して同じ内容が同じバイト列になるようにする
+                f.write(gzip.compress(data, compresslevel=6, mtime=0))
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            added = size
+
+        now = time.time()
+        expires_at = now + self.mutable_ttl if video_info.get('live_status') in MUTABLE_LIVE_STATUSES else None
+        db = self._connect()
+        row = db.execute('SELECT digest, size FROM entries WHERE video_id = ?', (video_id,)).fetchone()
+        with db:
+            db.execute(
+                'INSERT OR REPLACE INTO entries (video_id, digest, size, fetched_at, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)',
+                (video_id, digest, size, now, expires_at, now),
+            )
+        freed = 0
+        if row and row[0] != digest and self._remove_blob_if_unused(row[0]):
+            freed = row[1]
+        if self._total is None:
+            self.evict()
+        else:
+            self._total += added - freed
+            if self._total > self.max_bytes:
+                self.evict()
+
+    def get(self, video_id):
+        """
+        詳細情報を取得
+
+        Args:
+            video_id (str): 動画ID
+        Returns:
+            dict: extract_infoの結果（保存されていない・期限切れの場合はNone）
+        """
+        db = self._connect()
+        row = db.execute('SELECT digest, expires_at FROM entries WHERE video_id = ?', (video_id,)).fetchone()
+        now = time.time()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        try:
+            with open(self._blob_path(row[0]), 'rb') as f:
+                video_info = json.loads(gzip.decompress(f.read()))
+        except (OSError, EOFError, ValueError):
+            self.delete(video_id)
+            return None
+        with db:
+            db.execute('UPDATE entries SET last_access = ? WHERE video_id = ?', (now, video_id))
+        return video_info
+
+    def delete(self, video_id):
+        """
+        詳細情報を削除
+
+        Args:
+            video_id (str): 動画ID
+        Returns:
+            int: 解放したバイト数（他の動画と共有している内容は削除しない）
+        """
+        db = self._connect()
+        row = db.execute('SELECT digest, size FROM entries WHERE video_id = ?', (video_id,)).fetchone()
+        if row is None:
+            return 0
+        with db:
+            db.execute('DELETE FROM entries WHERE video_id = ?', (video_id,))
+        freed = row[1] if self._remove_blob_if_unused(row[0]) else 0
+        if self._total is not None:
+            self._total -= freed
+        return freed
+
+    def _remove_blob_if_unused(self, digest):
+        if self._connect().execute('SELECT 1 FROM entries WHERE digest = ? LIMIT 1', (digest,)).fetchone():
+            return False
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def total_bytes(self):
+        """
+        保存している圧縮済みJSONの合計サイズ（同じ内容は1回だけ数える）
+
+        Returns:
+            int: バイト数
+        """
+        row = self._connect().execute('SELECT SUM(size) FROM (SELECT DISTINCT digest, size FROM entries)').fetchone()
+        return row[0] or 0
+
+    def evict(self):
+        """
+        期限切れの詳細情報を削除し、合計サイズが上限を超えていれば最終アクセスが古いものから削除
+
+        Returns:
+            int: 削除した件数
+        """
+        db = self._connect()
+        removed = 0
+        expired = [row[0] for row in db.execute('SELECT video_id FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),))]
+        for video_id in expired:
+            self.delete(video_id)
+            removed += 1
+        total = self.total_bytes()
+        if total > self.max_bytes:
+            for video_id, in db.execute('SELECT video_id FROM entries ORDER BY last_access').fetchall():
+                total -= self.delete(video_id)
+                removed += 1
+                if total <= self.max_bytes:
+                    break
+        self._total = total
+        return removed
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+_cache = None
+
+def get_cache():
+    """
+    プロセス内で共有するキャッシュを取得
+
+    Returns:
+        InfoCache: キャッシュ（無効な場合はNone）
+    """
+    global _cache
+    if not is_enabled():
+        return None
+    if _cache is None:
+        _cache = InfoCache()
+    return _cache
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+YouTube動画ページの判定ロジック
+check_video_links.py / check_video_links_fast.py で共通して使用します。
+"""
+
+import re
+from collections import namedtuple
+
+# 判定結果
+#  is_valid: 正常とみなすか
+#  kind: 判定の種類（ok, members_only, login_required, unplayable, error, deleted, private, region, no_player）
+#  message: エラーメッセージ（正常時は空文字）
+#  status: playabilityStatusのstatus（取得できなかった場合は空文字）
+PageVerdict = namedtuple('PageVerdict', ['is_valid', 'kind', 'message', 'status'])
+
+# メンバー限定動画のパターン
+MEMBER_PATTERNS = ['members-only', 'membership', 'メンバー限定', 'メンバーシップ']
+
+# 削除された動画のパターン
+DELETED_PATTERNS = [
+    'video unavailable',
+    'this video is no longer available',
+    'this video has been removed',
+    'video removed',
+    'deleted video'
+]
+
+# 非公開動画のパターン
+PRIVATE_PATTERNS = [
+    'this video is private',
+    'private video',
+    'this video is unavailable'
+]
+
+# 地域制限のパターン
+REGION_PATTERNS = [
+    'not available in your country',
+    'video not available',
+    'blocked in your country'
+]
+
+# 正常な動画ページの兆候
+WATCH_PAGE_INDICATORS = ['ytd-watch-flexy', 'watch-main-col', 'player-wrap']
+
+class WatchPageMatcher:
+    """
+    判定に使うパターンを事前にコンパイルして保持する照合器
+    ページは一度だけ小文字化し（バイト列のままASCIIのみ変換）、
+    優先順位の高い判定から順に照合して最初に当たった判定を返す
+    """
+    def __init__(self):
+        # YouTubeのplayabilityStatus（最も確実な方法）
+        self.playability_pattern = re.compile(rb'"playabilitystatus":\{.*?"status":"([^"]*?)"')
+        self.member_patterns = tuple(pattern.encode('utf-8') for pattern in MEMBER_PATTERNS)
+        # (判定の種類, メッセージの接頭辞, 表示用パターン, 照合用パターン) を優先順に並べたもの
+        self.verdict_patterns = tuple(
+            (kind, prefix, pattern, pattern.encode('utf-8'))
+            for kind, prefix, patterns in (
+                ('deleted', '動画が削除されています', DELETED_PATTERNS),
+                ('private', '非公開動画', PRIVATE_PATTERNS),
+                ('region', '地域制限', REGION_PATTERNS),
+            )
+            for pattern in patterns
+        )
+        self.indicators = tuple(indicator.encode('utf-8') for indicator in WATCH_PAGE_INDICATORS)
+
+    def classify(self, page) -> PageVerdict:
+        """
+        動画ページから動画の状態を判定
+
+        Args:
+            page (bytes or str): 動画ページのHTML（レスポンスのバイト列をそのまま渡すのが最速）
+        Returns:
+            PageVerdict: 判定結果
+        """
+        if isinstance(page, str):
+            page = page.encode('utf-8')
+        content = page.lower()
+
+        playability_match = self.playability_pattern.search(content)
+        status = ''
+        if playability_match:
+            status = playability_match.group(1).decode('utf-8', 'replace').upper()
+            if status == 'LOGIN_REQUIRED':
+                return PageVerdict(False, 'login_required', f"非公開動画（ログイン必須）: status={status}", status)
+            elif status == 'UNPLAYABLE':
+                # メンバー限定動画かチェック
+                if any(pattern in content for pattern in self.member_patterns):
+                    return PageVerdict(True, 'members_only', "", status)  # メンバー限定動画は正常とみなす
+                return PageVerdict(False, 'unplayable', f"再生不可能な動画: status={status}", status)
+            elif status == 'ERROR':
+                return PageVerdict(False, 'error', f"動画エラー（削除済みの可能性）: status={status}", status)
+
+        for kind, prefix, label, pattern in self.verdict_patterns:
+            if pattern in content:
+                return PageVerdict(False, kind, f"{prefix}: {label}", status)
+
+        # 正常な動画ページの兆候をチェック
+        if any(indicator in content for indicator in self.indicators):
+            return PageVerdict(True, 'ok', "", status)
+
+        # 動画プレイヤーが見つからない場合は問題の可能性
+        if b'player' not in content and b'video' not in content:
+            return PageVerdict(False, 'no_player', "動画プレイヤーが見つかりません（問題の可能性）", status)
+
+        return PageVerdict(True, 'ok', "", status)
+
+_matcher = WatchPageMatcher()
+
+def classify_watch_page(page) -> PageVerdict:
+    """
+    動画ページから動画の状態を判定
+
+    Args:
+        page (bytes or str): 動画ページのHTML
+    Returns:
+        PageVerdict: 判定結果
+    """
+    return _matcher.classify(page)
+
+# ログイン必須のページをチェックし直す回数の目安（判定メッセージに含める）
+LOGIN_REQUIRED_RETRIES = 3
+# チェックし直してもログイン必須だった動画の判定メッセージの末尾
+LOGIN_REQUIRED_RETRIED_SUFFIX = '回リトライ後)'
+
+def login_required_message(status, retries=LOGIN_REQUIRED_RETRIES):
+    """
+    チェックし直してもログイン必須だった動画の判定メッセージ
+    一度だけのLOGIN_REQUIREDはレート制限の兆候のことがあるため、チェックし直した結果と区別する
+
+    Args:
+        status (str): playabilityStatusのstatus
+        retries (int): チェックし直した回数
+    Returns:
+        str: 判定メッセージ
+    """
+    return f"非公開動画: status={status} ({retries}{LOGIN_REQUIRED_RETRIED_SUFFIX}"
+
+def is_unconfirmed_login_required(message):
+    """
+    チェックし直していないログイン必須の判定メッセージか確認
+
+    Args:
+        message (str): 判定メッセージ
+    Returns:
+        bool: 一度だけのLOGIN_REQUIREDの場合True
+    """
+    return 'status=LOGIN_REQUIRED' in (message or '') and not message.endswith(LOGIN_REQUIRED_RETRIED_SUFFIX)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+配信開始日時のメモ
+メンバー限定配信などでブラウジングして取得した配信開始日時を動画IDごとに .nanahapi/live_date_memo.json に保存し、
+同じ動画でWebDriverを何度も起動しないようにします。
+新しく取得した日時は .nanahapi/live_date_memo.jsonl に1行ずつ追記し、実行の最後に compact() でメモにまとめます
+（中断された場合は次回の読み込み時に追記分も読み込みます）。
+処理中のチャンネルのアーカイブのupload_date（放送済みのもの）も、最初に参照したときにメモとして使います。
+"""
+
+import json
+import time
+
+from archive_utils import load_archive_items, parse_upload_dates
+from local_state import load_state_json, save_state_json, state_path, locked_file
+
+MEMO_FILE = 'live_date_memo.json'
+JOURNAL_FILE = 'live_date_memo.jsonl'
+
+def _read_journal(memo):
+    """
+    追記分をメモに反映
+
+    Args:
+        memo (dict): メモ（更新される）
+    Returns:
+        bool: 追記分があった場合True
+    """
+    try:
+        with open(state_path(JOURNAL_FILE), 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return False
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # 書き込み途中で中断された行は無視する
+            continue
+        memo[record['videoId']] = record['start_time']
+    return True
+
+class LiveDateMemo:
+    """
+    動画ID → 配信開始日時（タイムゾーンつきのISO形式）のメモ
+    開始日時が変わりうる放送前の枠は記録しない
+    """
+    def __init__(self):
+        self.memo = None
+        self.archives = []  # use_archive() で指定されたアーカイブファイル
+        self.seeded = set()  # メモに読み込み済みのアーカイブファイル
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if self.memo is not None:
+            return
+        self.memo = load_state_json(MEMO_FILE, {})
+        _read_journal(self.memo)
+
+    def use_archive(self, file_path):
+        """
+        処理中のチャンネルのアーカイブを、最初に参照したときにメモとして使うように指定
+
+        Args:
+            file_path (str): アーカイブファイルのパス
+        """
+        self.archives.append(str(file_path))
+
+    def _seed_from_archives(self):
+        """
+        指定されたアーカイブのupload_date（日本時間）のうち放送済みのものをメモに追加
+        アーカイブ自体が元のデータのため、メモのファイルには保存しない
+
+        Returns:
+            int: 追加した件数
+        """
+        now = time.time()
+        seeded = 0
+        for file_path in self.archives:
+            if file_path in self.seeded:
+                continue
+            self.seeded.add(file_path)
+            items = [item for item in load_archive_items(file_path) if item.get('videoId') not in self.memo]
+            upload_ts = parse_upload_dates([item.get('upload_date') for item in items])
+            for item, ts in zip(items, upload_ts):
+                if ts is None or ts > now:
+                    continue
+                # アーカイブは日本時間（タイムゾーン表記なし）で保存されているため明示する
+                self.memo[item['videoId']] = f"{item['upload_date']}+09:00"
+                seeded += 1
+        if seeded:
+            print(f"🧠 配信開始日時メモをアーカイブから{seeded}件補完しました", flush=True)
+        return seeded
+
+    def get(self, video_id):
+        """
+        メモから配信開始日時を取得
+
+        Args:
+            video_id (str): 動画ID
+        Returns:
+            str: 配信開始日時（メモにない場合はNone）
+        """
+        self._load()
+        self._seed_from_archives()
+        start_time = self.memo.get(video_id)
+        if start_time:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return start_time
+
+    def put(self, video_id, start_time, start_ts=None):
+        """
+        ブラウジングで取得した配信開始日時を記録（放送前の枠は記録しない）
+        メモ全体は書き直さず、追記分のファイルに1行追記する
+
+        Args:
+            video_id (str): 動画ID
+            start_time (str): 配信開始日時
+            start_ts (int): 配信開始日時のエポック秒（不明ならNone）
+        """
+        self._load()
+        if start_ts is None or start_ts > time.time():
+            return
+        self.memo[video_id] = start_time
+        journal_path = state_path(JOURNAL_FILE)
+        journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with locked_file(state_path(MEMO_FILE)), open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'videoId': video_id, 'start_time': start_time}, ensure_ascii=False) + "\n")
+
+    def compact(self):
+        """
+        追記分をメモのファイルにまとめて追記分のファイルを削除（実行の最後に1回呼ぶ）
+        """
+        with locked_file(state_path(MEMO_FILE)):
+            memo = load_state_json(MEMO_FILE, {})
+            if not _read_journal(memo):
+                return
+            save_state_json(MEMO_FILE, memo)
+            state_path(JOURNAL_FILE).unlink(missing_ok=True)
+
+    def report(self):
+        """
+        メモのヒット率を表示
+        """
+        total = self.hits + self.misses
+        if total == 0:
+            return
+        print(f"🧠 配信開始日時メモ: {self.hits}/{total}件ヒット ({self.hits / total * 100:.1f}%)、ブラウジング {self.misses}件", flush=True)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+リンクチェッカーの負荷試験
+fake_youtube_server.py の代役サーバーを起動し、合成したアーカイブの動画をチェッカーでチェックして
+所要時間・速度・サーバーが返した429/503の数と、代役サーバーの正解との一致を表示します。
+ネットワークに接続しないため、並列数・バックオフ・キャッシュの変更を同じ条件で何度でも比較できます。
+--dates を指定すると、配信開始日時のブラウジング（get_live_date_info）も代役サーバーに向けて実行します（Seleniumが必要）。
+
+対象:
+  sequential     check_video_links.py（リクエスト間隔0）
+  adaptive       check_video_links.py --adaptive
+  fast           check_video_links_fast.py（リクエスト間隔0）
+  fast_adaptive  check_video_links_fast.py --adaptive
+
+使用方法:
+  python script/load_test_checkers.py [--count 200] [--modes sequential,adaptive] [--latency 50] [--throttle-rps 20]
+                                      [--error-rate 0.01] [--login-rate 0.01] [--mix ...] [--seed 0] [--dates 5] [--governor]
+  例: python script/load_test_checkers.py --count 500 --latency 80 --throttle-rps 15 --mix public=95,deleted=5
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import tempfile
+import contextlib
+import logging
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_youtube_server import FakeYouTube, FakeYouTubeServer, DATED_KINDS, KIND_PUBLIC, KIND_MEMBERS_ONLY, KIND_UPCOMING, parse_mix
+
+MODES = ('sequential', 'adaptive', 'fast', 'fast_adaptive')
+
+# チェッカーが正常とみなす動画の種類
+VALID_KINDS = (KIND_PUBLIC, KIND_MEMBERS_ONLY, KIND_UPCOMING)
+
+@contextlib.contextmanager
+def _quiet():
+    """負荷試験中の進捗出力を抑制"""
+    previous_level = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            yield
+        finally:
+            logging.disable(previous_level)
+
+def write_archive(archives_dir, count):
+    """
+    合成したアーカイブファイルを作成
+
+    Args:
+        archives_dir (Path): 出力先のディレクトリ
+        count (int): 動画数
+    Returns:
+        list: 動画IDのリスト
+    """
+    video_ids = [f"load{i:07d}" for i in range(count)]
+    items = [{
+        'videoId': video_id,
+        'title': f"【負荷試験】合成配信 No.{i}",
+        'video_url': f"https://www.youtube.com/watch?v={video_id}",
+        'upload_date': '2026-01-01T21:00:00',
+        'tags': [],
+    } for i, video_id in enumerate(video_ids)]
+    with open(archives_dir / 'archives_@load_test.json', 'w', encoding='utf-8') as f:
+        json.dump({'items': items}, f, ensure_ascii=False)
+    return video_ids
+
+def run_checker(mode, archives_dir, count):
+    """
+    チェッカーを実行
+
+    Args:
+        mode (str): 対象（MODES のいずれか）
+        archives_dir (Path): アーカイブファイルのディレクトリ
+        count (int): 動画数
+    Returns:
+        チェック後のチェッカー
+    """
+    import check_video_links
+    import check_video_links_fast
+
+    adaptive = mode.endswith('adaptive')
+    if mode.startswith('fast'):
+        checker = check_video_links_fast.FastVideoLinkChecker(archives_dir=str(archives_dir))
+        checker.quick_check(sample_size=count, delay=0, adaptive=adaptive)
+    else:
+        checker = check_video_links.VideoLinkChecker(archives_dir=str(archives_dir), checkpoint_path=archives_dir / 'checkpoint.jsonl')
+        checker.check_all_links(delay=0, adaptive=adaptive)
+    return checker
+
+def score(checker, fake):
+    """
+    チェック結果を代役サーバーの正解と比較
+
+    Args:
+        checker: チェック後のチェッカー
+        fake (FakeYouTube): 代役サーバーの設定
+    Returns:
+        tuple: (正解と一致した件数, 一致しなかった動画IDのリスト)
+    """
+    correct = 0
+    wrong = []
+    for video_id, is_valid, _, _ in checker.availability_results:
+        if is_valid == (fake.video_kind(video_id) in VALID_KINDS):
+            correct += 1
+        else:
+            wrong.append(video_id)
+    return correct, wrong
+
+def check_dates(fake, video_ids, count):
+    """
+    配信開始日時のブラウジングを代役サーバーに向けて実行
+
+    Args:
+        fake (FakeYouTube): 代役サーバーの設定
+        video_ids (list): 動画IDのリスト
+        count (int): ブラウジングする動画数
+    Returns:
+        bool: すべて正解と一致した場合True
+    """
+    import get_archives
+
+    targets = [video_id for video_id in video_ids if fake.video_kind(video_id) in DATED_KINDS][:count]
+    start = time.perf_counter()
+    mismatches = []
+    for video_id in targets:
+        with _quiet():
+            start_time = get_archives.get_live_date_info(f"https://www.youtube.com/watch?v={video_id}")
+        if start_time != fake.start_time(video_id):
+            mismatches.append(video_id)
+    elapsed = time.perf_counter() - start
+    print(f"  {'dates':<14} {len(targets):>6d}件 {elapsed:8.2f}秒 {len(targets) / elapsed if elapsed > 0 else 0:8.1f}件/秒  不一致 {len(mismatches)}")
+    return not mismatches
+
+def main():
+    """
+    メイン関数
+    """
+    parser = argparse.ArgumentParser(description='リンクチェッカーの負荷試験')
+    parser.add_argument('--count', type=int, default=200, help='動画数')
+    parser.add_argument('--modes', default='sequential,adaptive', help=f"対象（カンマ区切り: {','.join(MODES)}）")
+    parser.add_argument('--latency', type=float, default=50.0, help='レスポンスの遅延（ミリ秒）')
+    parser.add_argument('--jitter', type=float, default=20.0, help='遅延のばらつき（ミリ秒）')
+    parser.add_argument('--throttle-rps', type=float, default=0.0, help='これを超える毎秒のリクエストに429を返す（0で無効）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503を返す割合')
+    parser.add_argument('--login-rate', type=float, default=0.0, help='公開動画で一時的なLOGIN_REQUIREDを返す割合')
+    parser.add_argument('--mix', default='', help='動画の種類の割合（例: public=95,deleted=5）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dates', type=int, default=0, help='配信開始日時をブラウジングする動画数（Seleniumが必要）')
+    parser.add_argument('--governor', action='store_true', help='リクエスト予算（rate_governor）を有効にしたまま実行')
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(',') if mode in MODES]
+    if not modes:
+        print(f"❌ 対象を指定してください: {','.join(MODES)}")
+        sys.exit(1)
+    try:
+        mix = parse_mix(args.mix) if args.mix else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    fake = FakeYouTube(mix=mix, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                       throttle_rps=args.throttle_rps, error_rate=args.error_rate,
+                       login_rate=args.login_rate, seed=args.seed)
+
+    print("🧪 リンクチェッカーの負荷試験")
+    print("=" * 50)
+    failed = False
+    with FakeYouTubeServer(fake) as server, tempfile.TemporaryDirectory() as tmp_dir:
+        archives_dir = Path(tmp_dir)
+        os.environ['NANAHAPI_YOUTUBE_BASE_URL'] = server.url
+        os.environ['NANAHAPI_STATE_DIR'] = str(archives_dir / 'state')
+        if not args.governor:
+            # 予算の待機ではなくチェッカーとサーバーの振る舞いを測る
+            os.environ['NANAHAPI_RATE_GOVERNOR'] = '0'
+        video_ids = write_archive(archives_dir, args.count)
+        print(f"📦 合成アーカイブ: {args.count}件 / 代役サーバー: {server.url}")
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)  # チェッカーのレポート出力先を一時ディレクトリにする
+        try:
+            for mode in modes:
+                before = dict(fake.stats)
+                start = time.perf_counter()
+                with _quiet():
+                    checker = run_checker(mode, archives_dir, args.count)
+                elapsed = time.perf_counter() - start
+                stats = {key: fake.stats[key] - before[key] for key in fake.stats}
+                correct, wrong = score(checker, fake)
+                unconfirmed = len(checker.unconfirmed_links)
+                print(f"  {mode:<14} {args.count:>6d}件 {elapsed:8.2f}秒 {args.count / elapsed:8.1f}件/秒  "
+                      f"リクエスト {stats['requests']} (429: {stats['throttled']}, 503: {stats['errors']})  "
+                      f"正解 {correct} / 不一致 {len(wrong)} / 未確認 {unconfirmed}"
+                      + (f"  最終の並列数 {checker.controller.concurrency}" if checker.controller else ""), flush=True)
+                if wrong:
+                    print(f"    ❌ 不一致: {', '.join(wrong[:5])}{' ほか' if len(wrong) > 5 else ''}")
+                    failed = True
+            if args.dates:
+                try:
+                    failed = not check_dates(fake, video_ids, args.dates) or failed
+                except ImportError as e:
+                    print(f"  ⚠️  ブラウジングを実行できません（{e}）")
+        finally:
+            os.chdir(cwd)
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
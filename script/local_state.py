@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+ローカル状態ファイルの保存先
+スケジューラの状態やキャッシュなど、公開しないデータは .nanahapi/ 以下に保存します。
+
+環境変数:
+  NANAHAPI_STATE_DIR  保存先ディレクトリ（デフォルト: .nanahapi）
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import contextlib
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windowsではロックしない
+    fcntl = None
+
+DEFAULT_STATE_DIR = '.nanahapi'
+LOCKS_DIR = 'locks'
+
+def state_path(*parts):
+    """
+    状態ファイルのパスを取得
+
+    Args:
+        *parts (str): 保存先ディレクトリからの相対パス
+    Returns:
+        Path: パス
+    """
+    return Path(os.getenv('NANAHAPI_STATE_DIR', DEFAULT_STATE_DIR), *parts)
+
+def load_state_json(name, default=None):
+    """
+    状態ファイル（JSON）を読み込み
+
+    Args:
+        name (str): ファイル名
+        default: ファイルが存在しない・壊れている場合の値
+    Returns:
+        読み込んだデータ
+    """
+    path = state_path(name)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️  状態ファイルの読み込みに失敗しました: {path} - {e}", flush=True)
+        return default
+
+def write_json_atomic(path, data, indent=2):
+    """
+    JSONファイルを一時ファイル経由で書き込み（途中で中断されても壊れないようにする）
+
+    Args:
+        path (str or Path): 出力ファイルパス
+        data: JSONに変換可能なデータ
+        indent (int): インデント
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+@contextlib.contextmanager
+def locked_file(path):
+    """
+    ファイルの読み込み・マージ・書き込みの間、別のプロセスが同じファイルを更新しないようにロック
+    ロックファイルは公開するディレクトリを汚さないよう .nanahapi/locks/ に作る
+
+    Args:
+        path (str or Path): ロックする対象のファイルパス
+    """
+    if fcntl is None:
+        yield
+        return
+    path = Path(path).resolve()
+    lock_path = state_path(LOCKS_DIR, f"{path.name}.{hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:12]}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def save_state_json(name, data):
+    """
+    状態ファイル（JSON）を保存
+
+    Args:
+        name (str): ファイル名
+        data: JSONに変換可能なデータ
+    """
+    write_json_atomic(state_path(name), data)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+共通のネットワーク層
+リンクチェッカーなどのHTTPアクセスはプロセス内で共有するセッションを使い、
+keep-aliveの接続プール・共通ヘッダー・タイムアウト・リトライを揃えます。
+配信開始日時のブラウジングもWebDriverを使い回します。
+送信のたびに（リダイレクト・リトライを含む）rate_governor でプロセス間共有のホストごとの予算からトークンを取得します。
+
+環境変数:
+  NANAHAPI_HTTP_POOL  ホストごとの最大接続数（デフォルト: 10）
+  NANAHAPI_HTTP2      1 でhttpxのHTTP/2クライアントを使用（httpx[http2]が必要、なければ通常のセッション）
+  NANAHAPI_DNS_TTL    名前解決結果をキャッシュする秒数（デフォルト: 300、0で無効）
+  NANAHAPI_YOUTUBE_BASE_URL  YouTubeへのアクセスを送る先（例: http://127.0.0.1:8765、fake_youtube_server.py での負荷試験用）
+"""
+
+import os
+import time
+import atexit
+import socket
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import replay
+import rate_governor
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'ja-JP,ja;q=0.9,en;q=0.8',
+}
+DEFAULT_TIMEOUT = (5, 15)  # (接続, 読み込み) 秒
+RETRY_STATUSES = (500, 502, 503, 504)
+YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'youtu.be')
+
+_session = None  # プロセス内で共有するセッション
+_session_lock = threading.Lock()
+_webdriver = None  # プロセス内で共有するWebDriver
+
+def _pool_size():
+    try:
+        return max(1, int(os.getenv('NANAHAPI_HTTP_POOL', '10')))
+    except ValueError:
+        return 10
+
+def rewrite_url(url):
+    """
+    NANAHAPI_YOUTUBE_BASE_URL が指定されている場合、YouTubeのURLをその送り先に書き換え
+
+    Args:
+        url (str): リクエストするURL
+    Returns:
+        str: 送り先のURL（指定がない・YouTube以外の場合はそのまま）
+    """
+    base_url = os.getenv('NANAHAPI_YOUTUBE_BASE_URL', '').strip().rstrip('/')
+    if not base_url:
+        return url
+    parts = urlsplit(url)
+    if (parts.hostname or '').lower() not in YOUTUBE_HOSTS:
+        return url
+    if parts.hostname.lower() == 'youtu.be':
+        return f"{base_url}/watch?v={parts.path.lstrip('/')}"
+    return f"{base_url}{parts.path or '/'}{'?' + parts.query if parts.query else ''}"
+
+class GovernedRetry(Retry):
+    """
+    urllib3がリクエストを送り直す前に、接続先のホストの予算からトークンを取得するRetry
+    """
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        # 回数を使い切った場合は上の呼び出しが例外を投げるため、ここに来るのは送り直す場合だけ
+        rate_governor.acquire(getattr(_pool, 'host', None) or '')
+        return retry
+
+def _retry_policy():
+    return GovernedRetry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'HEAD', 'GET'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # リトライ後も失敗した場合は最後のレスポンスを返す
+    )
+
+class PooledSession(requests.Session):
+    """
+    接続プール・リトライ・デフォルトのタイムアウトを設定したrequests.Session
+    """
+    def __init__(self, pool_size=None):
+        super().__init__()
+        pool_size = pool_size or _pool_size()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=_retry_policy())
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.headers.update(DEFAULT_HEADERS)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        return super().request(method, rewrite_url(url), **kwargs)
+
+    def send(self, request, **kwargs):
+        # リダイレクト先へのリクエストもsend()を通るため、送信ごとにトークンを取得する
+        # （アダプター内でのurllib3のリトライは GovernedRetry が取得する）
+        rate_governor.acquire_url(request.url)
+        return super().send(request, **kwargs)
+
+class Http2Session:
+    """
+    httpxのHTTP/2クライアントをrequests互換のhead/getで使うためのラッパー
+    httpxの例外はチェッカーが扱えるようにrequestsの例外に変換する
+    """
+    def __init__(self, pool_size=None):
+        import httpx
+        pool_size = pool_size or _pool_size()
+        self._httpx = httpx
+        self.client = httpx.Client(
+            http2=True,
+            headers=DEFAULT_HEADERS,
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+            # リダイレクト先へのリクエストも含め、送信ごとにトークンを取得する
+            # （transportのretriesは接続の確立に失敗した場合だけ送り直すため、予算の対象外）
+            event_hooks={'request': [lambda request: rate_governor.acquire_url(str(request.url))]},
+            # transportを渡すとClientのlimitsは使われないため、接続数の上限はtransportに設定する
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            ),
+        )
+
+    def request(self, method, url, allow_redirects=True, timeout=None, **kwargs):
+        httpx = self._httpx
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        try:
+            return self.client.request(method, rewrite_url(url), follow_redirects=allow_redirects, **kwargs)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+def _create_session():
+    if os.getenv('NANAHAPI_HTTP2', '').strip() == '1':
+        try:
+            import h2  # noqa: F401  HTTP/2にはhttpx[http2]が必要
+            return Http2Session()
+        except ImportError:
+            print("⚠️  httpx[http2]がインストールされていないため、HTTP/1.1のセッションを使用します", flush=True)
+    return PooledSession()
+
+def get_session():
+    """
+    プロセス内で共有するHTTPセッションを取得
+
+    Returns:
+        head/getを持つセッション
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            install_dns_cache()
+            _session = _create_session()
+            atexit.register(_session.close)
+        return _session
+
+def http_session():
+    """
+    動作モード（記録／再生）に応じた共有HTTPセッションを取得
+
+    Returns:
+        head/getを持つセッション
+    """
+    mode = replay.get_mode()
+    if mode == replay.MODE_REPLAY:
+        return replay.http_session()
+    return replay.http_session(get_session())
+
+DNS_CACHE_MAX_ENTRIES = 256
+
+_dns_cache = OrderedDict()  # 古い順に並べた {引数: (有効期限, 結果)}
+_dns_lock = threading.Lock()
+_original_getaddrinfo = None
+
+def install_dns_cache(ttl=None):
+    """
+    socket.getaddrinfoの結果をTTLつきでキャッシュする（プロセス内で1回だけ）
+    プロセス全体の名前解決（yt-dlp・WebDriverとの通信を含む）が対象になるため、
+    期限切れの結果は取り除き、件数は DNS_CACHE_MAX_ENTRIES までに抑える
+
+    Args:
+        ttl (float): キャッシュする秒数（Noneなら環境変数 NANAHAPI_DNS_TTL、0以下で無効）
+    """
+    global _original_getaddrinfo
+    if ttl is None:
+        try:
+            ttl = float(os.getenv('NANAHAPI_DNS_TTL', '300'))
+        except ValueError:
+            ttl = 300
+    if ttl <= 0 or _original_getaddrinfo is not None:
+        return
+    _original_getaddrinfo = socket.getaddrinfo
+
+    def cached_getaddrinfo(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with _dns_lock:
+            entry = _dns_cache.get(key)
+            if entry and entry[0] > now:
+                _dns_cache.move_to_end(key)
+                return entry[1]
+        result = _original_getaddrinfo(*args, **kwargs)
+        with _dns_lock:
+            _dns_cache[key] = (now + ttl, result)
+            _dns_cache.move_to_end(key)
+            for expired in [k for k, (expires, _) in _dns_cache.items() if expires <= now]:
+                del _dns_cache[expired]
+            while len(_dns_cache) > DNS_CACHE_MAX_ENTRIES:
+                _dns_cache.popitem(last=False)
+        return result
+
+    socket.getaddrinfo = cached_getaddrinfo
+
+def get_webdriver():
+    """
+    プロセス内で共有するヘッドレスChromeのWebDriverを取得（初回のみ起動）
+
+    Returns:
+        selenium.webdriver.Chrome: WebDriver
+    """
+    global _webdriver
+    if _webdriver is None:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        options = Options()
+        options.add_argument("--headless")  # ヘッドレスモードを使用
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        _webdriver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    return _webdriver
+
+def reset_webdriver():
+    """
+    共有WebDriverを終了（エラー後は次回のget_webdriverで起動し直す）
+    """
+    global _webdriver
+    driver, _webdriver = _webdriver, None
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+atexit.register(reset_webdriver)
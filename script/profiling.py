@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+実行ごとのプロファイル（cProfile・tracemalloc）の記録
+環境変数 NANAHAPI_PROFILE を指定して get_archives.py・リンクチェッカーを実行すると、
+終了時に .nanahapi/profiles/ に以下を保存します。
+  <スクリプト名>-<日時>-<PID>.prof  cProfileの結果（python -m pstats・snakeviz などで表示）
+  <スクリプト名>-<日時>-<PID>.txt   累積時間の上位の関数・確保したメモリの上位の行・区間ごとの集計
+
+動画ごとの処理・URLごとのチェックなど、繰り返し実行する区間は hot_section() で囲むと
+区間ごとの回数・時間（とメモリの増減）を集計します。区間の計測は NANAHAPI_PROFILE_SAMPLE 回に1回だけ行います。
+cProfileは run() を呼んだスレッドだけを記録するため、並列チェック（--adaptive）のワーカーは区間の集計で確認してください。
+無効の場合、hot_section() は何もしません。
+
+環境変数:
+  NANAHAPI_PROFILE         1（cProfileとtracemalloc）/ cpu（cProfileのみ）/ mem（tracemallocのみ）、未指定・0で無効
+  NANAHAPI_PROFILE_SAMPLE  区間を計測する間隔（N回に1回、デフォルト: 1）
+  NANAHAPI_PROFILE_TOP     結果に表示する上位の件数（デフォルト: 25）
+"""
+
+import os
+import sys
+import time
+import threading
+import contextlib
+from datetime import datetime
+
+from local_state import state_path
+
+PROFILES_DIR = 'profiles'
+
+_NULL_SECTION = contextlib.nullcontext()
+_active = None  # 記録中のプロファイル
+
+def _int_env(name, default):
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+def get_modes():
+    """
+    記録する対象を取得
+
+    Returns:
+        set: {'cpu', 'mem'} の部分集合（空なら無効）
+    """
+    spec = os.getenv('NANAHAPI_PROFILE', '').strip().lower()
+    if spec in ('', '0'):
+        return set()
+    if spec == '1':
+        return {'cpu', 'mem'}
+    return {mode for mode in (part.strip() for part in spec.split(',')) if mode in ('cpu', 'mem')}
+
+class _Section:
+    """
+    区間ごとの集計（回数・時間・メモリの増減）
+    """
+    __slots__ = ('calls', 'sampled', 'total', 'max', 'memory')
+
+    def __init__(self):
+        self.calls = 0
+        self.sampled = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.memory = 0
+
+class Profile:
+    """
+    1回の実行のプロファイル
+    """
+    def __init__(self, name, modes, sample_every=1, top=25):
+        """
+        Args:
+            name (str): スクリプト名（出力ファイル名に使う）
+            modes (set): 記録する対象（'cpu', 'mem'）
+            sample_every (int): 区間を計測する間隔（N回に1回）
+            top (int): 結果に表示する上位の件数
+        """
+        self.name = name
+        self.modes = modes
+        self.sample_every = sample_every
+        self.top = top
+        self.sections = {}
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._started = None
+
+    def start(self):
+        if 'mem' in self.modes:
+            import tracemalloc
+            tracemalloc.start()
+        if 'cpu' in self.modes:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def section(self, name):
+        with self._lock:
+            section = self.sections.get(name)
+            if section is None:
+                section = self.sections[name] = _Section()
+            section.calls += 1
+            sampled = (section.calls - 1) % self.sample_every == 0
+        if not sampled:
+            yield
+            return
+        tracemalloc = sys.modules.get('tracemalloc') if 'mem' in self.modes else None
+        memory_before = tracemalloc.get_traced_memory()[0] if tracemalloc else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            # 並列に実行している区間がある場合、メモリの増減は他のスレッドの分も含む
+            memory = tracemalloc.get_traced_memory()[0] - memory_before if tracemalloc else 0
+            with self._lock:
+                section.sampled += 1
+                section.total += elapsed
+                section.max = max(section.max, elapsed)
+                section.memory += memory
+
+    def stop(self):
+        """
+        記録を終了して結果を保存
+
+        Returns:
+            list: 保存したファイルのパス
+        """
+        elapsed = time.perf_counter() - self._started
+        if self._profiler:
+            self._profiler.disable()
+        snapshot = peak = None
+        if 'mem' in self.modes:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        out_dir = state_path(PROFILES_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        base = out_dir / f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        paths = []
+        lines = [f"# {self.name} {' '.join(sys.argv[1:])}", f"実行時間: {elapsed:.2f}秒", ""]
+        if self._profiler:
+            import io
+            import pstats
+            prof_path = base.with_suffix('.prof')
+            self._profiler.dump_stats(prof_path)
+            paths.append(prof_path)
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats('cumulative').print_stats(self.top)
+            lines += [f"## 累積時間の上位{self.top}件（cProfile）", stream.getvalue().strip(), ""]
+        if snapshot is not None:
+            import tracemalloc
+            snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            lines.append(f"## 確保したメモリの上位{self.top}行（tracemalloc、ピーク: {peak / 1024 / 1024:.1f}MB）")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size / 1024:10.1f}KB {stat.count:8d}個  {frame.filename}:{frame.lineno}")
+            lines.append("")
+        if self.sections:
+            lines.append(f"## 区間ごとの集計（{self.sample_every}回に1回を計測）")
+            lines.append(f"  {'区間':<24} {'回数':>8} {'計測':>8} {'合計(秒)':>10} {'平均(ms)':>10} {'最大(ms)':>10} {'平均メモリ(KB)':>14}")
+            for name, section in sorted(self.sections.items(), key=lambda item: -item[1].total):
+                sampled = section.sampled or 1
+                lines.append(
+                    f"  {name:<24} {section.calls:>8d} {section.sampled:>8d} {section.total:>10.3f} "
+                    f"{section.total / sampled * 1000:>10.2f} {section.max * 1000:>10.2f} {section.memory / sampled / 1024:>14.1f}"
+                )
+        summary_path = base.with_suffix('.txt')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        paths.append(summary_path)
+        return paths
+
+@contextlib.contextmanager
+def run(name):
+    """
+    NANAHAPI_PROFILE が指定されている場合、この範囲の実行を記録して終了時に保存
+
+    Args:
+        name (str): スクリプト名（出力ファイル名に使う）
+    """
+    global _active
+    modes = get_modes()
+    if not modes or _active is not None:
+        yield
+        return
+    profile = Profile(name, modes, _int_env('NANAHAPI_PROFILE_SAMPLE', 1), _int_env('NANAHAPI_PROFILE_TOP', 25))
+    profile.start()
+    _active = profile
+    try:
+        yield
+    finally:
+        _active = None
+        paths = profile.stop()
+        print(f"🔬 プロファイルを保存しました: {', '.join(str(path) for path in paths)}", flush=True)
+
+def hot_section(name):
+    """
+    繰り返し実行する区間を計測（記録中でなければ何もしない）
+
+    Args:
+        name (str): 区間の名前
+    Returns:
+        区間を囲むコンテキストマネージャ
+    """
+    if _active is None:
+        return _NULL_SECTION
+    return _active.section(name)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+プロセス間で共有するリクエスト予算（トークンバケット）
+get_archives.py・リンクチェッカー・ブラウジングなど、script/ のすべてのHTTPアクセスは
+送信前にホストごとのバケットからトークンを取得します。バケットは .nanahapi/rate_governor.sqlite に保存し、
+同時に動いている別のプロセスとも予算を共有するため、合計のリクエスト数が上限を超えません。
+
+予算は「ホスト=毎秒のトークン数/最大トークン数」で指定します。ホストはサブドメインも含めて一致します。
+ホストに一致する予算がない場合は * の予算を使います。
+
+環境変数:
+  NANAHAPI_RATE_GOVERNOR  0 で無効化
+  NANAHAPI_RATE_LIMITS    予算の上書き（例: "youtube.com=1/5,*=10/20"）
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import functools
+from urllib.parse import urlsplit
+
+from local_state import state_path
+
+DB_FILE = 'rate_governor.sqlite'
+
+# ホストごとの予算: (毎秒のトークン数, 最大トークン数)
+DEFAULT_LIMITS = {
+    'youtube.com': (2.0, 10.0),
+    'ytimg.com': (10.0, 20.0),
+    '*': (10.0, 20.0),
+}
+
+_local = threading.local()  # スレッドごとのSQLite接続
+
+def is_enabled():
+    """
+    予算の管理が有効か確認
+
+    Returns:
+        bool: 有効な場合True
+    """
+    return os.getenv('NANAHAPI_RATE_GOVERNOR', '1').strip() != '0'
+
+@functools.lru_cache(maxsize=None)
+def get_limits(spec=None):
+    """
+    ホストごとの予算を取得
+
+    Args:
+        spec (str): 上書きする予算（Noneなら環境変数 NANAHAPI_RATE_LIMITS）
+    Returns:
+        dict: {ホスト: (毎秒のトークン数, 最大トークン数)}
+    """
+    spec = os.getenv('NANAHAPI_RATE_LIMITS', '') if spec is None else spec
+    limits = dict(DEFAULT_LIMITS)
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        try:
+            host, budget = part.split('=', 1)
+            rate, burst = budget.split('/', 1) if '/' in budget else (budget, budget)
+            limits[host.strip().lower()] = (float(rate), max(float(burst), 1.0))
+        except ValueError:
+            print(f"⚠️  予算の指定が不正です: {part}", flush=True)
+    return limits
+
+def bucket_for(host, limits=None):
+    """
+    ホストに対応するバケット名と予算を取得
+
+    Args:
+        host (str): ホスト名
+        limits (dict): get_limits() の戻り値
+    Returns:
+        tuple: (バケット名, (毎秒のトークン数, 最大トークン数))
+    """
+    limits = limits or get_limits()
+    host = (host or '').lower()
+    for name, budget in limits.items():
+        if name != '*' and (host == name or host.endswith('.' + name)):
+            return name, budget
+    return '*', limits['*']
+
+def _connect():
+    db = getattr(_local, 'db', None)
+    path = str(state_path(DB_FILE))
+    if db is None or getattr(_local, 'path', None) != path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+        _local.db = db
+        _local.path = path
+    return db
+
+def try_acquire(host, tokens=1.0, now=None):
+    """
+    バケットからトークンを取得（待機しない）
+
+    Args:
+        host (str): ホスト名
+        tokens (float): 取得するトークン数
+        now (float): 現在時刻（テスト用）
+    Returns:
+        float: 取得できた場合は0、できない場合はトークンがたまるまでの秒数
+    """
+    name, (rate, burst) = bucket_for(host)
+    db = _connect()
+    # BEGIN IMMEDIATEで書き込みロックを取り、別のプロセスと同時に同じバケットを更新しないようにする
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        now = time.time() if now is None else now
+        row = db.execute('SELECT tokens, updated FROM buckets WHERE name = ?', (name,)).fetchone()
+        available = burst if row is None else min(burst, row[0] + max(now - row[1], 0) * rate)
+        if available >= tokens:
+            available -= tokens
+            wait = 0.0
+        else:
+            wait = (tokens - available) / rate
+        db.execute('INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)', (name, available, now))
+        db.execute('COMMIT')
+    except BaseException:
+        db.execute('ROLLBACK')
+        raise
+    return wait
+
+def acquire(host, tokens=1.0):
+    """
+    バケットからトークンを取得（たまるまで待機）
+
+    Args:
+        host (str): ホスト名
+        tokens (float): 取得するトークン数
+    Returns:
+        float: 待機した秒数
+    """
+    if not is_enabled():
+        return 0.0
+    waited = 0.0
+    while True:
+        wait = try_acquire(host, tokens)
+        if wait <= 0:
+            return waited
+        time.sleep(wait)
+        waited += wait
+
+def acquire_url(url, tokens=1.0):
+    """
+    URLのホストのバケットからトークンを取得（たまるまで待機）
+
+    Args:
+        url (str): リクエストするURL
+        tokens (float): 取得するトークン数
+    Returns:
+        float: 待機した秒数
+    """
+    return acquire(urlsplit(url).hostname or '', tokens)
+
+@functools.lru_cache(maxsize=None)
+def _governed_youtube_dl_class():
+    import yt_dlp
+
+    class GovernedYoutubeDL(yt_dlp.YoutubeDL):
+        """
+        すべてのHTTPリクエストの前に予算からトークンを取得するYoutubeDL
+        """
+        def urlopen(self, req):
+            url = req if isinstance(req, str) else getattr(req, 'url', None) or req.get_full_url()
+            acquire_url(url)
+            return super().urlopen(req)
+
+    return GovernedYoutubeDL
+
+def youtube_dl(params):
+    """
+    予算を守るYoutubeDLを作成
+
+    Args:
+        params (dict): yt-dlpの設定
+    Returns:
+        yt_dlp.YoutubeDL: YoutubeDL
+    """
+    return _governed_youtube_dl_class()(params)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+アーカイブの再整形
+詳細情報のキャッシュ（.nanahapi/info_cache/）から create_video_data_from_detailed_info で動画データを作り直し、
+アーカイブファイルに反映します。整形ルールを変更した後にネットワークに接続せず全アーカイブを更新できます。
+キャッシュにない動画（メンバー限定動画など基本情報から作成したもの）は変更しません。
+
+使用方法:
+  python script/renormalize_archives.py [--dry-run]
+    --dry-run  変更される動画数を表示するだけで保存しない
+"""
+
+import sys
+import glob
+import time
+from pathlib import Path
+
+import info_cache
+from archive_utils import ARCHIVES_DIR, load_archive_items
+
+def renormalize_archive(json_path, cache, dry_run=False):
+    """
+    1つのアーカイブファイルをキャッシュから再整形
+
+    Args:
+        json_path (str): アーカイブファイルのパス
+        cache (InfoCache): 詳細情報のキャッシュ
+        dry_run (bool): Trueなら保存しない
+    Returns:
+        tuple: (キャッシュにあった動画数, 内容が変わる動画数)
+    """
+    import get_archives
+
+    videos = []
+    changed = 0
+    for item in load_archive_items(json_path):
+        video_id = item.get('videoId')
+        video_info = cache.get(video_id) if video_id else None
+        if video_info is None:
+            continue
+        try:
+            video = get_archives.create_video_data_from_detailed_info(video_info, video_id)
+        except Exception as e:
+            print(f"⚠️  再整形に失敗したため既存データを残します: {video_id} - {str(e)}", flush=True)
+            continue
+        videos.append(video)
+        if any(item.get(key) != value for key, value in video.items()):
+            changed += 1
+    if videos and changed and not dry_run:
+        get_archives.save_to_json(videos, json_path)
+    return len(videos), changed
+
+def main():
+    """
+    メイン関数
+    """
+    print("🔁 アーカイブの再整形")
+    print("=" * 50)
+
+    dry_run = '--dry-run' in sys.argv[1:]
+    start = time.perf_counter()
+    with info_cache.InfoCache() as cache:
+        print(f"🗃 キャッシュ済みの詳細情報: {len(cache)}件")
+        total_cached = 0
+        total_changed = 0
+        for json_path in sorted(glob.glob(str(Path(ARCHIVES_DIR) / 'archives_*.json'))):
+            cached, changed = renormalize_archive(json_path, cache, dry_run)
+            total_cached += cached
+            total_changed += changed
+            print(f"  {Path(json_path).name:<36} キャッシュ {cached:6d}件  変更 {changed:6d}件", flush=True)
+
+    action = "変更される" if dry_run else "更新した"
+    print(f"✅ {action}動画: {total_changed}件（キャッシュから再整形: {total_cached}件、{time.perf_counter() - start:.1f}秒）")
+
+if __name__ == "__main__":
+    main()
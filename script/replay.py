@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+yt-dlp・HTTPアクセスの記録／再生レイヤー
+YouTubeにアクセスせずにget_archives.pyやリンクチェッカーを動かすため、
+フラットプレイリスト、extract_infoの詳細情報、動画ページHTML、
+ブラウジングで取得した配信開始日時をディスクに記録して再生します。
+
+環境変数:
+  NANAHAPI_REPLAY        record（記録）/ replay（再生）。未指定なら通常通りネットワークにアクセス
+  NANAHAPI_FIXTURES_DIR  記録先ディレクトリ（デフォルト: .nanahapi/replay）
+"""
+
+import os
+import json
+import hashlib
+import functools
+from pathlib import Path
+
+import rate_governor
+from local_state import state_path
+
+MODE_LIVE = 'live'
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+_mode = None  # configure()で上書きされた動作モード
+_store = None  # プロセス内で共有するフィクスチャストア
+
+class ReplayMissError(Exception):
+    """再生モードで記録が見つからない場合の例外"""
+
+class FixtureStore:
+    """
+    記録データの保存先
+    rootを指定しない場合はメモリ上に保持する（ベンチマーク用）
+    """
+    KINDS = ('flat', 'detail', 'http', 'live_date')
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else None
+        self._memory = {}
+
+    @staticmethod
+    def _file_key(key):
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _path(self, kind, key):
+        return self.root / kind / f"{self._file_key(key)}.json"
+
+    def save(self, kind, key, payload):
+        """
+        記録データを保存
+
+        Args:
+            kind (str): データ種別（flat, detail, http, live_date）
+            key (str): URLなどのキー
+            payload: JSONに変換可能なデータ
+        """
+        if self.root is None:
+            self._memory[(kind, key)] = payload
+            return
+        path = self._path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'payload': payload}, f, ensure_ascii=False)
+
+    def load(self, kind, key):
+        """
+        記録データを読み込み
+
+        Args:
+            kind (str): データ種別
+            key (str): URLなどのキー
+        Returns:
+            記録されたデータ
+        Raises:
+            ReplayMissError: 記録が存在しない場合
+        """
+        if self.root is None:
+            if (kind, key) not in self._memory:
+                raise ReplayMissError(f"記録がありません: {kind} {key}")
+            return self._memory[(kind, key)]
+        path = self._path(kind, key)
+        if not path.exists():
+            raise ReplayMissError(f"記録がありません: {kind} {key}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['payload']
+
+def configure(mode=None, store=None):
+    """
+    動作モードとストアを明示的に設定（ベンチマーク・テスト用）
+
+    Args:
+        mode (str): live / record / replay、Noneなら環境変数に従う
+        store (FixtureStore): 使用するストア、Noneなら環境変数に従う
+    """
+    global _mode, _store
+    _mode = mode
+    _store = store
+
+def get_mode():
+    """
+    現在の動作モードを取得
+
+    Returns:
+        str: live / record / replay
+    """
+    if _mode:
+        return _mode
+    mode = os.getenv('NANAHAPI_REPLAY', '').strip().lower()
+    if mode in (MODE_RECORD, MODE_REPLAY):
+        return mode
+    return MODE_LIVE
+
+def get_store():
+    """
+    フィクスチャストアを取得
+
+    Returns:
+        FixtureStore: ストア
+    """
+    global _store
+    if _store is None:
+        _store = FixtureStore(os.getenv('NANAHAPI_FIXTURES_DIR') or state_path('replay'))
+    return _store
+
+def _ydl_kind(params):
+    return 'flat' if params.get('extract_flat') else 'detail'
+
+class ReplayYoutubeDL:
+    """
+    記録済みのextract_info結果を返すyt_dlp.YoutubeDLの代替
+    記録がない場合はignoreerrors時のyt-dlpと同様にロガーへエラーを出してNoneを返す
+    """
+    def __init__(self, params, store):
+        self.params = params
+        self.store = store
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def extract_info(self, url, download=False, **kwargs):
+        logger = self.params.get('logger')
+        try:
+            payload = self.store.load(_ydl_kind(self.params), url)
+        except ReplayMissError as e:
+            payload = {'error': f"ERROR: {e}"}
+        if 'error' in payload:
+            if logger:
+                logger.error(payload['error'])
+            return None
+        return payload['info']
+
+class RecordingYoutubeDL:
+    """
+    yt_dlp.YoutubeDLの結果をストアに記録しながら返すラッパー
+    """
+    def __init__(self, params, store):
+        self.params = params
+        self.store = store
+        self._ydl = rate_governor.youtube_dl(params)
+
+    def __enter__(self):
+        self._ydl.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        return self._ydl.__exit__(*args)
+
+    def extract_info(self, url, download=False, **kwargs):
+        info = self._ydl.extract_info(url, download=download, **kwargs)
+        if info is not None and not kwargs.get('process', True) and info.get('entries') is not None:
+            # 未処理の結果は一覧が遅延評価のため、記録用にここで取得しきる
+            info['entries'] = list(info['entries'])
+        if info is None:
+            logger = self.params.get('logger')
+            latest_error = logger.get_latest_error() if logger else None
+            payload = {'error': latest_error or 'ERROR: extract_info returned None'}
+        else:
+            info = self._ydl.sanitize_info(info)
+            payload = {'info': info}
+        self.store.save(_ydl_kind(self.params), url, payload)
+        return info
+
+def open_ydl(params):
+    """
+    動作モードに応じたYoutubeDLを作成
+
+    Args:
+        params (dict): yt-dlpの設定
+    Returns:
+        YoutubeDL互換のオブジェクト
+    """
+    mode = get_mode()
+    if mode == MODE_REPLAY:
+        return ReplayYoutubeDL(params, get_store())
+    if mode == MODE_RECORD:
+        return RecordingYoutubeDL(params, get_store())
+    # 実際に接続する場合は、他のプロセスと共有する予算を守る
+    return rate_governor.youtube_dl(params)
+
+class ReplayResponse:
+    """
+    requests.Responseのうちチェッカーが使う属性だけを持つレスポンス
+    """
+    def __init__(self, url, status_code, text='', headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    @property
+    def content(self):
+        return self.text.encode('utf-8')
+
+def _http_key(method, url):
+    return f"{method} {url}"
+
+class ReplaySession:
+    """
+    記録済みのHTTPレスポンスを返すセッション
+    HEADの記録がない場合はGETの記録からステータスだけを返す
+    """
+    def __init__(self, store):
+        self.store = store
+
+    def _load(self, method, url):
+        payload = self.store.load('http', _http_key(method, url))
+        return ReplayResponse(url, payload['status_code'], payload.get('text', ''), payload.get('headers'))
+
+    def head(self, url, **kwargs):
+        try:
+            return self._load('HEAD', url)
+        except ReplayMissError:
+            response = self._load('GET', url)
+            return ReplayResponse(url, response.status_code, '', response.headers)
+
+    def get(self, url, **kwargs):
+        return self._load('GET', url)
+
+class RecordingSession:
+    """
+    実際のHTTPレスポンスをストアに記録しながら返すセッション
+    """
+    def __init__(self, store, session):
+        self.store = store
+        self.session = session
+
+    def _record(self, method, url, response):
+        self.store.save('http', _http_key(method, url), {
+            'status_code': response.status_code,
+            'text': response.text if method == 'GET' else '',
+            'headers': dict(response.headers),
+        })
+        return response
+
+    def head(self, url, **kwargs):
+        return self._record('HEAD', url, self.session.head(url, **kwargs))
+
+    def get(self, url, **kwargs):
+        return self._record('GET', url, self.session.get(url, **kwargs))
+
+def http_session(session=None):
+    """
+    動作モードに応じたHTTPセッションを取得
+
+    Args:
+        session: 通常時に使用するセッション（head/getを持つもの）、Noneならrequestsモジュール
+    Returns:
+        head/getを持つセッション
+    """
+    mode = get_mode()
+    if mode == MODE_REPLAY:
+        return ReplaySession(get_store())
+    if session is None:
+        import requests
+        session = requests
+    if mode == MODE_RECORD:
+        return RecordingSession(get_store(), session)
+    return session
+
+def recorded(kind):
+    """
+    第1引数をキーとして関数の戻り値を記録／再生するデコレータ
+
+    Args:
+        kind (str): データ種別
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(key, *args, **kwargs):
+            mode = get_mode()
+            if mode == MODE_REPLAY:
+                return get_store().load(kind, key)
+            result = func(key, *args, **kwargs)
+            if mode == MODE_RECORD:
+                get_store().save(kind, key, result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+アーカイブ更新スケジューラ
+run.sh / run10.sh のように全タレントを固定間隔で更新する代わりに、
+各チャンネルの最近の投稿頻度・放送予定枠の開始時刻・前回更新からの経過時間から
+次回の更新時刻を決め、優先度付きキューで順番に get_archives.py を実行します。
+1時間あたりのジョブ数の上限（リクエスト予算）を超えないように待機します。
+
+使用方法:
+  python script/scheduler.py [1時間あたりの最大ジョブ数] [--git] [--once] [--dry-run]
+    --git      更新されたアーカイブファイルをコミット&プッシュ
+    --once     実行時刻を過ぎたジョブだけを実行して終了
+    --dry-run  スケジュールを表示するだけで実行しない
+"""
+
+import sys
+import time
+import heapq
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+from archive_utils import JST, archive_path, load_archive_items, load_talents, parse_upload_date
+from change_feed import CHANGES_DIR_NAME
+from local_state import load_state_json, save_state_json
+
+STATE_FILE = 'scheduler_state.json'
+GET_ARCHIVES_SCRIPT = Path(__file__).resolve().parent / 'get_archives.py'
+GET_LENGTH = 10  # 1回のジョブで更新する最新動画数
+
+MIN_INTERVAL = 30 * 60  # 最短の更新間隔（秒）
+MAX_INTERVAL = 24 * 60 * 60  # 最長の更新間隔（秒）
+ACTIVITY_WINDOW = 14 * 24 * 60 * 60  # 投稿頻度を数える期間（秒）
+UPCOMING_START_MARGIN = 10 * 60  # 放送予定枠の開始から更新するまでの時間（秒）
+RECENT_STREAM_WINDOW = 6 * 60 * 60  # 開始後にアーカイブ確定を待って頻繁に更新する期間（秒）
+FAILURE_RETRY = 10 * 60  # 取得に失敗した場合の最初の再試行までの時間（秒、失敗が続くと倍々に延ばす）
+BUDGET_WINDOW = 60 * 60  # リクエスト予算の集計期間（秒）
+MAX_SLEEP = 5 * 60  # 1回の待機の最大時間（秒）
+
+def compute_next_due(items, last_sync, now):
+    """
+    チャンネルの次回更新時刻を計算
+
+    Args:
+        items (list): アーカイブの動画情報のリスト
+        last_sync (float): 前回の更新時刻（エポック秒、未更新なら0）
+        now (float): 現在時刻（エポック秒）
+    Returns:
+        tuple: (次回更新時刻, 理由)
+    """
+    if not last_sync:
+        return now, "初回"
+
+    recent_count = 0
+    candidates = []
+    for item in items:
+        upload_ts = item.get('upload_ts') or parse_upload_date(item.get('upload_date'))
+        if upload_ts is None:
+            continue
+        if now - ACTIVITY_WINDOW <= upload_ts <= now:
+            recent_count += 1
+        if upload_ts > last_sync:
+            # 放送予定枠は開始直後に更新する
+            candidates.append((upload_ts + UPCOMING_START_MARGIN, "放送予定枠の開始"))
+        elif now - upload_ts <= RECENT_STREAM_WINDOW:
+            # 開始直後の配信はアーカイブが確定するまで短い間隔で更新する
+            candidates.append((last_sync + MIN_INTERVAL * 2, "配信直後"))
+
+    # 1日あたりの投稿数が多いほど短い間隔で更新する
+    uploads_per_day = recent_count / (ACTIVITY_WINDOW / (24 * 60 * 60))
+    interval = MAX_INTERVAL / (1 + 4 * uploads_per_day)
+    interval = max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+    candidates.append((last_sync + interval, f"定期（{uploads_per_day:.1f}件/日）"))
+
+    return min(candidates)
+
+class Scheduler:
+    def __init__(self, budget_per_hour=12, git_commit=False):
+        self.budget_per_hour = budget_per_hour
+        self.git_commit = git_commit
+        self.state = load_state_json(STATE_FILE, {'channels': {}, 'jobs': []})
+        self.queue = []
+
+    def _channel_state(self, channel):
+        return self.state['channels'].setdefault(channel, {'last_sync': 0})
+
+    def schedule(self, channel, now):
+        """
+        チャンネルをキューに追加
+
+        Args:
+            channel (str): YouTubeのハンドル
+            now (float): 現在時刻
+        """
+        channel_state = self._channel_state(channel)
+        failures = channel_state.get('failures', 0)
+        if failures:
+            # 失敗したジョブは前回の更新時刻を進めていないため、バックオフした時刻に再試行する
+            due = channel_state.get('retry_at', now)
+            reason = f"失敗後の再試行（{failures}回目の失敗）"
+        else:
+            items = load_archive_items(archive_path(channel))
+            due, reason = compute_next_due(items, channel_state.get('last_sync', 0), now)
+        heapq.heappush(self.queue, (due, channel, reason))
+
+    def load_queue(self):
+        """
+        talent_info.jsonの全タレントをキューに追加
+        """
+        now = time.time()
+        self.queue = []
+        for talent in load_talents():
+            if talent.get('yt'):
+                self.schedule(talent['yt'], now)
+            else:
+                print(f"⚠️  {talent.get('name', '不明')}: YouTubeチャンネル情報がありません", flush=True)
+
+    def _budget_wait(self, now):
+        """
+        リクエスト予算に空きができるまでの待ち時間を計算
+
+        Returns:
+            float: 待ち時間（秒）、すぐに実行できる場合は0
+        """
+        self.state['jobs'] = [t for t in self.state['jobs'] if now - t < BUDGET_WINDOW]
+        if len(self.state['jobs']) < self.budget_per_hour:
+            return 0
+        return self.state['jobs'][0] + BUDGET_WINDOW - now
+
+    def run_job(self, channel):
+        """
+        チャンネルのアーカイブを更新
+
+        Args:
+            channel (str): YouTubeのハンドル
+        Returns:
+            int: get_archives.pyの終了コード
+        """
+        now = time.time()
+        print(f"📺 {channel} のアーカイブを取得中... ({datetime.now(JST).strftime('%Y-%m-%d %H:%M:%S')})", flush=True)
+        self.state['jobs'].append(now)
+        result = subprocess.run([sys.executable, str(GET_ARCHIVES_SCRIPT), channel, str(GET_LENGTH)], check=False)
+        channel_state = self._channel_state(channel)
+        channel_state['last_result'] = result.returncode
+        if result.returncode == 0:
+            channel_state['last_sync'] = now
+            channel_state.pop('failures', None)
+            channel_state.pop('retry_at', None)
+        else:
+            failures = channel_state.get('failures', 0) + 1
+            channel_state['failures'] = failures
+            channel_state['retry_at'] = time.time() + min(FAILURE_RETRY * 2 ** (failures - 1), MAX_INTERVAL)
+            print(f"❌ {channel} の取得に失敗しました（終了コード {result.returncode}、{failures}回目）", flush=True)
+        save_state_json(STATE_FILE, self.state)
+        if self.git_commit:
+            commit_archive(channel)
+        return result.returncode
+
+    def print_schedule(self):
+        """
+        現在のスケジュールを表示
+        """
+        print("📋 更新スケジュール:")
+        for due, channel, reason in sorted(self.queue):
+            print(f"  {datetime.fromtimestamp(due, JST).strftime('%Y-%m-%d %H:%M')}  {channel:<20} {reason}")
+
+    def run(self, once=False):
+        """
+        スケジューラを実行
+
+        Args:
+            once (bool): 実行時刻を過ぎたジョブだけを実行して終了する
+        """
+        self.load_queue()
+        self.print_schedule()
+        while self.queue:
+            due, channel, reason = self.queue[0]
+            now = time.time()
+            if due > now:
+                if once:
+                    break
+                time.sleep(min(due - now, MAX_SLEEP))
+                continue
+            wait = self._budget_wait(now)
+            if wait > 0:
+                if once:
+                    print("⏸ リクエスト予算を使い切ったため終了します", flush=True)
+                    break
+                print(f"⏸ リクエスト予算の上限に達しました。{wait:.0f}秒待機します", flush=True)
+                time.sleep(min(wait, MAX_SLEEP))
+                continue
+            heapq.heappop(self.queue)
+            print(f"🔔 {channel}: {reason}", flush=True)
+            self.run_job(channel)
+            self.schedule(channel, time.time())
+
+def commit_archive(channel):
+    """
+    更新されたアーカイブファイルをコミット&プッシュ
+
+    Args:
+        channel (str): YouTubeのハンドル
+    """
+    path = str(archive_path(channel))
+    paths = [path]
+    changes_dir = archive_path(channel).parent / CHANGES_DIR_NAME
+    if changes_dir.exists():
+        paths.append(str(changes_dir))
+    status = subprocess.run(['git', 'status', '--porcelain', *paths], capture_output=True, text=True, check=False)
+    if not status.stdout.strip():
+        print(f"ℹ️  {path} に変更はありません", flush=True)
+        return
+    commit_date = datetime.now(JST).strftime('%Y-%m-%d %H:%M:%S')
+    message = f"🤖 自動更新: {channel} のアーカイブデータ更新 ({commit_date})\n\n🎬 実行コマンド: scheduler.py"
+    subprocess.run(['git', 'add', *paths], check=False)
+    if subprocess.run(['git', 'commit', '-m', message], check=False).returncode != 0:
+        print("❌ コミットに失敗しました", flush=True)
+        return
+    if subprocess.run(['git', 'push'], check=False).returncode != 0:
+        print("❌ プッシュに失敗しました", flush=True)
+
+def main():
+    """
+    メイン関数
+    第1引数: 1時間あたりの最大ジョブ数（デフォルト: 12）
+    """
+    print("🗓 アーカイブ更新スケジューラ")
+    print("=" * 50)
+
+    flags = {arg for arg in sys.argv[1:] if arg.startswith('--')}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+
+    budget_per_hour = 12
+    if args:
+        try:
+            budget_per_hour = int(args[0])
+            print(f"1時間あたりの最大ジョブ数: {budget_per_hour}")
+        except ValueError:
+            print("警告: 無効なジョブ数が指定されました。デフォルト値(12)を使用します。")
+
+    scheduler = Scheduler(budget_per_hour=budget_per_hour, git_commit='--git' in flags)
+    if '--dry-run' in flags:
+        scheduler.load_queue()
+        scheduler.print_schedule()
+        return
+
+    try:
+        scheduler.run(once='--once' in flags)
+    except KeyboardInterrupt:
+        print("中断されました。")
+
+if __name__ == "__main__":
+    main()
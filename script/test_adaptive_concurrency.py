@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+並列数の自動調整（AIMD）のテストスクリプト
+時刻を固定したコントローラで並列数の増減と、レート制限の兆候を受けた動画のチェックし直しを検証
+"""
+
+import sys
+import os
+import tempfile
+import contextlib
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import adaptive_concurrency
+from adaptive_concurrency import AIMDController, is_throttled, is_unconfirmed, check_concurrently
+
+PRIVATE_PAGE = Path(__file__).resolve().parent / 'fixtures' / 'watch_pages' / 'private.html'
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_controller(**kwargs):
+    clock = FakeClock()
+    return AIMDController(clock=clock, **kwargs), clock
+
+def respond(controller, throttled=False):
+    controller.acquire()
+    controller.release(throttled)
+
+def test_is_throttled():
+    """
+    429・5xx・LOGIN_REQUIRED だけをレート制限の兆候とみなす
+    """
+    assert is_throttled(429)
+    assert is_throttled(503, 'サーバーエラー (503)')
+    assert is_throttled(200, '非公開動画（ログイン必須）: status=LOGIN_REQUIRED')
+    assert not is_throttled(200, '')
+    assert not is_throttled(404, '動画が見つかりません（削除済み）')
+    assert not is_throttled(0, 'タイムアウト')
+
+def test_is_unconfirmed():
+    """
+    429・5xx・接続エラーだけを状態を判断できない結果とみなし、LOGIN_REQUIRED は含めない
+    """
+    assert is_unconfirmed(429)
+    assert is_unconfirmed(503, 'サーバーエラー (503)')
+    assert is_unconfirmed(0, 'タイムアウト')
+    assert not is_unconfirmed(200, '非公開動画（ログイン必須）: status=LOGIN_REQUIRED')
+    assert not is_unconfirmed(404, '動画が見つかりません（削除済み）')
+
+def test_additive_increase():
+    """
+    並列数ぶんの正常なレスポンスごとに並列数が1増え、最大で止まる
+    """
+    controller, _ = make_controller(maximum=4)
+    assert controller.concurrency == 1
+    respond(controller)
+    assert controller.concurrency == 2
+    respond(controller)
+    respond(controller)
+    assert controller.concurrency == 3
+    for _ in range(20):
+        respond(controller)
+    assert controller.concurrency == 4
+
+def test_multiplicative_decrease():
+    """
+    レート制限の兆候で並列数が半分になり、cooldownの間は続けて減らさない
+    """
+    controller, clock = make_controller(initial=8, maximum=8, cooldown=5.0)
+    respond(controller, throttled=True)
+    assert controller.concurrency == 4
+    respond(controller, throttled=True)
+    assert controller.concurrency == 4
+    clock.now += 5.0
+    respond(controller, throttled=True)
+    assert controller.concurrency == 2
+    clock.now += 5.0
+    respond(controller, throttled=True)
+    clock.now += 5.0
+    respond(controller, throttled=True)
+    assert controller.concurrency == 1
+    assert controller.throttled_count == 5
+
+def test_rate():
+    """
+    直近のレスポンスの速度を表示に含める
+    """
+    controller, clock = make_controller(maximum=4)
+    for _ in range(11):
+        respond(controller)
+        clock.now += 0.5
+    assert abs(controller.rate() - 11 / 5.5) < 1e-9
+    assert controller.describe() == f"並列数 {controller.concurrency} / 2.0件/秒"
+
+def test_check_concurrently_retries_throttled():
+    """
+    レート制限の兆候を受けた動画はチェックし直し、治らなければ未確認として返す
+    """
+    controller, _ = make_controller(maximum=4)
+    attempts = {}
+    waits = []
+
+    def check(url):
+        attempts[url] = attempts.get(url, 0) + 1
+        if url == 'flaky' and attempts[url] == 1:
+            return False, 429, 'HTTP 429'
+        if url == 'blocked':
+            return False, 503, 'サーバーエラー (503)'
+        if url == 'private':
+            return False, 200, '非公開動画（ログイン必須）: status=LOGIN_REQUIRED'
+        return True, 200, ''
+
+    tasks = [('ok', 'a'), ('flaky', 'b'), ('blocked', 'c'), ('private', 'd')]
+    results = {value: (result, throttled) for value, result, throttled in
+               check_concurrently(tasks, check, controller, retries=2, sleep=waits.append)}
+    assert results['a'] == ((True, 200, ''), False)
+    assert results['b'] == ((True, 200, ''), False)
+    assert results['c'] == ((False, 503, 'サーバーエラー (503)'), True)
+    # チェックし直してもログイン必須なら未確認にせず、最後の結果を返す
+    assert results['d'] == ((False, 200, '非公開動画（ログイン必須）: status=LOGIN_REQUIRED'), False)
+    assert attempts == {'ok': 1, 'flaky': 2, 'blocked': 3, 'private': 3}
+    assert len(waits) == 5
+    assert controller.in_flight == 0
+
+class _Response:
+    def __init__(self, status_code, content=b''):
+        self.status_code = status_code
+        self.content = content
+
+class _PrivatePageSession:
+    """すべての動画でログイン必須のページを返すセッション"""
+    def __init__(self):
+        self.page = PRIVATE_PAGE.read_bytes()
+
+    def head(self, url, **kwargs):
+        return _Response(200)
+
+    def get(self, url, **kwargs):
+        return _Response(200, self.page)
+
+@contextlib.contextmanager
+def _no_backoff():
+    """チェッカーが作るコントローラのチェックし直しの待機をなくす"""
+    original = adaptive_concurrency.AIMDController
+    adaptive_concurrency.AIMDController = lambda: original(cooldown=0)
+    try:
+        yield
+    finally:
+        adaptive_concurrency.AIMDController = original
+
+@contextlib.contextmanager
+def _chdir(path):
+    """チェッカーのレポート出力先を一時ディレクトリにする"""
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+def test_persistent_login_required_is_recorded():
+    """
+    --adaptive でチェックし直してもログイン必須の動画は非公開動画として記録し、チェックポイントを削除する
+    """
+    import json
+    import check_video_links
+
+    with tempfile.TemporaryDirectory() as tmp_dir, _no_backoff(), _chdir(tmp_dir):
+        video_url = 'https://www.youtube.com/watch?v=privateVid1'
+        with open(Path(tmp_dir) / 'archives_@test.json', 'w', encoding='utf-8') as f:
+            json.dump({'items': [{'videoId': 'privateVid1', 'title': '非公開', 'video_url': video_url}]}, f)
+        checkpoint_path = Path(tmp_dir) / 'checkpoint.jsonl'
+        checker = check_video_links.VideoLinkChecker(archives_dir=tmp_dir, session=_PrivatePageSession(), checkpoint_path=checkpoint_path)
+        checker.check_all_links(delay=0, adaptive=True)
+        assert checker.unconfirmed_links == []
+        assert [link['video_url'] for link in checker.broken_links] == [video_url]
+        assert 'リトライ後' in checker.broken_links[0]['error']
+        assert not checkpoint_path.exists()
+
+def main():
+    tests = [test_is_throttled, test_is_unconfirmed, test_additive_increase, test_multiplicative_decrease,
+             test_rate, test_check_concurrently_retries_throttled, test_persistent_login_required_is_recorded]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+動画の公開状態のテストスクリプト
+リンクチェックの結果から公開状態への変換と、サイトで表示しない状態を確認できた結果だけに限ることを検証
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from availability import (availability_state, update_availability, load_availability, HIDDEN_STATES,
+                          STATE_AVAILABLE, STATE_DELETED, STATE_PRIVATE, STATE_UNAVAILABLE)
+from link_classifier import login_required_message
+
+def test_availability_state():
+    """
+    削除済み・非公開は確認できた結果からだけ、一時的なエラーは記録しない
+    """
+    assert availability_state(True, 200, '') == STATE_AVAILABLE
+    assert availability_state(False, 404, '動画が見つかりません（削除済み）') == STATE_DELETED
+    assert availability_state(False, 200, '動画エラー（削除済みの可能性）: status=ERROR') == STATE_DELETED
+    assert availability_state(False, 200, '非公開動画: this video is private') == STATE_PRIVATE
+    assert availability_state(False, 200, '再生不可能な動画: status=UNPLAYABLE') == STATE_UNAVAILABLE
+    assert availability_state(False, 0, 'タイムアウト') is None
+
+def test_login_required_needs_retries():
+    """
+    一度だけのログイン必須は非表示にせず、チェックし直してもログイン必須だった場合だけ非公開とする
+    """
+    once = availability_state(False, 200, '非公開動画（ログイン必須）: status=LOGIN_REQUIRED')
+    assert once == STATE_UNAVAILABLE
+    assert once not in HIDDEN_STATES
+    assert availability_state(False, 200, login_required_message('LOGIN_REQUIRED')) == STATE_PRIVATE
+
+def test_update_availability():
+    """
+    動画IDごとにマージし、判断できない結果では既存の状態を変えない
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        assert update_availability([('video1', False, 404, '動画が見つかりません（削除済み）'), ('video2', True, 200, '')], tmp_dir) == 2
+        assert update_availability([('video1', False, 0, 'タイムアウト'), (None, True, 200, '')], tmp_dir) == 0
+        videos = load_availability(tmp_dir)
+        assert {video_id: info['state'] for video_id, info in videos.items()} == {'video1': STATE_DELETED, 'video2': STATE_AVAILABLE}
+
+def main():
+    tests = [test_availability_state, test_login_required_needs_retries, test_update_availability]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
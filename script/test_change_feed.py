@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+変更フィードのテストスクリプト
+一覧から消えた・再び現れた動画を、ローカルの状態ではなくアーカイブ自体から判断することを検証
+"""
+
+import sys
+import os
+import json
+import tempfile
+import contextlib
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import change_feed
+from change_feed import REMOVED_FIELD, OP_ADDED, OP_REMOVED, OP_RESTORED, CHANGES_DIR_NAME
+
+@contextlib.contextmanager
+def _state_dir(path):
+    """状態の保存先を指定したディレクトリにする（新しいチェックアウトを再現する）"""
+    previous = os.environ.get('NANAHAPI_STATE_DIR')
+    os.environ['NANAHAPI_STATE_DIR'] = str(path)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop('NANAHAPI_STATE_DIR', None)
+        else:
+            os.environ['NANAHAPI_STATE_DIR'] = previous
+
+def _video(video_id):
+    return {'videoId': video_id, 'title': video_id, 'upload_date': '2024-01-01T21:00:00', 'tags': []}
+
+def _read_ops(archives_dir):
+    ops = []
+    for feed_path in sorted((Path(archives_dir) / CHANGES_DIR_NAME).glob('*.jsonl')):
+        with open(feed_path, 'r', encoding='utf-8') as f:
+            ops.extend((change['videoId'], change['op']) for change in map(json.loads, f))
+    return ops
+
+def test_track_listing():
+    """
+    一覧にない動画に印を付けて removed、印のある動画が一覧に戻ったら印を外して restored とする
+    """
+    index = {'kept': [_video('kept')], 'gone': [_video('gone')], 'back': [dict(_video('back'), **{REMOVED_FIELD: True})]}
+    changes = change_feed.track_listing('archives_@test.json', index, {'kept', 'back'})
+    assert [(c['videoId'], c['op']) for c in changes] == [('gone', OP_REMOVED), ('back', OP_RESTORED)]
+    assert index['gone'][0][REMOVED_FIELD] is True
+    assert REMOVED_FIELD not in index['back'][0]
+    assert REMOVED_FIELD not in index['kept'][0]
+    assert change_feed.track_listing('archives_@test.json', index, {'kept', 'back'}) == []
+
+def test_removal_survives_fresh_checkout():
+    """
+    状態の保存先が空でも（新しいチェックアウト・CI）、同じ消失を繰り返さず復活を記録する
+    """
+    import get_archives
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = Path(tmp_dir) / 'archives_@test.json'
+        with _state_dir(Path(tmp_dir) / 'first'):
+            get_archives.save_to_json([_video('video1'), _video('video2')], str(output_file))
+            get_archives.save_to_json([], str(output_file), listed_ids={'video1'})
+        with _state_dir(Path(tmp_dir) / 'second'):
+            get_archives.save_to_json([], str(output_file), listed_ids={'video1'})
+        with _state_dir(Path(tmp_dir) / 'third'):
+            get_archives.save_to_json([], str(output_file), listed_ids={'video1', 'video2'})
+        assert _read_ops(tmp_dir) == [('video1', OP_ADDED), ('video2', OP_ADDED), ('video2', OP_REMOVED), ('video2', OP_RESTORED)]
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert not any(REMOVED_FIELD in item for item in json.load(f)['items'])
+
+def main():
+    tests = [test_track_listing, test_removal_survives_fresh_checkout]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
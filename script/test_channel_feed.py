@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+チャンネルフィードの事前確認のテストスクリプト
+保存済みのフィードで解析結果とアーカイブとの比較結果を検証
+"""
+
+import sys
+import os
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from channel_feed import parse_feed, find_changes
+
+FEEDS_DIR = Path(__file__).resolve().parent / 'fixtures' / 'feeds'
+
+# フィクスチャの最新動画から2日後
+NOW = 1791630000 + 2 * 24 * 60 * 60
+
+def load_feed(name):
+    with open(FEEDS_DIR / name, 'rb') as f:
+        return f.read()
+
+def archive_items():
+    """
+    フィクスチャのフィードをすべて反映済みのアーカイブ（upload_dateは日本時間）
+    """
+    return [
+        {'videoId': 'feedVideo01', 'title': '【歌枠】新曲お披露目 & 雑談 #ななはぴ', 'upload_date': '2026-10-10T20:00:00'},
+        {'videoId': 'feedVideo02', 'title': '【ショート】おはよう #shorts', 'upload_date': '2026-10-05T09:00:00'},
+        {'videoId': 'feedVideo03', 'title': '【雑談】はじめまして', 'upload_date': '2026-09-01T21:00:00'},
+        {'videoId': 'olderVideo', 'title': 'フィードに載らない古い動画', 'upload_date': '2025-01-01T21:00:00'},
+    ]
+
+def test_parse_feed():
+    """
+    フィードから動画ID・タイトル・公開日時を順番どおりに取り出す
+    """
+    entries = parse_feed(load_feed('channel.xml'))
+    assert [entry['videoId'] for entry in entries] == ['feedVideo01', 'feedVideo02', 'feedVideo03']
+    assert entries[0]['title'] == '【歌枠】新曲お披露目 & 雑談 #ななはぴ'
+    assert entries[0]['published'] == '2026-10-10T11:00:00+00:00'
+
+def test_parse_empty_feed():
+    """
+    動画のないフィードは空のリスト
+    """
+    assert parse_feed(load_feed('empty.xml')) == []
+
+def test_parse_invalid_feed():
+    """
+    フィードでないレスポンスはValueError
+    """
+    for content in (load_feed('not_found.html'), b'', b'<feed'):
+        try:
+            parse_feed(content)
+        except ValueError:
+            continue
+        raise AssertionError(f"ValueErrorになりません: {content[:20]!r}")
+
+def test_unchanged():
+    """
+    フィードの動画がすべてアーカイブに反映済みなら変更なし
+    """
+    assert find_changes(parse_feed(load_feed('channel.xml')), archive_items(), now=NOW) == []
+
+def test_new_video():
+    """
+    アーカイブにない動画は変更あり
+    """
+    items = [item for item in archive_items() if item['videoId'] != 'feedVideo02']
+    assert find_changes(parse_feed(load_feed('channel.xml')), items, now=NOW) == ['新しい動画: feedVideo02']
+
+def test_title_changed():
+    """
+    タイトルが変わった動画は変更あり
+    """
+    items = archive_items()
+    items[2]['title'] = '【雑談】初配信'
+    assert find_changes(parse_feed(load_feed('channel.xml')), items, now=NOW) == ['タイトルの変更: feedVideo03']
+
+def test_unsettled_video():
+    """
+    日時不明・配信から間もない枠は変更ありとみなす
+    """
+    items = archive_items()
+    items[2]['upload_date'] = ''
+    assert find_changes(parse_feed(load_feed('channel.xml')), items, now=NOW) == ['確定していない枠: feedVideo03']
+    changes = find_changes(parse_feed(load_feed('channel.xml')), archive_items(), now=1791630000 + 60 * 60)
+    assert changes == ['確定していない枠: feedVideo01']
+
+def main():
+    tests = [test_parse_feed, test_parse_empty_feed, test_parse_invalid_feed,
+             test_unchanged, test_new_video, test_title_changed, test_unsettled_video]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
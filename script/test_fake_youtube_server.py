@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+YouTubeの代役サーバーのテストスクリプト
+代役サーバーの動画ページがチェッカーの判定と一致するか、URLの書き換えで代役サーバーに送られるかを検証
+"""
+
+import sys
+import os
+import re
+import tempfile
+import contextlib
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import net
+from link_classifier import classify_watch_page
+from fake_youtube_server import FakeYouTube, FakeYouTubeServer, KINDS, KIND_PUBLIC, KIND_PRIVATE, KIND_DELETED, KIND_UPCOMING, parse_mix
+
+# 動画の種類ごとのチェッカーの判定の種類
+EXPECTED_VERDICTS = {
+    'public': 'ok',
+    'members_only': 'members_only',
+    'private': 'login_required',
+    'deleted': 'error',
+    'upcoming': 'ok',
+}
+
+@contextlib.contextmanager
+def _env(**values):
+    """環境変数を一時的に設定し、終わったら元に戻す（Noneなら削除）"""
+    previous = {name: os.environ.get(name) for name in values}
+    for name, value in values.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def test_video_kind_is_deterministic():
+    """
+    動画の種類はシードと動画IDだけで決まり、割合に従う
+    """
+    video_ids = [f"kind{i:07d}" for i in range(2000)]
+    kinds = [FakeYouTube(seed=1).video_kind(video_id) for video_id in video_ids]
+    assert kinds == [FakeYouTube(seed=1).video_kind(video_id) for video_id in video_ids]
+    assert kinds != [FakeYouTube(seed=2).video_kind(video_id) for video_id in video_ids]
+    assert 0.85 < kinds.count(KIND_PUBLIC) / len(kinds) < 0.95
+    only_deleted = FakeYouTube(mix=parse_mix('deleted=1'))
+    assert {only_deleted.video_kind(video_id) for video_id in video_ids[:50]} == {KIND_DELETED}
+
+def test_rendered_pages_classify():
+    """
+    代役サーバーの動画ページはチェッカーで種類どおりに判定され、開始日時を埋め込む
+    """
+    fake = FakeYouTube()
+    for kind in KINDS:
+        page = fake.render('abcdefghijk', kind)
+        assert classify_watch_page(page).kind == EXPECTED_VERDICTS[kind], kind
+        assert b'watch?v=abcdefghijk' in page
+        match = re.search(rb'<meta itemprop="startDate" content="([^"]+)">', page)
+        assert bool(match) == (kind not in (KIND_PRIVATE, KIND_DELETED)), kind
+
+def test_upcoming_starts_later():
+    """
+    放送前の枠の開始日時は基準より後、それ以外は前
+    """
+    fake = FakeYouTube()
+    for video_id in (f"date{i:07d}" for i in range(50)):
+        later = fake.start_time(video_id) > '2026-10-01T21:00:00+09:00'
+        assert later == (fake.video_kind(video_id) == KIND_UPCOMING), video_id
+
+def test_rewrite_url():
+    """
+    NANAHAPI_YOUTUBE_BASE_URL を指定した場合だけYouTubeのURLを書き換える
+    """
+    url = 'https://www.youtube.com/watch?v=abcdefghijk'
+    with _env(NANAHAPI_YOUTUBE_BASE_URL=None):
+        assert net.rewrite_url(url) == url
+    with _env(NANAHAPI_YOUTUBE_BASE_URL='http://127.0.0.1:8765/'):
+        assert net.rewrite_url(url) == 'http://127.0.0.1:8765/watch?v=abcdefghijk'
+        assert net.rewrite_url('https://youtu.be/abcdefghijk') == 'http://127.0.0.1:8765/watch?v=abcdefghijk'
+        assert net.rewrite_url('https://i.ytimg.com/vi/abcdefghijk/hqdefault.jpg') == 'https://i.ytimg.com/vi/abcdefghijk/hqdefault.jpg'
+
+def test_server_injects_throttling():
+    """
+    毎秒のリクエスト数を超えると429を返し、HEADにも応答する
+    """
+    fake = FakeYouTube(mix=parse_mix('public=1'), throttle_rps=3)
+    # リクエスト予算（rate_governor.sqlite）を実行したディレクトリに残さない
+    with tempfile.TemporaryDirectory() as tmp_dir, _env(NANAHAPI_STATE_DIR=tmp_dir), FakeYouTubeServer(fake) as server:
+        session = net.PooledSession()
+        try:
+            statuses = [session.get(f"{server.url}/watch?v=abcdefghijk").status_code for _ in range(6)]
+            assert statuses[:3] == [200, 200, 200]
+            assert 429 in statuses[3:]
+            head = session.head(f"{server.url}/watch?v=abcdefghijk")
+            assert head.status_code in (200, 429) and head.content == b''
+            assert session.get(f"{server.url}/__stats").json()['throttled'] == statuses.count(429) + (head.status_code == 429)
+        finally:
+            session.close()
+
+def main():
+    tests = [test_video_kind_is_deterministic, test_rendered_pages_classify, test_upcoming_starts_later,
+             test_rewrite_url, test_server_injects_throttling]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+起動時間のテストスクリプト
+各スクリプトの起動時に重い依存モジュール（yt-dlp・Selenium・numpyなど）が読み込まれないことを検証
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_import_time import MODULES, heavy_modules_loaded
+
+def test_no_heavy_imports_at_startup():
+    """
+    重い依存モジュールは初回の使用時まで読み込まない
+    """
+    for module in MODULES:
+        heavy = heavy_modules_loaded(module)
+        if heavy:
+            print(f"❌ {module}: {', '.join(heavy)}")
+        assert not heavy
+
+def main():
+    try:
+        test_no_heavy_imports_at_startup()
+        print("✅ 起動時に重い依存モジュールを読み込んでいません")
+    except AssertionError:
+        print("❌ 起動時に重い依存モジュールを読み込んでいるスクリプトがあります")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
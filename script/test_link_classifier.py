@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+リンクチェック判定ロジックのテストスクリプト
+保存済みの動画ページで判定結果が期待値と一致するかを検証
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_link_classifier import load_corpus, verify_corpus
+
+def test_watch_page_corpus():
+    """
+    保存済みページ（そのままのサイズと実際のページ相当のサイズ）の判定結果を検証
+    """
+    for pad_kb in (0, 512):
+        mismatches = verify_corpus(load_corpus(pad_kb))
+        for name, expected, actual in mismatches:
+            print(f"❌ {name} ({pad_kb}KB): 期待値 {expected} / 実際 {actual}")
+        assert not mismatches
+
+def main():
+    try:
+        test_watch_page_corpus()
+        print("✅ すべてのページで判定結果が一致しました")
+    except AssertionError:
+        print("❌ 判定結果が一致しないページがあります")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+配信開始日時のメモのテストスクリプト
+処理中のチャンネルのアーカイブだけを参照時に読み込むこと、記録は追記で最後にまとめることを検証
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from live_date_memo import LiveDateMemo, MEMO_FILE, JOURNAL_FILE
+from local_state import state_path
+
+@contextlib.contextmanager
+def _state_dir():
+    """一時ディレクトリを状態の保存先にする"""
+    previous = os.environ.get('NANAHAPI_STATE_DIR')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['NANAHAPI_STATE_DIR'] = str(Path(tmp_dir) / 'state')
+        try:
+            yield Path(tmp_dir)
+        finally:
+            if previous is None:
+                os.environ.pop('NANAHAPI_STATE_DIR', None)
+            else:
+                os.environ['NANAHAPI_STATE_DIR'] = previous
+
+def _write_archive(path, items):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'items': items}, f, ensure_ascii=False)
+
+def test_seed_only_used_archive():
+    """
+    指定したチャンネルのアーカイブの放送済みの動画だけをメモとして使い、メモのファイルには保存しない
+    """
+    with _state_dir() as tmp_dir:
+        used = tmp_dir / 'archives_@used.json'
+        other = tmp_dir / 'archives_@other.json'
+        _write_archive(used, [
+            {'videoId': 'past', 'upload_date': '2024-01-01T21:00:00'},
+            {'videoId': 'future', 'upload_date': '2099-01-01T21:00:00'},
+        ])
+        _write_archive(other, [{'videoId': 'otherPast', 'upload_date': '2024-01-01T21:00:00'}])
+        memo = LiveDateMemo()
+        memo.use_archive(used)
+        assert memo.get('past') == '2024-01-01T21:00:00+09:00'
+        assert memo.get('future') is None
+        assert memo.get('otherPast') is None
+        assert (memo.hits, memo.misses) == (1, 2)
+        assert not state_path(MEMO_FILE).exists()
+
+def test_put_appends_and_compacts():
+    """
+    記録は追記分のファイルに1行ずつ追記し、別のプロセスからも読め、compact() でメモにまとめる
+    """
+    with _state_dir():
+        memo = LiveDateMemo()
+        memo.put('video1', '2024-02-01T21:00:00+09:00', 1706788800)
+        memo.put('video2', '2024-02-02T21:00:00+09:00', 1706875200)
+        memo.put('upcoming', '2099-01-01T21:00:00+09:00', time.time() + 3600)
+        assert not state_path(MEMO_FILE).exists()
+        with open(state_path(JOURNAL_FILE), 'r', encoding='utf-8') as f:
+            assert len(f.readlines()) == 2
+        assert LiveDateMemo().get('video2') == '2024-02-02T21:00:00+09:00'
+
+        memo.compact()
+        assert not state_path(JOURNAL_FILE).exists()
+        with open(state_path(MEMO_FILE), 'r', encoding='utf-8') as f:
+            assert sorted(json.load(f)) == ['video1', 'video2']
+        assert LiveDateMemo().get('video1') == '2024-02-01T21:00:00+09:00'
+
+def main():
+    tests = [test_seed_only_used_archive, test_put_appends_and_compacts]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
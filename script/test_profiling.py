@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+プロファイルの記録のテストスクリプト
+無効の場合は何もせず、有効の場合はプロファイルと区間ごとの集計を保存することを検証
+"""
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import profiling
+
+def _run_with_env(env, sections=5):
+    previous = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        with profiling.run('test_profiling'):
+            for i in range(sections):
+                with profiling.hot_section('dump'):
+                    json.dumps([{'index': j, 'title': 'x' * 50} for j in range(2000)])
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def test_disabled_is_noop():
+    """
+    無効の場合は区間を計測せず、ファイルも作らない
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _run_with_env({'NANAHAPI_PROFILE': '0', 'NANAHAPI_STATE_DIR': tmp_dir})
+        assert not (Path(tmp_dir) / profiling.PROFILES_DIR).exists()
+    assert profiling.hot_section('dump') is profiling.hot_section('other')
+
+def test_profile_written():
+    """
+    有効の場合はcProfileの結果と、メモリ・区間ごとの集計を保存する
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _run_with_env({'NANAHAPI_PROFILE': '1', 'NANAHAPI_PROFILE_SAMPLE': '2', 'NANAHAPI_STATE_DIR': tmp_dir})
+        files = sorted(path.suffix for path in (Path(tmp_dir) / profiling.PROFILES_DIR).iterdir())
+        assert files == ['.prof', '.txt']
+        summary = next((Path(tmp_dir) / profiling.PROFILES_DIR).glob('*.txt')).read_text(encoding='utf-8')
+        assert '累積時間の上位' in summary
+        assert '確保したメモリの上位' in summary
+        section = next(line.split() for line in summary.splitlines() if line.strip().startswith('dump'))
+        assert section[1:3] == ['5', '3']  # 5回のうち1・3・5回目を計測
+
+def test_memory_only():
+    """
+    mem だけを指定した場合はcProfileの結果を保存しない
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _run_with_env({'NANAHAPI_PROFILE': 'mem', 'NANAHAPI_STATE_DIR': tmp_dir})
+        files = [path.suffix for path in (Path(tmp_dir) / profiling.PROFILES_DIR).iterdir()]
+        assert files == ['.txt']
+
+def main():
+    tests = [test_disabled_is_noop, test_profile_written, test_memory_only]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+リクエスト予算のテストスクリプト
+トークンの消費・補充、別のプロセスとの予算の共有、リトライ・リダイレクトごとのトークンの取得を検証
+"""
+
+import sys
+import os
+import tempfile
+import contextlib
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import rate_governor
+
+@contextlib.contextmanager
+def _budget(limits):
+    """一時ディレクトリの予算を使う"""
+    names = ('NANAHAPI_STATE_DIR', 'NANAHAPI_RATE_LIMITS', 'NANAHAPI_RATE_GOVERNOR')
+    previous = {name: os.environ.get(name) for name in names}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ.update({'NANAHAPI_STATE_DIR': tmp_dir, 'NANAHAPI_RATE_LIMITS': limits, 'NANAHAPI_RATE_GOVERNOR': '1'})
+        rate_governor.get_limits.cache_clear()
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            rate_governor.get_limits.cache_clear()
+
+def _tokens(name):
+    row = rate_governor._connect().execute('SELECT tokens FROM buckets WHERE name = ?', (name,)).fetchone()
+    return row[0]
+
+def _acquire_all(attempts):
+    """別のプロセスで、同じ時刻のままトークンを取得できた回数を数える"""
+    return sum(rate_governor.try_acquire('example.com', now=1000.0) == 0 for _ in range(attempts))
+
+def test_refill_and_debit():
+    """
+    最大トークン数まで取得でき、足りない場合は待機する秒数を返し、時間の経過で補充される
+    """
+    with _budget('example.com=2/4'):
+        assert [rate_governor.try_acquire('www.example.com', now=100.0) for _ in range(4)] == [0.0] * 4
+        assert rate_governor.try_acquire('example.com', now=100.0) == 0.5
+        assert rate_governor.try_acquire('example.com', now=100.5) == 0.0
+        # 補充は最大トークン数まで
+        assert [rate_governor.try_acquire('example.com', now=200.0) for _ in range(5)] == [0.0] * 4 + [0.5]
+        # 別のホストは別のバケット
+        assert rate_governor.try_acquire('other.test', now=200.0) == 0.0
+
+def test_shared_between_processes():
+    """
+    同時に動いている別のプロセスと予算を共有し、合計で最大トークン数までしか取得できない
+    """
+    with _budget('example.com=1/25'):
+        # forkするとSQLiteの接続を引き継ぐため、新しいプロセスで起動する
+        with multiprocessing.get_context('spawn').Pool(2) as pool:
+            acquired = pool.map(_acquire_all, [20, 20])
+        assert sum(acquired) == 25
+        assert all(count > 0 for count in acquired)
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """/redirect は /error へのリダイレクト、/error は常に503を返す"""
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/error')
+        else:
+            self.send_response(503)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def test_session_acquires_per_attempt():
+    """
+    共有セッションはリダイレクト・urllib3のリトライを含め、送信するたびにトークンを取得する
+    """
+    import net
+    from requests.adapters import HTTPAdapter
+
+    _FlakyHandler.requests = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with _budget('127.0.0.1=0.001/100'):
+            session = net.PooledSession()
+            adapter = HTTPAdapter(max_retries=net._retry_policy().new(backoff_factor=0))
+            session.mount('http://', adapter)
+            try:
+                response = session.get(f"http://127.0.0.1:{server.server_port}/redirect")
+            finally:
+                session.close()
+            assert response.status_code == 503
+            assert _FlakyHandler.requests == 5  # リダイレクト1回 + 503への最初の送信とリトライ3回
+            assert round(100 - _tokens('127.0.0.1')) == _FlakyHandler.requests
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main():
+    tests = [test_refill_and_debit, test_shared_between_processes, test_session_acquires_per_attempt]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
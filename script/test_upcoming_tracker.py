@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+放送予定枠トラッカーのテストスクリプト
+索引に追加する枠と、再取得の結果に応じた状態・次の確認時刻を検証
+"""
+
+import sys
+import os
+import json
+import tempfile
+import contextlib
+import multiprocessing
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import upcoming_tracker
+from upcoming_tracker import (STATE_SCHEDULED, STATE_LIVE, STATE_ENDING, STATE_FINALIZED, START_MARGIN,
+                              RECENT_WINDOW, EXPECTED_DURATION, LIVE_RETRY, ENDING_RETRY, ENDING_WINDOW, POST_LIVE_RETRY)
+
+NOW = 1791630000
+
+def write_archive(archives_dir, items):
+    with open(Path(archives_dir) / 'archives_@test.json', 'w', encoding='utf-8') as f:
+        json.dump({'items': items}, f, ensure_ascii=False)
+
+@contextlib.contextmanager
+def fake_fetch(live_statuses):
+    """
+    get_archives の再取得を、live_status を順に返す関数に置き換える
+    """
+    import get_archives
+
+    originals = (get_archives.get_detailed_video_info, get_archives.save_to_json)
+    statuses = iter(live_statuses)
+
+    def get_detailed_video_info(video_id, ydl_opts):
+        return {
+            'id': video_id,
+            'title': '配信',
+            'release_timestamp': NOW,
+            'thumbnails': [{'url': f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg"}],
+            'live_status': next(statuses),
+        }
+
+    get_archives.get_detailed_video_info = get_detailed_video_info
+    get_archives.save_to_json = lambda items, output_file: None
+    try:
+        yield
+    finally:
+        get_archives.get_detailed_video_info, get_archives.save_to_json = originals
+
+def test_build_index_includes_recent():
+    """
+    開始前の枠は開始予定時刻の後に、開始して間もない枠はすぐに確認し、古い枠・メン限は追加しない
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_archive(tmp_dir, [
+            {'videoId': 'upcoming', 'title': '放送予定', 'upload_ts': NOW + 3600, 'tags': []},
+            {'videoId': 'recent', 'title': '配信中かも', 'upload_ts': NOW - 3600, 'tags': []},
+            {'videoId': 'old', 'title': '確定済み', 'upload_ts': NOW - RECENT_WINDOW - 1, 'tags': []},
+            {'videoId': 'members', 'title': 'メン限', 'upload_ts': NOW + 3600, 'tags': ['#メン限']},
+        ])
+        index = {}
+        assert upcoming_tracker.build_index(index, archives_dir=tmp_dir, now=NOW) == 2
+        assert index['upcoming']['next_check'] == NOW + 3600 + START_MARGIN
+        assert index['recent']['next_check'] == NOW
+        assert {entry['state'] for entry in index.values()} == {STATE_SCHEDULED}
+        # 追加済みの枠は追加し直さない
+        assert upcoming_tracker.build_index(index, archives_dir=tmp_dir, now=NOW) == 0
+
+def test_build_index_drops_old_finalized():
+    """
+    確定済みで開始予定時刻から RECENT_WINDOW を過ぎた枠は索引から取り除く
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_archive(tmp_dir, [])
+        index = {
+            'old': {'scheduled': NOW - RECENT_WINDOW, 'state': STATE_FINALIZED, 'next_check': NOW},
+            'recent': {'scheduled': NOW - 3600, 'state': STATE_FINALIZED, 'next_check': NOW},
+            'stuck': {'scheduled': NOW - RECENT_WINDOW * 2, 'state': STATE_LIVE, 'next_check': NOW},
+        }
+        upcoming_tracker.build_index(index, archives_dir=tmp_dir, now=NOW)
+        assert sorted(index) == ['recent', 'stuck']
+
+def _save_videos(args):
+    """別のプロセスで1件ずつアーカイブに保存する"""
+    import get_archives
+
+    output_file, prefix = args
+    for i in range(15):
+        video_id = f"{prefix}{i:02d}"
+        get_archives.save_to_json([{
+            'videoId': video_id,
+            'title': video_id,
+            'tags': [],
+            'upload_date': '2026-10-01T21:00:00',
+            'upload_ts': NOW + i,
+        }], output_file)
+
+def test_concurrent_saves_keep_both():
+    """
+    トラッカーと get_archives.py が同じアーカイブを同時に保存しても、どちらのマージも失わない
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        previous = os.environ.get('NANAHAPI_STATE_DIR')
+        os.environ['NANAHAPI_STATE_DIR'] = str(Path(tmp_dir) / 'state')
+        try:
+            output_file = str(Path(tmp_dir) / 'archives_@test.json')
+            with multiprocessing.get_context('spawn').Pool(2) as pool:
+                pool.map(_save_videos, [(output_file, 'a'), (output_file, 'b')])
+        finally:
+            if previous is None:
+                os.environ.pop('NANAHAPI_STATE_DIR', None)
+            else:
+                os.environ['NANAHAPI_STATE_DIR'] = previous
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)['items']) == 30
+
+def test_refresh_around_end():
+    """
+    配信中は終了の目安の前後に、配信終了直後は短い間隔で再取得し、確定したら追跡を終了する
+    """
+    scheduled = NOW - 3600
+    entry = {'file': 'archives_@test.json', 'title': '配信', 'scheduled': scheduled, 'state': STATE_SCHEDULED, 'next_check': NOW, 'errors': 0}
+    with tempfile.TemporaryDirectory() as tmp_dir, fake_fetch(['is_live', 'is_live', 'post_live', 'post_live', 'was_live']):
+        upcoming_tracker.refresh_entry('video', entry, {}, archives_dir=tmp_dir, now=NOW)
+        assert entry['state'] == STATE_LIVE
+        assert entry['next_check'] == scheduled + EXPECTED_DURATION
+
+        now = scheduled + EXPECTED_DURATION
+        upcoming_tracker.refresh_entry('video', entry, {}, archives_dir=tmp_dir, now=now)
+        assert entry['next_check'] == now + LIVE_RETRY
+
+        now += LIVE_RETRY
+        upcoming_tracker.refresh_entry('video', entry, {}, archives_dir=tmp_dir, now=now)
+        assert entry['state'] == STATE_ENDING
+        assert entry['next_check'] == now + ENDING_RETRY
+
+        now += ENDING_WINDOW
+        upcoming_tracker.refresh_entry('video', entry, {}, archives_dir=tmp_dir, now=now)
+        assert entry['next_check'] == now + POST_LIVE_RETRY
+
+        upcoming_tracker.refresh_entry('video', entry, {}, archives_dir=tmp_dir, now=now + POST_LIVE_RETRY)
+        assert entry['state'] == STATE_FINALIZED
+
+def main():
+    tests = [test_build_index_includes_recent, test_build_index_drops_old_finalized, test_refresh_around_end,
+             test_concurrent_saves_keep_both]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
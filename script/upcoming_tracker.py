@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+放送予定枠トラッカー
+全アーカイブから放送予定枠（未放送枠）と開始して間もない枠（配信中の可能性がある枠）を索引化し、
+チャンネル全体を巡回する代わりに各枠を開始予定時刻の後・配信終了の前後・アーカイブ確定時だけ
+個別に再取得して動画データを更新します。
+アーカイブが確定した枠は finalized として以降は追跡しません。
+
+使用方法:
+  python script/upcoming_tracker.py [--loop] [--list]
+    --loop  再取得の時刻まで待機しながら追跡を続ける
+    --list  索引の内容を表示するだけで再取得しない
+"""
+
+import sys
+import glob
+import time
+from pathlib import Path
+from datetime import datetime
+
+from archive_utils import ARCHIVES_DIR, JST, load_archive_items, parse_upload_date
+from local_state import load_state_json, save_state_json
+
+INDEX_FILE = 'upcoming_index.json'
+
+STATE_SCHEDULED = 'scheduled'  # 開始前
+STATE_LIVE = 'live'  # 配信中
+STATE_ENDING = 'ending'  # 配信終了直後（アーカイブ処理中）
+STATE_FINALIZED = 'finalized'  # アーカイブ確定済み
+
+START_MARGIN = 10 * 60  # 開始予定時刻から最初に再取得するまでの時間（秒）
+RECENT_WINDOW = 12 * 60 * 60  # 開始予定時刻を過ぎていても索引に追加する期間（秒）
+DELAYED_RETRY = 15 * 60  # 開始が遅れている場合の再取得間隔（秒）
+EXPECTED_DURATION = 2 * 60 * 60  # 配信の長さの目安（開始予定時刻からこの時間後の終了前後に再取得、秒）
+LIVE_RETRY = 30 * 60  # 終了の目安を過ぎても配信中の場合の再取得間隔（秒）
+ENDING_RETRY = 10 * 60  # 配信終了直後の再取得間隔（秒）
+ENDING_WINDOW = 60 * 60  # 配信終了からENDING_RETRYで再取得する期間（秒）
+POST_LIVE_RETRY = 30 * 60  # アーカイブ処理が長引いている場合の再取得間隔（秒）
+ERROR_RETRY = 60 * 60  # 取得失敗時の再取得間隔（秒）
+MAX_ERRORS = 6  # 取得失敗が続いた場合に追跡をやめる回数
+MAX_SLEEP = 5 * 60  # --loop時の1回の待機の最大時間（秒）
+
+# yt-dlpのlive_statusのうち、アーカイブが確定したとみなすもの
+FINAL_LIVE_STATUSES = ('was_live', 'not_live')
+
+def build_index(index, archives_dir=ARCHIVES_DIR, now=None):
+    """
+    アーカイブから開始前の放送予定枠と、開始予定時刻から RECENT_WINDOW 以内の枠を索引に追加
+    開始予定時刻を過ぎた枠はすぐに再取得して、配信中・アーカイブ確定済みかを確認する
+    確定済みで開始予定時刻から RECENT_WINDOW を過ぎた枠は、再び追加されることがないため索引から取り除く
+
+    Args:
+        index (dict): 既存の索引 {videoId: 索引情報}
+        archives_dir (str): アーカイブファイルのディレクトリ
+        now (float): 現在時刻（エポック秒）
+    Returns:
+        int: 新しく追加した枠の数
+    """
+    now = now or time.time()
+    for video_id in [video_id for video_id, entry in index.items()
+                     if entry['state'] == STATE_FINALIZED and entry['scheduled'] <= now - RECENT_WINDOW]:
+        del index[video_id]
+    added = 0
+    for file_path in sorted(glob.glob(str(Path(archives_dir) / 'archives_*.json'))):
+        archive_file = Path(file_path).name
+        for item in load_archive_items(file_path):
+            video_id = item.get('videoId')
+            scheduled = item.get('upload_ts') or parse_upload_date(item.get('upload_date'))
+            if not video_id or scheduled is None or scheduled <= now - RECENT_WINDOW or video_id in index:
+                continue
+            if '#メン限' in item.get('tags', []):
+                # メンバー限定枠は詳細情報を取得できないため追跡しない
+                continue
+            index[video_id] = {
+                'file': archive_file,
+                'title': item.get('title', ''),
+                'scheduled': scheduled,
+                'state': STATE_SCHEDULED,
+                'next_check': scheduled + START_MARGIN if scheduled > now else now,
+                'errors': 0,
+            }
+            added += 1
+    return added
+
+def refresh_entry(video_id, entry, ydl_opts, archives_dir=ARCHIVES_DIR, now=None):
+    """
+    放送予定枠を再取得して索引とアーカイブを更新
+
+    Args:
+        video_id (str): 動画ID
+        entry (dict): 索引情報（更新される）
+        ydl_opts (dict): yt-dlpの設定
+        archives_dir (str): アーカイブファイルのディレクトリ
+        now (float): 現在時刻（エポック秒）
+    """
+    import get_archives
+
+    now = now or time.time()
+    entry['last_checked'] = now
+    try:
+        video_info = get_archives.get_detailed_video_info(video_id, ydl_opts)
+    except Exception as e:
+        video_info = None
+        print(f"  → △ 取得失敗: {e}", flush=True)
+    if not video_info:
+        entry['errors'] = entry.get('errors', 0) + 1
+        if entry['errors'] >= MAX_ERRORS:
+            print(f"  → ✗ {MAX_ERRORS}回続けて取得に失敗したため追跡を終了します", flush=True)
+            entry['state'] = STATE_FINALIZED
+        else:
+            entry['next_check'] = now + ERROR_RETRY
+        return
+    entry['errors'] = 0
+
+    live_status = video_info.get('live_status')
+    output_file = str(Path(archives_dir) / entry['file'])
+    if live_status == 'is_upcoming':
+        # 開始が遅れている・予定が変更された場合
+        release_timestamp = video_info.get('release_timestamp') or entry['scheduled']
+        if release_timestamp != entry['scheduled']:
+            print(f"  → ✓ 開始予定時刻が変更されました: {datetime.fromtimestamp(release_timestamp, JST).isoformat()}", flush=True)
+            entry['scheduled'] = release_timestamp
+            get_archives.save_to_json([get_archives.create_video_data_from_detailed_info(video_info, video_id)], output_file)
+        entry['next_check'] = max(release_timestamp + START_MARGIN, now + DELAYED_RETRY)
+        return
+
+    get_archives.save_to_json([get_archives.create_video_data_from_detailed_info(video_info, video_id)], output_file)
+    if live_status in FINAL_LIVE_STATUSES:
+        print(f"  → ✓ アーカイブが確定しました", flush=True)
+        entry['state'] = STATE_FINALIZED
+    elif live_status == 'is_live':
+        print(f"  → ✓ 配信中", flush=True)
+        entry['state'] = STATE_LIVE
+        # 次は終了の目安の前後に再取得し、それを過ぎても配信中ならLIVE_RETRYごとに再取得
+        entry['next_check'] = max(entry['scheduled'] + EXPECTED_DURATION, now + LIVE_RETRY)
+    else:
+        print(f"  → ✓ アーカイブ処理中 (live_status={live_status})", flush=True)
+        if entry['state'] != STATE_ENDING:
+            entry['state'] = STATE_ENDING
+            entry['ended'] = now
+        # 終了直後は確定をすぐに反映できるよう短い間隔で、長引いている場合はPOST_LIVE_RETRYごとに再取得
+        ending = now - entry.get('ended', now) < ENDING_WINDOW
+        entry['next_check'] = now + (ENDING_RETRY if ending else POST_LIVE_RETRY)
+
+def run_due(index, ydl_opts=None, now=None):
+    """
+    再取得の時刻を過ぎた枠を処理
+
+    Args:
+        index (dict): 索引
+        ydl_opts (dict): yt-dlpの設定
+        now (float): 現在時刻（エポック秒）
+    Returns:
+        int: 処理した枠の数
+    """
+    now = now or time.time()
+    due = sorted(
+        (entry['next_check'], video_id)
+        for video_id, entry in index.items()
+        if entry['state'] != STATE_FINALIZED and entry['next_check'] <= now
+    )
+    if due and ydl_opts is None:
+        import get_archives
+        ydl_opts = get_archives.get_ydl_options()
+    for _, video_id in due:
+        entry = index[video_id]
+        print(f"🔄 {entry['title']} (ID: {video_id}, {entry['file']})", flush=True)
+        refresh_entry(video_id, entry, ydl_opts, now=now)
+        save_state_json(INDEX_FILE, index)
+    return len(due)
+
+def next_check_time(index):
+    """
+    次に再取得する時刻を取得
+
+    Args:
+        index (dict): 索引
+    Returns:
+        float: 次に再取得する時刻、追跡中の枠がない場合はNone
+    """
+    times = [entry['next_check'] for entry in index.values() if entry['state'] != STATE_FINALIZED]
+    return min(times) if times else None
+
+def print_index(index):
+    """
+    追跡中の枠を表示
+    """
+    active = sorted(
+        (entry['next_check'], video_id, entry)
+        for video_id, entry in index.items()
+        if entry['state'] != STATE_FINALIZED
+    )
+    print(f"📋 追跡中の放送予定枠: {len(active)}件（確定済み: {len(index) - len(active)}件）")
+    for next_check, video_id, entry in active:
+        scheduled = datetime.fromtimestamp(entry['scheduled'], JST).strftime('%Y-%m-%d %H:%M')
+        next_at = datetime.fromtimestamp(next_check, JST).strftime('%Y-%m-%d %H:%M')
+        print(f"  {scheduled} [{entry['state']}] 次回確認 {next_at} - {entry['title'][:40]} ({video_id})")
+
+def main():
+    """
+    メイン関数
+    """
+    print("📡 放送予定枠トラッカー")
+    print("=" * 50)
+
+    flags = set(sys.argv[1:])
+    index = load_state_json(INDEX_FILE, {})
+    added = build_index(index)
+    save_state_json(INDEX_FILE, index)
+    print(f"🆕 新しく追加した放送予定枠: {added}件")
+
+    if '--list' in flags:
+        print_index(index)
+        return
+
+    try:
+        while True:
+            processed = run_due(index)
+            if processed:
+                print(f"✅ {processed}件の放送予定枠を確認しました", flush=True)
+            if '--loop' not in flags:
+                break
+            # 新しい放送予定枠を取り込みながら次の確認時刻まで待機
+            if build_index(index):
+                save_state_json(INDEX_FILE, index)
+            next_at = next_check_time(index)
+            wait = MAX_SLEEP if next_at is None else min(max(next_at - time.time(), 0), MAX_SLEEP)
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        print("中断されました。")
+    print_index(index)
+
+if __name__ == "__main__":
+    main()